@@ -0,0 +1,49 @@
+"""rating columns and leaderboard index
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '002'
+down_revision: Union[str, None] = '001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Колонки рейтинга, которые есть в UserModel, но не были созданы в 001
+    op.add_column('users', sa.Column('taps', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('users', sa.Column('info', sa.String(), nullable=True))
+    op.add_column('users', sa.Column('photo', sa.String(), nullable=True))
+
+    # CREATE INDEX CONCURRENTLY не блокирует запись, но не может выполняться внутри транзакции
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_taps_desc_id',
+            'users',
+            [sa.text('taps DESC'), 'id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_users_taps_desc_id',
+            table_name='users',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+    op.drop_column('users', 'photo')
+    op.drop_column('users', 'info')
+    op.drop_column('users', 'taps')
@@ -0,0 +1,48 @@
+"""bigint telegram_id
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17 12:30:00.000000
+
+Смена типа INTEGER -> BIGINT переписывает всю таблицу users и ее индексы
+под блокировкой ACCESS EXCLUSIVE: пока миграция идет, все чтения и записи
+таблицы ждут. Время пропорционально размеру таблицы, поэтому на большой базе
+миграцию нужно запускать в окно обслуживания, с остановленными ботом и API:
+alembic upgrade 003. Контейнер бота выполняет alembic upgrade head при старте,
+поэтому на большой базе ревизию нужно применить до выкладки, а не при ней.
+Она вынесена отдельно от 002, где индекс строится CONCURRENTLY без остановки
+записи.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Telegram ID давно вышли за пределы INTEGER
+    op.alter_column(
+        'users',
+        'telegram_id',
+        existing_type=sa.Integer(),
+        type_=sa.BigInteger(),
+        existing_nullable=False,
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        'users',
+        'telegram_id',
+        existing_type=sa.BigInteger(),
+        type_=sa.Integer(),
+        existing_nullable=False,
+    )
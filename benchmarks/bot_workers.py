@@ -0,0 +1,176 @@
+"""Пропускная способность обработки апдейтов: один процесс против процессов-обработчиков.
+
+Апдейты — сообщения /start, /help и текст без обработчика от --users
+пользователей. Обработка — как в боте: разбор JSON, валидация Update
+в модели aiogram, фильтры и обработчики из register_handlers, вызов метода,
+который вернул обработчик. Бот работает без сети (запросы к Bot API только
+считаются), поэтому замеряется именно нагрузка на процессор.
+
+Режим "single" — все апдейты в одном процессе через OrderedUpdateProcessor.
+Режим "workers N" — процесс приема распределяет апдейты по N процессам
+через WorkerPool; время считается от первого апдейта до завершения всех
+обработчиков. Каждый обработчик проверяет порядок апдейтов по пользователю.
+Режим "ingest" — только работа процесса приема на апдейт (разбор JSON, ключ,
+сериализация для очереди): предел, до которого масштабируются обработчики.
+На одном ядре процессы-обработчики выигрыша не дают — нужно несколько ядер.
+
+Запуск:
+    python -m benchmarks.bot_workers
+    python -m benchmarks.bot_workers --updates 50000 --users 1000 --workers 2 4
+"""
+import argparse
+import asyncio
+import multiprocessing
+import pickle
+import time
+
+import orjson
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.base import BaseSession
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from src.interfaces.bot.handlers import register_handlers
+from src.interfaces.bot.workers import OrderedUpdateProcessor, WorkerPool, process_update, serve_queue, update_key
+
+TEXTS = ["/start", "/help", "привет"]
+# Лимит очереди ключа в процессах-обработчиках: на нем прием ждал бы обработки, а замер — пропускная способность
+BENCH_MAX_PENDING_PER_KEY = 10**6
+
+
+class NullSession(BaseSession):
+    """Сессия без сети: только считает запросы к Bot API."""
+
+    def __init__(self):
+        super().__init__()
+        self.requests = 0
+
+    async def make_request(self, bot, method, timeout=None):
+        self.requests += 1
+        return True
+
+    async def stream_content(self, *args, **kwargs):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+def make_updates(count: int, users: int) -> list[bytes]:
+    """Апдейты в том виде, в каком их присылает Telegram (JSON)."""
+    updates = []
+    for update_id in range(1, count + 1):
+        user_id = 10**9 + update_id % users
+        text = TEXTS[update_id % len(TEXTS)]
+        message = {
+            "message_id": update_id,
+            "date": 1700000000,
+            "chat": {"id": user_id, "type": "private", "first_name": "Player"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "Player", "language_code": "ru"},
+            "text": text,
+        }
+        if text.startswith("/"):
+            message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text)}]
+        updates.append(orjson.dumps({"update_id": update_id, "message": message}))
+    return updates
+
+
+def create_dispatcher() -> tuple[Dispatcher, Bot]:
+    dp = Dispatcher(storage=MemoryStorage())
+    register_handlers(dp)
+    return dp, Bot(token="42:BENCH", session=NullSession())
+
+
+class OrderCheck:
+    """Проверка, что апдейты каждого пользователя обработаны по возрастанию update_id."""
+
+    def __init__(self):
+        self.last = {}
+        self.violations = 0
+
+    def __call__(self, update: dict) -> None:
+        key = update_key(update)
+        if self.last.get(key, 0) > update["update_id"]:
+            self.violations += 1
+        self.last[key] = update["update_id"]
+
+
+def make_handle(dp: Dispatcher, bot: Bot, check: OrderCheck):
+    async def handle(update: dict) -> None:
+        await process_update(dp, bot, update)
+        check(update)
+    return handle
+
+
+async def run_single(updates: list[bytes], max_in_flight: int) -> tuple[float, int, int]:
+    dp, bot = create_dispatcher()
+    check = OrderCheck()
+    processor = OrderedUpdateProcessor(make_handle(dp, bot, check), max_in_flight, BENCH_MAX_PENDING_PER_KEY)
+    
+    started = time.perf_counter()
+    for raw in updates:
+        update = orjson.loads(raw)
+        await processor.submit(update_key(update), update)
+    await processor.join()
+    return time.perf_counter() - started, bot.session.requests, check.violations
+
+
+def bench_worker(index: int, workers: int, updates: multiprocessing.Queue, results: multiprocessing.Queue) -> None:
+    """Процесс-обработчик замера: диспетчер без сети, отчет о запросах и нарушениях порядка."""
+    async def serve() -> None:
+        dp, bot = create_dispatcher()
+        check = OrderCheck()
+        results.put(("ready", index))
+        await serve_queue(updates, make_handle(dp, bot, check), max_pending_per_key=BENCH_MAX_PENDING_PER_KEY)
+        results.put(("done", bot.session.requests, check.violations))
+    
+    asyncio.run(serve())
+
+
+async def run_workers(updates: list[bytes], workers: int) -> tuple[float, int, int]:
+    results = multiprocessing.get_context("spawn").Queue()
+    pool = WorkerPool(workers, bench_worker, args=(results,))
+    pool.start()
+    # Время запуска процессов (импорт aiogram) в замер не входит
+    for _ in range(workers):
+        await asyncio.to_thread(results.get)
+    
+    started = time.perf_counter()
+    for raw in updates:
+        await pool.dispatch(orjson.loads(raw))
+    await asyncio.to_thread(pool.stop, 600)
+    
+    requests = violations = 0
+    for _ in range(workers):
+        _, worker_requests, worker_violations = results.get()
+        requests += worker_requests
+        violations += worker_violations
+    return time.perf_counter() - started, requests, violations
+
+
+async def run_ingest(updates: list[bytes]) -> tuple[float, int, int]:
+    started = time.perf_counter()
+    for raw in updates:
+        update = orjson.loads(raw)
+        pickle.dumps((update_key(update), update))
+    return time.perf_counter() - started, 0, 0
+
+
+async def main(args: argparse.Namespace) -> None:
+    updates = make_updates(args.updates, args.users)
+    
+    print(f"{args.updates} updates from {args.users} users")
+    print(f"  {'mode':<12} {'seconds':>8} {'updates/s':>10} {'replies':>8} {'order violations':>17}")
+    modes = [("ingest", run_ingest(updates)), ("single", run_single(updates, args.max_in_flight))]
+    modes += [(f"workers {n}", run_workers(updates, n)) for n in args.workers]
+    for mode, run in modes:
+        elapsed, replies, violations = await run
+        print(f"  {mode:<12} {elapsed:8.2f} {args.updates / elapsed:10.0f} {replies:8} {violations:17}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--max-in-flight", type=int, default=100)
+    asyncio.run(main(parser.parse_args()))
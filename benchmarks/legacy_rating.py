@@ -0,0 +1,96 @@
+"""Legacy rating() aggregation: get_all_users() + python sum vs get_total_taps() + get_best_user().
+
+The new path keeps handler memory flat, but only get_best_user() is constant time
+(ORDER BY taps DESC LIMIT 1 on the taps index). get_total_taps() is a SUM over
+the whole table inside postgres and still grows linearly with it, so the two
+queries are timed separately.
+
+Runs in the legacy environment (aiogram 2, peewee-async) against postgres from .env / BotSettings
+(TG_BOT_TOKEN, POSTGRES_*).
+Users are seeded into a separate ``bench_users`` table, the real ``users`` table is not touched.
+
+    python -m benchmarks.legacy_rating --sizes 1000 10000 100000 1000000
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from tg_bot_template import dp
+from tg_bot_template.config import settings
+from tg_bot_template.db_infra import db, setup_db
+from tg_bot_template.db_infra.models import Users
+
+
+async def old_rating() -> tuple[int, Users | None]:
+    all_users = await db.get_all_users()
+    total_taps = sum([i.taps for i in all_users])
+    best_user = all_users[0] if all_users and all_users[0].taps > 0 else None
+    return total_taps, best_user
+
+
+async def new_rating() -> tuple[int, Users | None]:
+    return await db.get_total_taps(), await db.get_best_user()
+
+
+async def new_total() -> int:
+    return await db.get_total_taps()
+
+
+async def new_best() -> Users | None:
+    return await db.get_best_user()
+
+
+async def measure(func, repeat: int) -> tuple[float, float]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await func()
+    elapsed = (time.perf_counter() - started) / repeat * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+async def main(args: argparse.Namespace) -> None:
+    Users._meta.set_table_name("bench_users")
+    manager = setup_db(settings)
+    dp.set_db_conn(conn=manager)
+    database = manager.database
+
+    print(
+        f"{'users':>9} | {'old ms':>9} {'old MiB':>8} | {'new ms':>9} {'new MiB':>8}"
+        f" | {'total ms':>9} {'best ms':>9}"
+    )
+    for size in args.sizes:
+        with database.allow_sync():
+            database.execute_sql("TRUNCATE bench_users")
+            database.execute_sql(
+                "INSERT INTO bench_users (social_id, username, taps) "
+                "SELECT i, 'user_' || i, (random() * 1000000)::bigint FROM generate_series(1, %s) AS i",
+                (size,),
+            )
+            database.execute_sql("ANALYZE bench_users")
+            database.close()
+
+        assert (await old_rating())[0] == (await new_rating())[0]
+        old_ms, old_mib = await measure(old_rating, args.repeat if size <= 100_000 else 1)
+        new_ms, new_mib = await measure(new_rating, args.repeat)
+        total_ms, _ = await measure(new_total, args.repeat)
+        best_ms, _ = await measure(new_best, args.repeat)
+        print(
+            f"{size:>9} | {old_ms:>9.1f} {old_mib:>8.1f} | {new_ms:>9.1f} {new_mib:>8.2f}"
+            f" | {total_ms:>9.1f} {best_ms:>9.1f}"
+        )
+
+    with database.allow_sync():
+        Users.drop_table(safe=True)
+        database.close()
+    await manager.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,37 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+@dataclass
+class BroadcastProgress:
+    """Состояние рассылки: курсор по ID пользователей, текст и счетчики результатов.
+    
+    ``cursor`` — наибольший ID пользователя, до которого включительно все
+    сообщения уже обработаны; при возобновлении рассылка продолжается после него.
+    ``completed`` — ID пользователей после курсора, чьи сообщения обработаны
+    раньше предыдущих: при возобновлении они пропускаются, поэтому счетчики
+    учитывают каждого получателя один раз.
+    """
+    
+    text: str
+    cursor: int = 0
+    sent: int = 0
+    failed: int = 0
+    blocked: int = 0
+    finished: bool = False
+    completed: List[int] = field(default_factory=list)
+
+
+class BroadcastProgressStore(ABC):
+    """Интерфейс хранилища прогресса рассылок, переживающего перезапуск бота."""
+
+    @abstractmethod
+    async def load(self, broadcast_id: str) -> Optional[BroadcastProgress]:
+        """Получить сохраненный прогресс рассылки или None, если она еще не начиналась."""
+        pass
+
+    @abstractmethod
+    async def save(self, broadcast_id: str, progress: BroadcastProgress) -> None:
+        """Сохранить прогресс рассылки."""
+        pass
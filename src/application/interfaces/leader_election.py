@@ -0,0 +1,29 @@
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Optional, Union
+
+# Обработчик смены лидерства: обычная функция или корутина без аргументов
+LeadershipCallback = Callable[[], Union[None, Awaitable[None]]]
+
+
+class LeaderElection(ABC):
+    """Интерфейс выбора лидера среди реплик бота для задач, которые должна выполнять только одна реплика."""
+
+    @property
+    @abstractmethod
+    def is_leader(self) -> bool:
+        """Является ли текущая реплика лидером."""
+        pass
+
+    @abstractmethod
+    async def wait_until_leader(self) -> None:
+        """Дождаться, пока текущая реплика станет лидером."""
+        pass
+
+    @abstractmethod
+    def add_listener(
+        self,
+        on_elected: Optional[LeadershipCallback] = None,
+        on_revoked: Optional[LeadershipCallback] = None,
+    ) -> None:
+        """Подписаться на получение и потерю лидерства."""
+        pass
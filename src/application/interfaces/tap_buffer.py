@@ -0,0 +1,20 @@
+from abc import ABC, abstractmethod
+
+
+class TapBuffer(ABC):
+    """Интерфейс буфера нажатий, который накапливает приросты перед записью в базу."""
+
+    @abstractmethod
+    def add(self, user_id: int, amount: int = 1) -> int:
+        """Добавить нажатия пользователя в буфер и вернуть еще не сохраненный прирост."""
+        pass
+
+    @abstractmethod
+    def pending(self, user_id: int) -> int:
+        """Получить количество нажатий пользователя, еще не сохраненных в базе."""
+        pass
+
+    @abstractmethod
+    async def flush(self) -> int:
+        """Записать накопленные нажатия в базу и вернуть их количество."""
+        pass
@@ -0,0 +1,40 @@
+from abc import ABC, abstractmethod
+from typing import Sequence
+
+
+class UserRegistry(ABC):
+    """Интерфейс реестра зарегистрированных Telegram ID для быстрых проверок регистрации."""
+
+    @abstractmethod
+    async def is_registered(self, telegram_id: int) -> bool:
+        """Проверить, зарегистрирован ли пользователь с таким Telegram ID."""
+        pass
+
+    @abstractmethod
+    def might_contain(self, telegram_id: int) -> bool:
+        """Проверить без обращения к базе: False означает, что пользователь точно не зарегистрирован."""
+        pass
+
+    @abstractmethod
+    def note_absent(self, telegram_id: int) -> None:
+        """Запомнить, что пользователя с таким Telegram ID нет в базе."""
+        pass
+
+    @abstractmethod
+    def add(self, telegram_id: int) -> None:
+        """Отметить Telegram ID как зарегистрированный."""
+        pass
+
+    @abstractmethod
+    def discard(self, telegram_id: int) -> None:
+        """Отметить, что пользователь с таким Telegram ID удален."""
+        pass
+
+
+class RegistrationFeed(ABC):
+    """Интерфейс оповещения реестров всех процессов о новых пользователях."""
+
+    @abstractmethod
+    async def publish(self, telegram_ids: Sequence[int]) -> None:
+        """Сообщить реестрам о зарегистрированных Telegram ID."""
+        pass
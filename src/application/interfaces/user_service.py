@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List
+from typing import Any, AsyncIterator, Dict, Optional, List, Sequence, Tuple
 
 from ...domain.entities.user import User
 
@@ -40,4 +40,36 @@ class UserService(ABC):
     @abstractmethod
     async def list_active(self) -> List[User]:
         """Получить список активных пользователей."""
-        pass 
\ No newline at end of file
+        pass 
+
+    @abstractmethod
+    def iter_users(
+        self,
+        after_id: int = 0,
+        limit: Optional[int] = None,
+        active_only: bool = False,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[User]:
+        """Потоково обойти пользователей с ID больше after_id по возрастанию ID."""
+        pass
+
+    @abstractmethod
+    def iter_user_rows(
+        self,
+        after_id: int = 0,
+        limit: Optional[int] = None,
+        active_only: bool = False,
+        batch_size: int = 1000,
+        columns: Optional[Sequence[str]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Потоково обойти пользователей как словари значений колонок без создания сущностей."""
+        pass
+
+    @abstractmethod
+    def iter_active_telegram_ids(
+        self,
+        batch_size: int = 1000,
+        after_id: int = 0,
+    ) -> AsyncIterator[List[Tuple[int, int]]]:
+        """Постранично обойти пары (ID, Telegram ID) активных пользователей с ID больше after_id."""
+        pass
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional, Tuple
 
 from ...domain.entities.user import User
 from ...domain.repositories.rating_repository import RatingRepository
@@ -12,7 +12,7 @@ class RatingService(ABC):
         self.rating_repository = rating_repository
     
     @abstractmethod
-    async def increment_taps(self, user_id: int) -> User:
+    async def increment_taps(self, user_id: int, amount: int = 1) -> User:
         """Увеличить количество нажатий пользователя."""
         pass
     
@@ -21,6 +21,26 @@ class RatingService(ABC):
         """Получить список пользователей с наивысшим рейтингом."""
         pass
     
+    @abstractmethod
+    async def get_rating_page(self, limit: int, after: Optional[Tuple[int, int]] = None) -> List[User]:
+        """Получить страницу рейтинга после курсора (taps, id) последней записи."""
+        pass
+    
+    @abstractmethod
+    async def get_user_by_telegram_id(self, telegram_id: int) -> Optional[User]:
+        """Получить пользователя по Telegram ID."""
+        pass
+    
+    @abstractmethod
+    async def get_user_rank(self, user_id: int) -> Optional[int]:
+        """Получить место пользователя в рейтинге."""
+        pass
+    
+    @abstractmethod
+    async def get_users_around(self, user_id: int, radius: int = 2) -> List[User]:
+        """Получить соседей пользователя по рейтингу."""
+        pass
+    
     @abstractmethod
     async def get_total_taps(self) -> int:
         """Получить общее количество нажатий всех пользователей."""
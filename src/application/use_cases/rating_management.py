@@ -1,23 +1,147 @@
-from typing import List
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
 
+from ..interfaces.tap_buffer import TapBuffer
 from ..services.rating_service import RatingService
 from ...domain.entities.user import User
 
 
+@dataclass(frozen=True)
+class RatingSnapshot:
+    """Снимок общей части экрана рейтинга: топ пользователей и общее количество нажатий."""
+    
+    top_users: List[User]
+    total_taps: int
+
+
 class RatingManagementUseCase:
     """Use case для управления рейтингом пользователей."""
     
-    def __init__(self, rating_service: RatingService):
+    def __init__(
+        self,
+        rating_service: RatingService,
+        tap_buffer: Optional[TapBuffer] = None,
+        snapshot_ttl: float = 0.0,
+    ):
         self.rating_service = rating_service
+        self.tap_buffer = tap_buffer
+        
+        # Кэш снимков рейтинга по размеру топа: (снимок, момент устаревания)
+        self.snapshot_ttl = snapshot_ttl
+        self._snapshots: Dict[int, Tuple[RatingSnapshot, float]] = {}
+        self._snapshot_loads: Dict[int, asyncio.Task] = {}
+        self.snapshot_hits = 0
+        self.snapshot_misses = 0
+        self.snapshot_coalesced = 0
     
-    async def increment_taps(self, user_id: int) -> User:
+    async def increment_taps(self, user_id: int, amount: int = 1) -> User:
         """Увеличить количество нажатий пользователя."""
-        return await self.rating_service.increment_taps(user_id)
+        return await self.rating_service.increment_taps(user_id, amount)
+    
+    async def add_tap(self, user: User) -> int:
+        """Зарегистрировать нажатие и вернуть актуальное количество нажатий пользователя.
+        
+        Если подключен буфер нажатий, запись в базу откладывается, а результат
+        считается как сохраненное значение плюс еще не сброшенный прирост.
+        """
+        if self.tap_buffer is None:
+            updated_user = await self.rating_service.increment_taps(user.id)
+            return updated_user.taps
+        
+        self.tap_buffer.add(user.id)
+        return self.get_user_taps(user)
+    
+    def get_user_taps(self, user: User) -> int:
+        """Получить количество нажатий пользователя с учетом еще не сохраненных."""
+        if self.tap_buffer is None:
+            return user.taps
+        return user.taps + self.tap_buffer.pending(user.id)
     
     async def get_top_users(self, limit: int = 10) -> List[User]:
         """Получить список пользователей с наивысшим рейтингом."""
         return await self.rating_service.get_top_users(limit)
     
+    async def get_rating_snapshot(self, limit: int = 10) -> RatingSnapshot:
+        """Получить топ пользователей и общее количество нажатий из кэша.
+        
+        Снимок живет snapshot_ttl секунд. Если снимка нет, его загружает только
+        один запрос, а остальные одновременные запросы ждут тот же результат.
+        """
+        cached = self._snapshots.get(limit)
+        if cached is not None and cached[1] > time.monotonic():
+            self.snapshot_hits += 1
+            return cached[0]
+        
+        task = self._snapshot_loads.get(limit)
+        if task is None:
+            self.snapshot_misses += 1
+            # Загрузка идет отдельной задачей, чтобы отмена одного запроса не обрывала ее для остальных
+            task = asyncio.create_task(self._load_rating_snapshot(limit))
+            self._snapshot_loads[limit] = task
+            task.add_done_callback(lambda _: self._snapshot_loads.pop(limit, None))
+        else:
+            self.snapshot_coalesced += 1
+        
+        return await asyncio.shield(task)
+    
+    def get_snapshot_stats(self) -> Dict[str, int]:
+        """Получить счетчики попаданий и промахов кэша снимков рейтинга."""
+        return {
+            "hits": self.snapshot_hits,
+            "misses": self.snapshot_misses,
+            "coalesced": self.snapshot_coalesced,
+        }
+    
+    async def _load_rating_snapshot(self, limit: int) -> RatingSnapshot:
+        """Загрузить снимок рейтинга и положить его в кэш."""
+        snapshot = RatingSnapshot(
+            top_users=await self.rating_service.get_top_users(limit),
+            total_taps=await self.rating_service.get_total_taps(),
+        )
+        if self.snapshot_ttl > 0:
+            self._snapshots[limit] = (snapshot, time.monotonic() + self.snapshot_ttl)
+        return snapshot
+    
+    async def get_user_rank(self, user_id: int, snapshot: Optional[RatingSnapshot] = None) -> Optional[int]:
+        """Получить место пользователя в рейтинге.
+        
+        Если пользователь есть в переданном снимке топа, место считается по снимку без запроса.
+        """
+        if snapshot is not None:
+            for top_user in snapshot.top_users:
+                if top_user.id == user_id:
+                    return 1 + sum(1 for other in snapshot.top_users if other.taps > top_user.taps)
+        return await self.rating_service.get_user_rank(user_id)
+    
+    async def get_rating_page(
+        self,
+        limit: int,
+        after: Optional[Tuple[int, int]] = None,
+    ) -> Tuple[List[User], Optional[Tuple[int, int]]]:
+        """Получить страницу рейтинга и курсор (taps, id) следующей страницы.
+        
+        Курсор равен None, если страница последняя.
+        """
+        # Запрашиваем на одну запись больше, чтобы узнать, есть ли следующая страница
+        users = await self.rating_service.get_rating_page(limit + 1, after)
+        if len(users) <= limit:
+            return users, None
+        users = users[:limit]
+        return users, (users[-1].taps, users[-1].id)
+    
+    async def get_user_position(self, telegram_id: int) -> Optional[Tuple[User, int]]:
+        """Получить пользователя по Telegram ID и его место в рейтинге."""
+        user = await self.rating_service.get_user_by_telegram_id(telegram_id)
+        if user is None:
+            return None
+        return user, await self.rating_service.get_user_rank(user.id)
+    
+    async def get_users_around(self, user_id: int, radius: int = 2) -> List[User]:
+        """Получить соседей пользователя по рейтингу."""
+        return await self.rating_service.get_users_around(user_id, radius)
+    
     async def get_total_taps(self) -> int:
         """Получить общее количество нажатий всех пользователей."""
         return await self.rating_service.get_total_taps()
@@ -1,6 +1,7 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, AsyncIterator, Dict, Optional, List, Sequence, Tuple
 
+from ..interfaces.user_registry import RegistrationFeed, UserRegistry
 from ..interfaces.user_service import UserService
 from ...domain.entities.user import User
 
@@ -8,8 +9,21 @@ from ...domain.entities.user import User
 class UserManagementUseCase:
     """Use case для управления пользователями."""
 
-    def __init__(self, user_service: UserService):
+    def __init__(
+        self,
+        user_service: UserService,
+        user_registry: Optional[UserRegistry] = None,
+        registration_feed: Optional[RegistrationFeed] = None,
+    ):
         self._user_service = user_service
+        self._user_registry = user_registry
+        self._registration_feed = registration_feed
+
+    async def is_registered(self, telegram_id: int) -> bool:
+        """Проверить, зарегистрирован ли пользователь с таким Telegram ID."""
+        if self._user_registry is not None:
+            return await self._user_registry.is_registered(telegram_id)
+        return await self._user_service.get_by_telegram_id(telegram_id) is not None
 
     async def get_user(self, user_id: int) -> Optional[User]:
         """Получить пользователя по ID."""
@@ -19,6 +33,18 @@ class UserManagementUseCase:
         """Получить пользователя по Telegram ID."""
         return await self._user_service.get_by_telegram_id(telegram_id)
 
+    async def get_registered_user(self, telegram_id: int) -> Optional[User]:
+        """Получить пользователя по Telegram ID, пропуская запрос для точно незарегистрированных."""
+        if self._user_registry is None:
+            return await self._user_service.get_by_telegram_id(telegram_id)
+        
+        if not self._user_registry.might_contain(telegram_id):
+            return None
+        user = await self._user_service.get_by_telegram_id(telegram_id)
+        if user is None:
+            self._user_registry.note_absent(telegram_id)
+        return user
+
     async def create_user(
         self,
         telegram_id: int,
@@ -37,7 +63,13 @@ class UserManagementUseCase:
             created_at=now,
             updated_at=now,
         )
-        return await self._user_service.create(user)
+        user = await self._user_service.create(user)
+        if self._user_registry is not None:
+            self._user_registry.add(user.telegram_id)
+        # Реестры других процессов узнают о пользователе только из оповещения
+        if self._registration_feed is not None:
+            await self._registration_feed.publish([user.telegram_id])
+        return user
 
     async def update_user(self, user: User) -> User:
         """Обновить существующего пользователя."""
@@ -46,7 +78,10 @@ class UserManagementUseCase:
 
     async def delete_user(self, user_id: int) -> None:
         """Удалить пользователя."""
+        user = await self._user_service.get_by_id(user_id) if self._user_registry is not None else None
         await self._user_service.delete(user_id)
+        if user is not None:
+            self._user_registry.discard(user.telegram_id)
 
     async def list_all_users(self) -> List[User]:
         """Получить список всех пользователей."""
@@ -54,4 +89,58 @@ class UserManagementUseCase:
 
     async def list_active_users(self) -> List[User]:
         """Получить список активных пользователей."""
-        return await self._user_service.list_active() 
\ No newline at end of file
+        return await self._user_service.list_active() 
+
+    async def get_user_rows_page(
+        self,
+        limit: int,
+        after_id: int = 0,
+        active_only: bool = False,
+        columns: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Получить страницу пользователей с ID больше after_id в виде словарей колонок.
+        
+        Возвращает строки и ID, с которого начинается следующая страница,
+        или None, если страница последняя. Колонка id нужна для курсора, поэтому
+        читается всегда, но в строки попадает только если была запрошена.
+        """
+        strip_id = columns is not None and "id" not in columns
+        selected = [*columns, "id"] if strip_id else columns
+        # Читаем на одну запись больше, чтобы узнать, есть ли следующая страница
+        page = self._user_service.iter_user_rows(after_id, limit + 1, active_only, limit + 1, selected)
+        rows = [row async for row in page]
+        next_id = rows[limit - 1]["id"] if len(rows) > limit else None
+        rows = rows[:limit]
+        if strip_id:
+            for row in rows:
+                del row["id"]
+        return rows, next_id
+
+    def iter_users(
+        self,
+        after_id: int = 0,
+        limit: Optional[int] = None,
+        active_only: bool = False,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[User]:
+        """Потоково обойти пользователей с ID больше after_id, не загружая всех в память."""
+        return self._user_service.iter_users(after_id, limit, active_only, batch_size)
+
+    def iter_user_rows(
+        self,
+        after_id: int = 0,
+        limit: Optional[int] = None,
+        active_only: bool = False,
+        batch_size: int = 1000,
+        columns: Optional[Sequence[str]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Потоково обойти пользователей как словари значений колонок для выдачи наружу без создания сущностей."""
+        return self._user_service.iter_user_rows(after_id, limit, active_only, batch_size, columns)
+
+    def iter_active_telegram_ids(
+        self,
+        batch_size: int = 1000,
+        after_id: int = 0,
+    ) -> AsyncIterator[List[Tuple[int, int]]]:
+        """Постранично обойти пары (ID, Telegram ID) активных пользователей, например для рассылки."""
+        return self._user_service.iter_active_telegram_ids(batch_size, after_id)
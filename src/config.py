@@ -19,10 +19,24 @@ class Settings(BaseSettings):
     POSTGRES_HOST: str
     POSTGRES_PORT: int
     
+    # Database pool
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SEC: int = 30
+    DB_POOL_RECYCLE_SEC: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    
+    # Read replicas
+    DATABASE_REPLICA_URLS: list[str] = []
+    DB_READ_YOUR_WRITES_SEC: float = 5.0
+    
     # API
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
     API_PREFIX: str = "/api/v1"
+    # Ответы больше этого размера (в байтах) сжимаются gzip, если клиент его принимает
+    API_GZIP_MIN_SIZE: int = 1024
     
     # Redis
     REDIS_HOST: str = "localhost"
@@ -38,6 +52,60 @@ class Settings(BaseSettings):
     # Bot settings
     REGISTER_PASSPHRASE: str
     
+    # Leaderboard
+    LEADERBOARD_ENABLED: bool = False
+    LEADERBOARD_KEY: str = "leaderboard:taps"
+    RATING_TOTAL_RECONCILE_INTERVAL_SEC: int = 300
+    RATING_SNAPSHOT_TTL_SEC: float = 2.0
+    
+    # Tap buffer
+    TAP_BUFFER_ENABLED: bool = False
+    TAP_BUFFER_FLUSH_INTERVAL_MS: int = 500
+    TAP_BUFFER_MAX_PENDING: int = 1000
+    
+    # User registry (Bloom-фильтр зарегистрированных telegram_id)
+    USER_REGISTRY_ENABLED: bool = True
+    USER_REGISTRY_CAPACITY: int = 1_000_000
+    USER_REGISTRY_ERROR_RATE: float = 0.01
+    # Канал Redis, через который процессы сообщают друг другу о новых пользователях
+    USER_REGISTRY_CHANNEL: str = "users:registered"
+    # Периодическое перестроение только убирает удаленных пользователей; 0 — выключено
+    USER_REGISTRY_RELOAD_INTERVAL_SEC: int = 0
+    USER_REGISTRY_ABSENT_TTL_SEC: int = 60
+    
+    # Outbound (общие лимиты исходящих запросов к Bot API)
+    OUTBOUND_RATE_PER_SEC: float = 25.0
+    OUTBOUND_CHAT_INTERVAL_SEC: float = 1.0
+    OUTBOUND_CHAT_BURST: int = 3
+    
+    # Broadcast (рассылка дайджеста в пределах лимитов Telegram)
+    BROADCAST_RATE_PER_SEC: float = 20.0
+    BROADCAST_CONCURRENCY: int = 10
+    BROADCAST_CHAT_INTERVAL_SEC: float = 1.0
+    BROADCAST_MAX_ATTEMPTS: int = 5
+    BROADCAST_PROGRESS_TTL_SEC: int = 172800
+    
+    # Webhook (вместо long polling; WEBHOOK_URL — публичный адрес, на который Telegram присылает обновления)
+    WEBHOOK_ENABLED: bool = False
+    WEBHOOK_URL: str = ""
+    WEBHOOK_PATH: str = "/webhook"
+    WEBHOOK_SECRET: str | None = None
+    WEBHOOK_HOST: str = "0.0.0.0"
+    WEBHOOK_PORT: int = 8080
+    WEBHOOK_MAX_CONNECTIONS: int = 40
+    
+    # Bot workers (0 — один процесс; иначе прием обновлений и столько процессов-обработчиков)
+    BOT_WORKERS: int = 0
+    BOT_WORKER_MAX_IN_FLIGHT: int = 100
+    # Сверх этого прием обновлений ждет, пока обработчик пользователя не освободит место
+    BOT_WORKER_MAX_PENDING_PER_USER: int = 20
+    BOT_WORKER_QUEUE_SIZE: int = 10000
+    
+    # Leader election (при нескольких репликах планировщик и long polling работают только у лидера)
+    LEADER_ELECTION_ENABLED: bool = False
+    LEADER_ELECTION_KEY: str = "leader:bot"
+    LEADER_LEASE_SEC: float = 10.0
+    
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -1,8 +1,10 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from pydantic import BaseModel, Field
 
+_object_setattr = object.__setattr__
+
 
 class User(BaseModel):
     """Сущность пользователя."""
@@ -23,4 +25,19 @@ class User(BaseModel):
     photo: Optional[str] = Field(default=None, description="URL фотографии пользователя")
     
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+    
+    @classmethod
+    def from_trusted(cls, values: Dict[str, Any]) -> "User":
+        """Создать сущность из уже проверенных данных без валидации pydantic.
+        
+        Для строк из базы, где типы гарантирует схема. values должен содержать
+        все поля сущности и принадлежит созданному объекту. Делает то же, что
+        model_construct, но без разбора алиасов и значений по умолчанию.
+        """
+        user = cls.__new__(cls)
+        _object_setattr(user, "__dict__", values)
+        _object_setattr(user, "__pydantic_fields_set__", set(values))
+        _object_setattr(user, "__pydantic_extra__", None)
+        _object_setattr(user, "__pydantic_private__", None)
+        return user 
\ No newline at end of file
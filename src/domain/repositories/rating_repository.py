@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
 from ..entities.user import User
 
@@ -8,8 +8,19 @@ class RatingRepository(ABC):
     """Интерфейс репозитория для работы с рейтингом пользователей."""
     
     @abstractmethod
-    async def increment_taps(self, user_id: int) -> User:
-        """Увеличить количество нажатий пользователя."""
+    async def increment_taps(self, user_id: int, amount: int = 1) -> Optional[User]:
+        """Атомарно увеличить количество нажатий пользователя.
+        
+        Выполняется одним запросом UPDATE ... RETURNING, без чтения строки перед записью.
+        """
+        pass
+    
+    @abstractmethod
+    async def increment_taps_many(self, deltas: Dict[int, int]) -> Dict[int, int]:
+        """Увеличить количество нажатий нескольких пользователей одним запросом.
+        
+        Принимает словарь {user_id: прирост}, возвращает {user_id: новое количество нажатий}.
+        """
         pass
     
     @abstractmethod
@@ -17,6 +28,36 @@ class RatingRepository(ABC):
         """Получить список пользователей с наивысшим рейтингом."""
         pass
     
+    @abstractmethod
+    async def get_rating_page(self, limit: int, after: Optional[Tuple[int, int]] = None) -> List[User]:
+        """Получить страницу рейтинга в порядке (taps DESC, id) после курсора (taps, id) последней записи."""
+        pass
+    
+    @abstractmethod
+    async def get_user_by_telegram_id(self, telegram_id: int) -> Optional[User]:
+        """Получить пользователя по Telegram ID."""
+        pass
+    
+    @abstractmethod
+    async def get_user_rank(self, user_id: int) -> Optional[int]:
+        """Получить место пользователя в рейтинге (1 + число пользователей с большим количеством нажатий)."""
+        pass
+    
+    @abstractmethod
+    async def get_users_around(self, user_id: int, radius: int = 2) -> List[User]:
+        """Получить соседей пользователя по рейтингу: до radius выше и ниже него, включая его самого."""
+        pass
+    
+    @abstractmethod
+    async def get_users_by_ids(self, user_ids: List[int]) -> List[User]:
+        """Получить пользователей по списку ID."""
+        pass
+    
+    @abstractmethod
+    def iter_user_taps(self, batch_size: int = 1000) -> AsyncIterator[List[Tuple[int, int]]]:
+        """Постранично обойти пары (user_id, taps) всех пользователей."""
+        pass
+    
     @abstractmethod
     async def get_total_taps(self) -> int:
         """Получить общее количество нажатий всех пользователей."""
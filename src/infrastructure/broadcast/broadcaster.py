@@ -0,0 +1,208 @@
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, List, Optional, Set, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramForbiddenError,
+    TelegramNetworkError,
+    TelegramRetryAfter,
+    TelegramServerError,
+)
+from loguru import logger
+
+from ...application.interfaces.broadcast_progress import BroadcastProgress, BroadcastProgressStore
+from ..telegram.outbound import BROADCAST, outbound_lane
+from .rate_limit import LOW_PRIORITY, ChatPacer, TokenBucket
+
+# Получатель рассылки: (ID пользователя, ID чата)
+Recipient = Tuple[int, int]
+# Источник получателей по возрастанию ID пользователя, начиная после переданного ID
+RecipientSource = Callable[[int], AsyncIterator[Recipient]]
+
+SENT = "sent"
+FAILED = "failed"
+BLOCKED = "blocked"
+
+
+class _Watermark:
+    """Курсор рассылки при параллельной отправке.
+    
+    Сообщения завершаются не по порядку, поэтому курсор сдвигается только
+    до ID, перед которым все получатели уже обработаны.
+    """
+
+    def __init__(self, cursor: int):
+        self.cursor = cursor
+        self._dispatched: Deque[int] = deque()
+        self._done: Set[int] = set()
+
+    def dispatch(self, user_id: int) -> None:
+        self._dispatched.append(user_id)
+
+    def complete(self, user_id: int) -> None:
+        self._done.add(user_id)
+        while self._dispatched and self._dispatched[0] in self._done:
+            self.cursor = self._dispatched.popleft()
+            self._done.discard(self.cursor)
+
+    @property
+    def completed(self) -> List[int]:
+        """Обработанные получатели после курсора."""
+        return sorted(self._done)
+
+
+class Broadcaster:
+    """Рассылка одного сообщения множеству пользователей в пределах лимитов Telegram.
+    
+    - не больше ``concurrency`` одновременных запросов;
+    - темп рассылки задает ``TokenBucket`` (по умолчанию 25 сообщений в секунду
+      при лимите Telegram около 30); если бот работает через OutboundScheduler,
+      это доля рассылки в общем лимите, а запросы идут по полосе BROADCAST
+      и уступают ответам пользователям;
+    - между сообщениями в один чат не меньше ``chat_interval`` секунд;
+    - ``TelegramRetryAfter`` останавливает всю рассылку на ``retry_after``
+      секунд, после чего сообщение отправляется повторно;
+    - пользователи, заблокировавшие бота, считаются отдельно от ошибок.
+    
+    Прогресс сохраняется каждые ``save_every`` обработанных сообщений, поэтому
+    рассылка, прерванная падением, продолжается с курсора, пропуская получателей
+    после него, которые уже были обработаны. Сообщения, отправленные после
+    последнего сохранения, при возобновлении могут уйти повторно, но в счетчиках
+    каждый получатель учитывается один раз: они сохраняются вместе с курсором.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        rate: float = 25.0,
+        concurrency: int = 10,
+        chat_interval: float = 1.0,
+        max_attempts: int = 5,
+        progress_store: Optional[BroadcastProgressStore] = None,
+        save_every: int = 100,
+        bucket: Optional[TokenBucket] = None,
+    ):
+        self._bot = bot
+        self._bucket = bucket or TokenBucket(rate)
+        self._pacer = ChatPacer(chat_interval)
+        self._concurrency = concurrency
+        self._max_attempts = max_attempts
+        self._progress_store = progress_store
+        self._save_every = save_every
+        self._save_lock = asyncio.Lock()
+        
+        self.retries = 0
+
+    async def get_progress(self, broadcast_id: str) -> Optional[BroadcastProgress]:
+        """Получить сохраненный прогресс рассылки."""
+        if self._progress_store is None:
+            return None
+        return await self._progress_store.load(broadcast_id)
+
+    async def run(self, broadcast_id: str, recipients: RecipientSource, text: str) -> BroadcastProgress:
+        """Выполнить или возобновить рассылку и вернуть ее итоговый прогресс.
+        
+        При возобновлении отправляется сохраненный текст, чтобы все получатели
+        одной рассылки получили одинаковое сообщение.
+        """
+        progress = await self.get_progress(broadcast_id) or BroadcastProgress(text=text)
+        if progress.finished:
+            logger.info(f"Broadcast {broadcast_id} is already finished")
+            return progress
+        if progress.cursor:
+            logger.info(f"Resuming broadcast {broadcast_id} after user {progress.cursor}")
+        
+        watermark = _Watermark(progress.cursor)
+        # Получатели после курсора, обработанные до прерывания, уже учтены в счетчиках
+        completed = set(progress.completed)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._concurrency * 2)
+        # Полоса BROADCAST наследуется задачами отправителей
+        with outbound_lane(BROADCAST):
+            workers = [
+                asyncio.create_task(self._worker(broadcast_id, queue, progress, watermark))
+                for _ in range(self._concurrency)
+            ]
+        
+        try:
+            async for user_id, chat_id in recipients(progress.cursor):
+                watermark.dispatch(user_id)
+                if user_id in completed:
+                    watermark.complete(user_id)
+                    continue
+                await queue.put((user_id, chat_id))
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        except BaseException:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            # Сохраняем то, что успели, чтобы следующий запуск продолжил с этого места
+            await self._save(broadcast_id, progress, watermark)
+            raise
+        
+        progress.finished = True
+        await self._save(broadcast_id, progress, watermark)
+        logger.info(
+            f"Broadcast {broadcast_id} finished: sent={progress.sent} "
+            f"failed={progress.failed} blocked={progress.blocked} retries={self.retries}"
+        )
+        return progress
+
+    async def _worker(
+        self,
+        broadcast_id: str,
+        queue: asyncio.Queue,
+        progress: BroadcastProgress,
+        watermark: _Watermark,
+    ) -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            
+            user_id, chat_id = item
+            outcome = await self._deliver(chat_id, progress.text)
+            setattr(progress, outcome, getattr(progress, outcome) + 1)
+            watermark.complete(user_id)
+            
+            if (progress.sent + progress.failed + progress.blocked) % self._save_every == 0:
+                await self._save(broadcast_id, progress, watermark)
+
+    async def _deliver(self, chat_id: int, text: str) -> str:
+        """Отправить сообщение в чат с повторами и вернуть результат отправки."""
+        for attempt in range(1, self._max_attempts + 1):
+            await self._pacer.wait(chat_id)
+            await self._bucket.acquire(LOW_PRIORITY)
+            try:
+                await self._bot.send_message(chat_id, text)
+                return SENT
+            except TelegramRetryAfter as e:
+                # Ограничение действует на весь бот: приостанавливаем всех отправителей
+                logger.warning(f"Flood control, pausing broadcast for {e.retry_after}s")
+                self._bucket.pause(e.retry_after)
+            except TelegramForbiddenError:
+                return BLOCKED
+            except (TelegramNetworkError, TelegramServerError) as e:
+                logger.warning(f"Failed to send message to chat {chat_id} (attempt {attempt}): {e}")
+                await asyncio.sleep(min(2 ** (attempt - 1), 30))
+            except Exception as e:
+                logger.error(f"Failed to send message to chat {chat_id}: {e}")
+                return FAILED
+            self.retries += 1
+        
+        logger.error(f"Giving up sending message to chat {chat_id} after {self._max_attempts} attempts")
+        return FAILED
+
+    async def _save(self, broadcast_id: str, progress: BroadcastProgress, watermark: _Watermark) -> None:
+        if self._progress_store is None:
+            return
+        async with self._save_lock:
+            # Курсор, список обработанных после него и счетчики сохраняются из одного состояния
+            progress.cursor = watermark.cursor
+            progress.completed = watermark.completed
+            try:
+                await self._progress_store.save(broadcast_id, progress)
+            except Exception as e:
+                logger.error(f"Failed to save progress of broadcast {broadcast_id}: {e}")
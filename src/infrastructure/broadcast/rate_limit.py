@@ -0,0 +1,164 @@
+import asyncio
+import heapq
+import itertools
+import multiprocessing
+import time
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+# Приоритеты ожидающих токен: меньшее значение обслуживается раньше
+HIGH_PRIORITY = 0
+LOW_PRIORITY = 1
+
+
+class TokenBucket:
+    """Общий лимит отправки: не больше ``rate`` запросов в секунду с запасом ``capacity``.
+    
+    Ожидающие получают токены по приоритету, а при равном приоритете — по
+    очереди. ``pause`` останавливает выдачу токенов целиком — так соблюдается
+    ``retry_after``, который Telegram назначает всему боту, а не отдельному чату.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        # По умолчанию без всплесков: запросы идут ровно через 1/rate секунды
+        self.capacity = capacity if capacity is not None else 1.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        
+        # Очередь ожидающих (приоритет, порядковый номер, future) и задача, раздающая им токены
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _try_take(self, now: float) -> float:
+        """Забрать токен и вернуть 0, а если его нет — вернуть, сколько ждать следующего."""
+        if now < self._paused_until:
+            return self._paused_until - now
+        self._refill(now)
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    async def acquire(self, priority: int = HIGH_PRIORITY) -> None:
+        """Дождаться и забрать один токен."""
+        if not self._waiters and self._try_take(time.monotonic()) == 0:
+            return
+        
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        await future
+
+    async def _dispatch(self) -> None:
+        """Раздача токенов ожидающим, пока очередь не опустеет."""
+        while self._waiters:
+            # Ожидание могли отменить, пока оно стояло в очереди
+            if self._waiters[0][2].done():
+                heapq.heappop(self._waiters)
+                continue
+            
+            delay = self._try_take(time.monotonic())
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            
+            _, _, future = heapq.heappop(self._waiters)
+            future.set_result(None)
+
+    def pause(self, seconds: float) -> None:
+        """Не выдавать токены ближайшие ``seconds`` секунд."""
+        now = time.monotonic()
+        self._paused_until = max(self._paused_until, now + seconds)
+        # После паузы отправка начинается с пустого ведра, без всплеска
+        self._tokens = 0.0
+        self._updated = self._paused_until
+
+    @property
+    def paused_for(self) -> float:
+        """Сколько секунд еще длится пауза."""
+        return max(0.0, self._paused_until - time.monotonic())
+
+    def waiting(self, priority: Optional[int] = None) -> int:
+        """Количество ожидающих токен, всего или с заданным приоритетом."""
+        return sum(
+            1 for waiter_priority, _, future in self._waiters
+            if not future.done() and (priority is None or waiter_priority == priority)
+        )
+
+
+class SharedTokenBucket(TokenBucket):
+    """Ведро токенов, общее для нескольких процессов одной машины.
+    
+    Токены, время пополнения и конец паузы хранятся в разделяемой памяти
+    (``create_state``), которую процессы получают при запуске. Общими
+    становятся и лимит, и пауза ``retry_after``. Приоритет ожидающих
+    действует внутри процесса, между процессами токены достаются по мере
+    готовности.
+    """
+
+    def __init__(self, rate: float, state: Any):
+        super().__init__(rate, capacity=state[0])
+        self._state = state
+
+    @staticmethod
+    def create_state(context: Any = multiprocessing, capacity: float = 1.0) -> Any:
+        """Создать разделяемое состояние ведра: [токены, время пополнения, конец паузы]."""
+        return context.Array("d", [capacity, time.monotonic(), 0.0])
+
+    def _try_take(self, now: float) -> float:
+        with self._state.get_lock():
+            tokens, updated, paused_until = self._state[:]
+            if now < paused_until:
+                return paused_until - now
+            # Другой процесс мог записать более позднее время, пока этот ждал блокировку
+            tokens = min(self.capacity, tokens + max(0.0, now - updated) * self.rate)
+            taken = tokens >= 1
+            self._state[0] = tokens - 1 if taken else tokens
+            self._state[1] = max(now, updated)
+        return 0.0 if taken else (1 - tokens) / self.rate
+
+    def pause(self, seconds: float) -> None:
+        """Не выдавать токены ближайшие ``seconds`` секунд во всех процессах."""
+        with self._state.get_lock():
+            paused_until = max(self._state[2], time.monotonic() + seconds)
+            self._state[:] = [0.0, paused_until, paused_until]
+
+    @property
+    def paused_for(self) -> float:
+        """Сколько секунд еще длится пауза."""
+        return max(0.0, self._state[2] - time.monotonic())
+
+
+class ChatPacer:
+    """Лимит сообщений в один чат: Telegram допускает около одного сообщения в секунду на чат.
+    
+    Каждый чат — свое ведро токенов (алгоритм GCRA): в среднем одно сообщение
+    раз в ``interval`` секунд и не больше ``burst`` сообщений подряд.
+    """
+
+    def __init__(self, interval: float = 1.0, burst: int = 1, max_chats: int = 10000):
+        self._interval = interval
+        self._tolerance = (burst - 1) * interval
+        self._max_chats = max_chats
+        # Теоретическое время следующего сообщения в чат; прошедшее значит, что ведро полное
+        self._next_at: Dict[Hashable, float] = {}
+
+    async def wait(self, chat_id: Hashable) -> None:
+        """Занять ближайшее свободное время отправки в чат и дождаться его."""
+        now = time.monotonic()
+        next_at = max(now, self._next_at.get(chat_id, now))
+        slot = max(now, next_at - self._tolerance)
+        self._next_at[chat_id] = next_at + self._interval
+        
+        if len(self._next_at) > self._max_chats:
+            self._next_at = {chat: at for chat, at in self._next_at.items() if at > now}
+        
+        if slot > now:
+            await asyncio.sleep(slot - now)
@@ -0,0 +1,120 @@
+import asyncio
+from typing import Callable, Dict, Optional, Set
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ...application.interfaces.tap_buffer import TapBuffer
+from ...domain.repositories.rating_repository import RatingRepository
+from ..database.repositories.rating_repository_impl import RatingRepositoryImpl
+from ..database.routing import current_actor, note_actor_writes
+
+
+class WriteBehindTapBuffer(TapBuffer):
+    """Буфер нажатий с отложенной записью.
+    
+    Нажатия копятся в памяти по пользователям и сбрасываются в базу одним
+    многострочным UPDATE раз в ``flush_interval`` секунд или как только
+    накопится ``max_pending`` нажатий.
+    
+    Запись идет из фоновой задачи, поэтому после сброса окно read-your-writes
+    открывается для пользователей, чьи нажатия сброшены: их следующее чтение
+    не уйдет на реплику, которая еще не видит эти нажатия.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        flush_interval: float = 0.5,
+        max_pending: int = 1000,
+        repository_factory: Optional[Callable[[AsyncSession], RatingRepository]] = None,
+    ):
+        self._session_factory = session_factory
+        self._repository_factory = repository_factory or RatingRepositoryImpl
+        self._flush_interval = flush_interval
+        self._max_pending = max_pending
+        
+        self._pending: Dict[int, int] = {}
+        self._pending_total = 0
+        # Пользователи (database_actor), от имени которых добавлены нажатия
+        self._actors: Set[int] = set()
+        # Приросты, которые сейчас записываются в базу: их тоже нужно учитывать в pending()
+        self._inflight: Dict[int, int] = {}
+        
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, user_id: int, amount: int = 1) -> int:
+        """Добавить нажатия пользователя в буфер и вернуть еще не сохраненный прирост."""
+        self._pending[user_id] = self._pending.get(user_id, 0) + amount
+        self._pending_total += amount
+        actor = current_actor()
+        if actor is not None:
+            self._actors.add(actor)
+        
+        if self._pending_total >= self._max_pending:
+            self._wakeup.set()
+        
+        return self.pending(user_id)
+
+    def pending(self, user_id: int) -> int:
+        """Получить количество нажатий пользователя, еще не сохраненных в базе."""
+        return self._pending.get(user_id, 0) + self._inflight.get(user_id, 0)
+
+    async def flush(self) -> int:
+        """Записать накопленные нажатия в базу и вернуть их количество."""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            
+            batch, flushed, actors = self._pending, self._pending_total, self._actors
+            self._pending, self._pending_total, self._actors = {}, 0, set()
+            self._inflight = batch
+            
+            try:
+                async with self._session_factory() as session:
+                    await self._repository_factory(session).increment_taps_many(batch)
+                    note_actor_writes(session, actors)
+            except Exception:
+                # Возвращаем приросты в буфер, чтобы не потерять их при следующем сбросе
+                for user_id, delta in batch.items():
+                    self._pending[user_id] = self._pending.get(user_id, 0) + delta
+                self._pending_total += flushed
+                self._actors |= actors
+                raise
+            finally:
+                self._inflight = {}
+            
+            return flushed
+
+    async def start(self) -> None:
+        """Запустить фоновый сброс буфера."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Остановить фоновый сброс и записать оставшиеся нажатия."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        
+        await self.flush()
+
+    async def _run(self) -> None:
+        """Фоновый цикл сброса буфера."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Failed to flush tap buffer: {e}")
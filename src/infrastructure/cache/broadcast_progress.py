@@ -0,0 +1,53 @@
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from ...application.interfaces.broadcast_progress import BroadcastProgress, BroadcastProgressStore
+
+
+class RedisBroadcastProgressStore(BroadcastProgressStore):
+    """Прогресс рассылок в hash Redis (ключ ``<prefix>:<broadcast_id>``).
+    
+    Ключ живет ``ttl`` секунд с последнего сохранения: незавершенную рассылку
+    можно возобновить после перезапуска, а старые записи удаляются сами.
+    """
+
+    def __init__(self, redis: Redis, prefix: str = "broadcast", ttl: int = 172800):
+        self._redis = redis
+        self._prefix = prefix
+        self._ttl = ttl
+
+    def _key(self, broadcast_id: str) -> str:
+        return f"{self._prefix}:{broadcast_id}"
+
+    async def load(self, broadcast_id: str) -> Optional[BroadcastProgress]:
+        """Получить сохраненный прогресс рассылки или None, если она еще не начиналась."""
+        values = await self._redis.hgetall(self._key(broadcast_id))
+        if not values:
+            return None
+        values = {key.decode(): value.decode() for key, value in values.items()}
+        return BroadcastProgress(
+            text=values["text"],
+            cursor=int(values["cursor"]),
+            sent=int(values["sent"]),
+            failed=int(values["failed"]),
+            blocked=int(values["blocked"]),
+            finished=values["finished"] == "1",
+            completed=[int(user_id) for user_id in values.get("completed", "").split(",") if user_id],
+        )
+
+    async def save(self, broadcast_id: str, progress: BroadcastProgress) -> None:
+        """Сохранить прогресс рассылки и продлить срок жизни ключа."""
+        key = self._key(broadcast_id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={
+                "text": progress.text,
+                "cursor": progress.cursor,
+                "sent": progress.sent,
+                "failed": progress.failed,
+                "blocked": progress.blocked,
+                "finished": int(progress.finished),
+                "completed": ",".join(str(user_id) for user_id in progress.completed),
+            })
+            pipe.expire(key, self._ttl)
+            await pipe.execute()
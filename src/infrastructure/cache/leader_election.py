@@ -0,0 +1,166 @@
+import asyncio
+import inspect
+import os
+import socket
+import time
+import uuid
+from typing import List, Optional
+
+from loguru import logger
+from redis.asyncio import Redis
+from redis.exceptions import WatchError
+
+from ...application.interfaces.leader_election import LeaderElection, LeadershipCallback
+
+
+class RedisLeaderElection(LeaderElection):
+    """Выбор лидера арендой ключа Redis.
+    
+    Лидер владеет ключом ``key`` со своим токеном и временем жизни ``lease``
+    секунд и продлевает его каждые ``renew_interval`` секунд. Остальные реплики
+    с тем же интервалом пытаются занять ключ через SET NX, поэтому:
+    
+    - при штатной остановке лидер удаляет ключ, и его место занимают
+      не позже чем через ``renew_interval``;
+    - при падении лидера ключ истекает сам, и замена находится не позже
+      чем через ``lease + renew_interval``.
+    
+    Если продлить аренду не удается (например, Redis недоступен), лидер
+    слагает полномочия, не дожидаясь ее окончания, чтобы не работать
+    одновременно с новым лидером.
+    
+    Продление и освобождение проверяют токен через WATCH/MULTI, без Lua-скриптов.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        key: str = "leader:bot",
+        lease: float = 10.0,
+        renew_interval: Optional[float] = None,
+        identity: Optional[str] = None,
+    ):
+        self._redis = redis
+        self._key = key
+        self._lease_ms = int(lease * 1000)
+        self._lease = lease
+        self._renew_interval = renew_interval or lease / 3
+        self.identity = identity or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        
+        # Момент, до которого аренда гарантированно наша (по часам этой реплики)
+        self._lease_deadline = 0.0
+        self._leader = asyncio.Event()
+        self._on_elected: List[LeadershipCallback] = []
+        self._on_revoked: List[LeadershipCallback] = []
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_leader(self) -> bool:
+        """Является ли текущая реплика лидером."""
+        return self._leader.is_set()
+
+    async def wait_until_leader(self) -> None:
+        """Дождаться, пока текущая реплика станет лидером."""
+        await self._leader.wait()
+
+    def add_listener(
+        self,
+        on_elected: Optional[LeadershipCallback] = None,
+        on_revoked: Optional[LeadershipCallback] = None,
+    ) -> None:
+        """Подписаться на получение и потерю лидерства."""
+        if on_elected is not None:
+            self._on_elected.append(on_elected)
+        if on_revoked is not None:
+            self._on_revoked.append(on_revoked)
+
+    async def start(self) -> None:
+        """Запустить участие в выборах."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Прекратить участие в выборах и освободить лидерство для других реплик."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        
+        if self.is_leader:
+            try:
+                await self._release()
+            except Exception as e:
+                logger.error(f"Failed to release leadership {self._key}: {e}")
+            await self._step_down("stopped")
+
+    async def _run(self) -> None:
+        """Фоновый цикл захвата и продления аренды."""
+        while True:
+            started = time.monotonic()
+            try:
+                if self.is_leader:
+                    if await self._renew():
+                        self._lease_deadline = started + self._lease
+                    else:
+                        await self._step_down("lease was taken over")
+                elif await self._acquire():
+                    self._lease_deadline = started + self._lease
+                    await self._elect()
+            except Exception as e:
+                logger.error(f"Leader election {self._key} failed: {e}")
+            
+            # Следующее продление может не успеть до конца аренды — слагаем полномочия заранее
+            if self.is_leader and time.monotonic() + self._renew_interval >= self._lease_deadline:
+                await self._step_down("lease could not be renewed")
+            
+            await asyncio.sleep(self._renew_interval)
+
+    async def _acquire(self) -> bool:
+        return bool(await self._redis.set(self._key, self.identity, nx=True, px=self._lease_ms))
+
+    async def _renew(self) -> bool:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(self._key)
+                if await pipe.get(self._key) != self.identity.encode():
+                    return False
+                pipe.multi()
+                pipe.pexpire(self._key, self._lease_ms)
+                await pipe.execute()
+                return True
+            except WatchError:
+                return False
+
+    async def _release(self) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(self._key)
+                if await pipe.get(self._key) != self.identity.encode():
+                    return
+                pipe.multi()
+                pipe.delete(self._key)
+                await pipe.execute()
+            except WatchError:
+                pass
+
+    async def _elect(self) -> None:
+        logger.info(f"Replica {self.identity} became leader of {self._key}")
+        self._leader.set()
+        await self._notify(self._on_elected)
+
+    async def _step_down(self, reason: str) -> None:
+        logger.warning(f"Replica {self.identity} lost leadership of {self._key}: {reason}")
+        self._leader.clear()
+        await self._notify(self._on_revoked)
+
+    async def _notify(self, callbacks: List[LeadershipCallback]) -> None:
+        for callback in callbacks:
+            try:
+                result = callback()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Leadership callback {callback!r} failed: {e}")
@@ -0,0 +1,255 @@
+import uuid
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from loguru import logger
+from redis.asyncio import Redis
+
+from ...domain.entities.user import User
+from ...domain.repositories.rating_repository import RatingRepository
+from ..database.routing import use_primary
+
+
+class RedisLeaderboard:
+    """Рейтинг пользователей в sorted set Redis: member — ID пользователя, score — количество нажатий.
+    
+    Все запросы выполняются за O(log n). При равном количестве нажатий Redis
+    упорядочивает пользователей по member, а не по ID, как это делает SQL.
+    Рядом с рейтингом хранится счетчик общего количества нажатий (ключ ``<key>:total``).
+    """
+
+    def __init__(self, redis: Redis, key: str = "leaderboard:taps"):
+        self._redis = redis
+        self._key = key
+        self._total_key = f"{key}:total"
+
+    async def exists(self) -> bool:
+        """Проверить, построен ли рейтинг."""
+        return bool(await self._redis.exists(self._key))
+
+    async def set_scores(self, scores: Dict[int, int]) -> None:
+        """Записать количество нажатий пользователей.
+        
+        Нажатия только растут, поэтому используется ZADD GT: запоздавший ответ
+        с меньшим значением не перезапишет более свежее.
+        """
+        if scores:
+            await self._redis.zadd(self._key, scores, gt=True)
+
+    async def add_users(self, scores: Dict[int, int]) -> None:
+        """Внести в рейтинг пользователей, добавленных в базу в обход него (например, импортом).
+        
+        Рейтинг и общий счетчик, которые еще не построены, не трогаются: частичный
+        рейтинг помешал бы построить полный из базы при холодном старте.
+        """
+        if not scores:
+            return
+        if await self.exists():
+            await self.set_scores(scores)
+        if await self.get_total() is not None:
+            await self.incr_total(sum(scores.values()))
+
+    async def remove(self, *user_ids: int) -> None:
+        """Удалить пользователей из рейтинга."""
+        if user_ids:
+            await self._redis.zrem(self._key, *user_ids)
+
+    async def incr_total(self, amount: int) -> None:
+        """Увеличить общее количество нажатий."""
+        if amount:
+            await self._redis.incrby(self._total_key, amount)
+
+    async def get_total(self) -> Optional[int]:
+        """Получить общее количество нажатий или None, если счетчик еще не заведен."""
+        total = await self._redis.get(self._total_key)
+        return int(total) if total is not None else None
+
+    async def init_total(self, total: int) -> None:
+        """Завести счетчик общего количества нажатий, если его еще нет."""
+        await self._redis.set(self._total_key, total, nx=True)
+
+    async def top(self, limit: int = 10) -> List[Tuple[int, int]]:
+        """Получить пары (user_id, taps) лучших пользователей."""
+        entries = await self._redis.zrevrange(self._key, 0, limit - 1, withscores=True)
+        return [(int(member), int(score)) for member, score in entries]
+
+    async def rank(self, user_id: int) -> Optional[int]:
+        """Получить место пользователя: 1 + число пользователей с большим количеством нажатий."""
+        score = await self._redis.zscore(self._key, user_id)
+        if score is None:
+            return None
+        return await self._redis.zcount(self._key, f"({score}", "+inf") + 1
+
+    async def around(self, user_id: int, radius: int = 2) -> List[Tuple[int, int]]:
+        """Получить пары (user_id, taps) соседей пользователя по рейтингу, включая его самого."""
+        position = await self._redis.zrevrank(self._key, user_id)
+        if position is None:
+            return []
+        entries = await self._redis.zrevrange(
+            self._key, max(position - radius, 0), position + radius, withscores=True
+        )
+        return [(int(member), int(score)) for member, score in entries]
+
+    async def rebuild(self, batches: AsyncIterator[List[Tuple[int, int]]]) -> int:
+        """Перестроить рейтинг и общий счетчик из пар (user_id, taps) и вернуть количество пользователей.
+        
+        Рейтинг строится во временном ключе и атомарно подменяет текущий через RENAME,
+        поэтому читатели не видят частично построенный рейтинг.
+        """
+        tmp_key = f"{self._key}:rebuild:{uuid.uuid4().hex}"
+        count = total = 0
+        try:
+            async for batch in batches:
+                if batch:
+                    await self._redis.zadd(tmp_key, dict(batch))
+                    count += len(batch)
+                    total += sum(taps for _, taps in batch)
+            
+            # Рейтинг и общий счетчик подменяются одной транзакцией
+            async with self._redis.pipeline(transaction=True) as pipe:
+                if count:
+                    pipe.rename(tmp_key, self._key)
+                else:
+                    pipe.delete(self._key)
+                pipe.set(self._total_key, total)
+                await pipe.execute()
+        finally:
+            await self._redis.delete(tmp_key)
+        
+        return count
+
+
+class LeaderboardRatingRepository(RatingRepository):
+    """Репозиторий рейтинга, который держит RedisLeaderboard в синхронизации с базой.
+    
+    Изменения нажатий пишутся в базу через вложенный репозиторий, а их итоговые
+    значения переносятся в sorted set. Топ, место и соседи пользователя читаются
+    из Redis, а данные самих пользователей — из базы по первичному ключу.
+    """
+
+    def __init__(self, repository: RatingRepository, leaderboard: RedisLeaderboard):
+        self.repository = repository
+        self.leaderboard = leaderboard
+
+    async def ensure_built(self) -> None:
+        """Построить рейтинг и общий счетчик из базы, если их еще нет в Redis (холодный старт)."""
+        if not await self.leaderboard.exists():
+            count = await self.leaderboard.rebuild(self.repository.iter_user_taps())
+            logger.info(f"Leaderboard rebuilt from database: {count} users")
+        elif await self.leaderboard.get_total() is None:
+            await self.leaderboard.init_total(await self.repository.get_total_taps())
+
+    async def increment_taps(self, user_id: int, amount: int = 1) -> Optional[User]:
+        """Атомарно увеличить количество нажатий пользователя."""
+        user = await self.repository.increment_taps(user_id, amount)
+        if user is not None:
+            await self.leaderboard.set_scores({user.id: user.taps})
+            await self.leaderboard.incr_total(amount)
+        return user
+
+    async def increment_taps_many(self, deltas: Dict[int, int]) -> Dict[int, int]:
+        """Увеличить количество нажатий нескольких пользователей одним запросом."""
+        taps = await self.repository.increment_taps_many(deltas)
+        await self.leaderboard.set_scores(taps)
+        # Учитываем только пользователей, которые действительно есть в базе
+        await self.leaderboard.incr_total(sum(deltas[user_id] for user_id in taps))
+        return taps
+
+    async def get_top_users(self, limit: int = 10) -> List[User]:
+        """Получить список пользователей с наивысшим рейтингом."""
+        while True:
+            entries = await self.leaderboard.top(limit)
+            users = await self._load_users(entries)
+            # Удаленные пользователи уже убраны из рейтинга: перечитываем топ, чтобы он не оказался короче
+            if len(users) == len(entries):
+                return users
+
+    async def get_rating_page(self, limit: int, after: Optional[Tuple[int, int]] = None) -> List[User]:
+        """Получить страницу рейтинга в порядке (taps DESC, id) после курсора (taps, id) последней записи."""
+        # Sorted set упорядочивает равные очки по member, а не по id, поэтому страницы читаются из базы
+        return await self.repository.get_rating_page(limit, after)
+
+    async def get_user_by_telegram_id(self, telegram_id: int) -> Optional[User]:
+        """Получить пользователя по Telegram ID."""
+        return await self.repository.get_user_by_telegram_id(telegram_id)
+
+    async def get_user_rank(self, user_id: int) -> Optional[int]:
+        """Получить место пользователя в рейтинге."""
+        rank = await self.leaderboard.rank(user_id)
+        if rank is None:
+            # Пользователя еще нет в рейтинге (например, он ни разу не нажимал)
+            return await self.repository.get_user_rank(user_id)
+        return rank
+
+    async def get_users_around(self, user_id: int, radius: int = 2) -> List[User]:
+        """Получить соседей пользователя по рейтингу."""
+        entries = await self.leaderboard.around(user_id, radius)
+        if not entries:
+            return await self.repository.get_users_around(user_id, radius)
+        return await self._load_users(entries)
+
+    async def get_users_by_ids(self, user_ids: List[int]) -> List[User]:
+        """Получить пользователей по списку ID."""
+        return await self.repository.get_users_by_ids(user_ids)
+
+    def iter_user_taps(self, batch_size: int = 1000) -> AsyncIterator[List[Tuple[int, int]]]:
+        """Постранично обойти пары (user_id, taps) всех пользователей."""
+        return self.repository.iter_user_taps(batch_size)
+
+    async def get_total_taps(self) -> int:
+        """Получить общее количество нажатий всех пользователей из счетчика за O(1)."""
+        total = await self.leaderboard.get_total()
+        if total is None:
+            total = await self.repository.get_total_taps()
+            await self.leaderboard.init_total(total)
+        return total
+
+    async def reconcile_total_taps(self) -> int:
+        """Сверить счетчик общего количества нажатий с базой и вернуть исправленное расхождение.
+        
+        Расхождение появляется, если нажатия меняются в обход этого репозитория или
+        запись в Redis не удалась. Поправка применяется через INCRBY, чтобы не затереть
+        нажатия, засчитанные во время сверки. Если счетчик изменился, пока считалась
+        сумма в базе, сверка откладывается до следующего запуска.
+        """
+        before = await self.leaderboard.get_total()
+        actual = await self.repository.get_total_taps()
+        after = await self.leaderboard.get_total()
+        
+        if before is None or after is None:
+            await self.leaderboard.init_total(actual)
+            return 0
+        
+        if before != after:
+            logger.info("Total taps changed during reconciliation, retry on next run")
+            return 0
+        
+        drift = actual - after
+        if drift:
+            await self.leaderboard.incr_total(drift)
+            logger.warning(f"Total taps counter corrected by {drift}")
+        return drift
+
+    async def update_user_info(self, user_id: int, info: str) -> User:
+        """Обновить дополнительную информацию о пользователе."""
+        return await self.repository.update_user_info(user_id, info)
+
+    async def update_user_photo(self, user_id: int, photo_url: str) -> User:
+        """Обновить фотографию пользователя."""
+        return await self.repository.update_user_photo(user_id, photo_url)
+
+    async def _load_users(self, entries: List[Tuple[int, int]]) -> List[User]:
+        """Загрузить пользователей из базы в порядке рейтинга."""
+        users = {user.id: user for user in await self.repository.get_users_by_ids([user_id for user_id, _ in entries])}
+        
+        missing = [user_id for user_id, _ in entries if user_id not in users]
+        if missing:
+            # Отстающая реплика еще не видит новых пользователей: отсутствие проверяется в основной базе
+            with use_primary():
+                found = await self.repository.get_users_by_ids(missing)
+            users.update((user.id, user) for user in found)
+            
+            # Пользователи, удаленные из базы в обход рейтинга (CLI, SQL), убираются из sorted set
+            deleted = [user_id for user_id in missing if user_id not in users]
+            if deleted:
+                await self.leaderboard.remove(*deleted)
+        return [users[user_id] for user_id, _ in entries if user_id in users]
@@ -0,0 +1,36 @@
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from src.config import settings
+
+# Общий клиент Redis процесса API: создается при первом обращении и закрывается при остановке
+_redis: Optional[Redis] = None
+
+
+def get_redis_url() -> str:
+    """Формирование URL для Redis из настроек."""
+    if settings.REDIS_PASSWORD:
+        return f"redis://:{settings.REDIS_PASSWORD}@{settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_DB}"
+    return f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_DB}"
+
+
+def create_redis() -> Redis:
+    """Создание клиента Redis."""
+    return Redis.from_url(get_redis_url())
+
+
+def get_redis() -> Redis:
+    """Получение общего клиента Redis процесса."""
+    global _redis
+    if _redis is None:
+        _redis = create_redis()
+    return _redis
+
+
+async def close_redis() -> None:
+    """Закрытие общего клиента Redis процесса."""
+    global _redis
+    if _redis is not None:
+        await _redis.close()
+        _redis = None
@@ -0,0 +1,268 @@
+import asyncio
+import hashlib
+import math
+import time
+from typing import Dict, List, Optional, Sequence
+
+from loguru import logger
+from redis.asyncio import Redis
+from redis.asyncio.client import PubSub
+
+from ...application.interfaces.user_registry import RegistrationFeed, UserRegistry
+from ...domain.repositories.user_repository import UserRepository
+from ..database.routing import use_primary
+
+
+class BloomFilter:
+    """Bloom-фильтр по целым числам с фиксированным размером битового массива.
+    
+    Размер выбирается по ожидаемому числу элементов n и доле ложных срабатываний p:
+    m = -n * ln(p) / ln(2)^2 бит и k = m / n * ln(2) хэш-функций. Для p = 1%
+    это ~9.6 бит (1.2 байта) на элемент и k = 7:
+    
+        1M элементов   -> ~1.2 МБ
+        10M элементов  -> ~12 МБ
+    
+    Память выделяется сразу и не растет. Если добавить больше capacity элементов,
+    растет только доля ложных срабатываний.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    @property
+    def nbytes(self) -> int:
+        """Размер битового массива в байтах."""
+        return len(self._bits)
+
+    def _positions(self, value: int):
+        # Двойное хэширование: k позиций из двух независимых 64-битных хэшей
+        digest = hashlib.blake2b(value.to_bytes(8, "little", signed=True), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (first + i * second) % self.size
+
+    def add(self, value: int) -> None:
+        """Добавить число в фильтр."""
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value: int) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class BloomUserRegistry(UserRegistry):
+    """Реестр зарегистрированных пользователей на Bloom-фильтре.
+    
+    Фильтр строится по базе в load() и дополняется через add(): регистрациями
+    этого процесса и оповещениями RedisRegistrationFeed о пользователях,
+    созданных в других процессах, API, CLI и импортом. Отрицательный ответ
+    фильтра окончателен и дается без обращения к базе.
+    
+    Положительный ответ может быть ложным (в доле error_rate случаев) или
+    относиться к удаленному пользователю — в этом случае регистрация
+    проверяется запросом в базу, а подтвержденное отсутствие запоминается
+    на absent_ttl секунд.
+    
+    Удаление из Bloom-фильтра невозможно: discard только учитывает устаревшие
+    записи, а фильтр очищается от них при следующем load().
+    """
+
+    # Порог, после которого из списка отсутствующих удаляются истекшие записи
+    PRUNE_THRESHOLD = 10000
+
+    def __init__(
+        self,
+        user_repository: UserRepository,
+        capacity: int = 1_000_000,
+        error_rate: float = 0.01,
+        absent_ttl: float = 60.0,
+    ):
+        self.user_repository = user_repository
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.absent_ttl = absent_ttl
+        self._filter = BloomFilter(capacity, error_rate)
+        self.stale = 0
+        # Telegram ID, отсутствие которых подтверждено в базе, и время, до которого ему верим
+        self._absent: Dict[int, float] = {}
+        # Регистрации, сделанные во время load(): они переносятся в новый фильтр
+        self._loading: Optional[List[int]] = None
+        
+        # Счетчики проверок: ответы без базы, подтверждения в базе и ложные срабатывания
+        self.negatives = 0
+        self.confirmed = 0
+        self.false_positives = 0
+
+    async def load(self, batch_size: int = 10000) -> int:
+        """Построить фильтр по всем пользователям в базе и вернуть их количество."""
+        bloom = BloomFilter(self.capacity, self.error_rate)
+        self._loading = []
+        try:
+            # Отстающая реплика потеряла бы недавние регистрации
+            with use_primary():
+                async for telegram_ids in self.user_repository.iter_telegram_ids(batch_size):
+                    for telegram_id in telegram_ids:
+                        bloom.add(telegram_id)
+            
+            # Регистрации во время построения попали только в старый фильтр
+            for telegram_id in self._loading:
+                bloom.add(telegram_id)
+        finally:
+            self._loading = None
+        
+        self._filter = bloom
+        self.stale = 0
+        if bloom.count > self.capacity:
+            logger.warning(f"User registry holds {bloom.count} ids over capacity {self.capacity}")
+        logger.info(f"User registry loaded: {bloom.count} ids, {bloom.nbytes} bytes")
+        return bloom.count
+
+    def might_contain(self, telegram_id: int) -> bool:
+        """Проверить без обращения к базе: False означает, что пользователь не зарегистрирован."""
+        if telegram_id not in self._filter:
+            self.negatives += 1
+            return False
+        
+        # Ложное срабатывание или удаленный пользователь, недавно проверенные в базе
+        until = self._absent.get(telegram_id)
+        if until is not None:
+            if until > time.monotonic():
+                self.negatives += 1
+                return False
+            del self._absent[telegram_id]
+        return True
+
+    async def is_registered(self, telegram_id: int) -> bool:
+        """Проверить, зарегистрирован ли пользователь с таким Telegram ID."""
+        if not self.might_contain(telegram_id):
+            return False
+        
+        if await self.user_repository.exists_by_telegram_id(telegram_id):
+            self.confirmed += 1
+            return True
+        
+        self.false_positives += 1
+        self.note_absent(telegram_id)
+        return False
+
+    def note_absent(self, telegram_id: int) -> None:
+        """Запомнить, что пользователя с таким Telegram ID нет в базе."""
+        now = time.monotonic()
+        if len(self._absent) > self.PRUNE_THRESHOLD:
+            self._absent = {key: until for key, until in self._absent.items() if until > now}
+        self._absent[telegram_id] = now + self.absent_ttl
+
+    def add(self, telegram_id: int) -> None:
+        """Отметить Telegram ID как зарегистрированный."""
+        self._filter.add(telegram_id)
+        self._absent.pop(telegram_id, None)
+        if self._loading is not None:
+            self._loading.append(telegram_id)
+
+    def discard(self, telegram_id: int) -> None:
+        """Отметить, что пользователь с таким Telegram ID удален."""
+        self.stale += 1
+        self.note_absent(telegram_id)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Получить размер фильтра и счетчики проверок."""
+        return {
+            "ids": self._filter.count,
+            "bytes": self._filter.nbytes,
+            "stale": self.stale,
+            "absent": len(self._absent),
+            "negatives": self.negatives,
+            "confirmed": self.confirmed,
+            "false_positives": self.false_positives,
+        }
+
+
+class RedisRegistrationFeed(RegistrationFeed):
+    """Оповещения о новых пользователях через pub/sub Redis.
+    
+    Процессы, которые создают пользователей (бот, API, CLI и импорт), публикуют
+    их Telegram ID в канал, а каждый процесс бота подписывает на него свой
+    BloomUserRegistry. Сообщения pub/sub не хранятся, поэтому фильтр строится
+    после подписки и перестраивается после каждого переподключения: так
+    регистрации, пропущенные без подписки, все равно попадают в фильтр.
+    """
+
+    # Пауза перед переподключением после ошибки и ее верхняя граница
+    RETRY_DELAY = 1.0
+    MAX_RETRY_DELAY = 30.0
+
+    def __init__(self, redis: Redis, channel: str = "users:registered"):
+        self._redis = redis
+        self.channel = channel
+        self._task: Optional[asyncio.Task] = None
+
+    async def publish(self, telegram_ids: Sequence[int]) -> None:
+        """Сообщить реестрам всех процессов о зарегистрированных Telegram ID."""
+        if not telegram_ids:
+            return
+        try:
+            await self._redis.publish(self.channel, ",".join(str(telegram_id) for telegram_id in telegram_ids))
+        except Exception as e:
+            # Пользователь уже сохранен: реестры подхватят его при перестроении после переподключения
+            logger.error(f"Failed to publish {len(telegram_ids)} registrations: {e}")
+
+    async def subscribe(self, registry: BloomUserRegistry) -> None:
+        """Подписать реестр на оповещения и построить его; дальше он обновляется в фоне до stop()."""
+        pubsub = await self._connect(registry)
+        self._task = asyncio.create_task(self._listen(registry, pubsub))
+
+    async def stop(self) -> None:
+        """Отписаться от оповещений."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _connect(self, registry: BloomUserRegistry) -> PubSub:
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(self.channel)
+            # Регистрации до подписки в канал уже не придут: фильтр строится после нее
+            await registry.load()
+        except BaseException:
+            await pubsub.close()
+            raise
+        return pubsub
+
+    async def _listen(self, registry: BloomUserRegistry, pubsub: Optional[PubSub]) -> None:
+        delay = self.RETRY_DELAY
+        while True:
+            try:
+                if pubsub is None:
+                    pubsub = await self._connect(registry)
+                    logger.info(f"User registry resubscribed to {self.channel}")
+                    delay = self.RETRY_DELAY
+                async for message in pubsub.listen():
+                    for telegram_id in message["data"].split(b","):
+                        registry.add(int(telegram_id))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"User registry feed failed, resubscribing in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.MAX_RETRY_DELAY)
+            finally:
+                if pubsub is not None:
+                    await pubsub.close()
+                    pubsub = None
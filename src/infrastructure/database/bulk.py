@@ -0,0 +1,302 @@
+"""Массовый импорт и экспорт пользователей в CSV и JSONL.
+
+В PostgreSQL экспорт в CSV выполняется через COPY ... TO STDOUT, а импорт —
+через COPY пакета во временную таблицу и INSERT ... ON CONFLICT DO NOTHING
+из нее. Для остальных баз (SQLite) экспорт идет keyset-страницами по id,
+а импорт — пакетными INSERT ... ON CONFLICT DO NOTHING. Импорт в другие базы
+не поддерживается: пропуск существующих telegram_id для них не реализован.
+В любом режиме в памяти держится не больше одного пакета, поэтому объем
+файла не ограничен.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from itertools import islice
+from typing import Any, Awaitable, BinaryIO, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .models import UserModel
+
+FORMATS = ("csv", "jsonl")
+
+# Порядок колонок в файлах экспорта
+EXPORT_COLUMNS = (
+    "id",
+    "telegram_id",
+    "username",
+    "first_name",
+    "last_name",
+    "is_active",
+    "is_admin",
+    "taps",
+    "info",
+    "photo",
+    "created_at",
+    "updated_at",
+)
+# id при импорте не переносится: его назначает база, дубликаты отсекаются по telegram_id
+IMPORT_COLUMNS = EXPORT_COLUMNS[1:]
+
+# Базы, в которых импорт пропускает уже существующие telegram_id
+IMPORT_DIALECTS = ("postgresql", "sqlite")
+
+# Временная таблица для COPY пакета при импорте в PostgreSQL
+STAGING_TABLE = "users_import"
+
+ProgressCallback = Callable[[int], None]
+# Вызывается после каждого пакета со строками (id, telegram_id, taps) добавленных пользователей
+InsertedCallback = Callable[[List[Tuple[int, int, int]]], Awaitable[None]]
+
+
+class ImportResult(NamedTuple):
+    """Итог импорта: сколько записей прочитано и сколько из них добавлено."""
+    processed: int
+    inserted: int
+
+    @property
+    def skipped(self) -> int:
+        """Записи, пропущенные из-за уже существующего telegram_id."""
+        return self.processed - self.inserted
+
+
+def detect_format(filename: str) -> Optional[str]:
+    """Определить формат файла по расширению."""
+    for fmt in FORMATS:
+        if filename.lower().endswith(f".{fmt}"):
+            return fmt
+    return None
+
+
+def _parse_bool(value: Any, default: bool) -> bool:
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "t", "true", "yes", "y")
+
+
+def _parse_datetime(value: Any) -> datetime:
+    if value is None or value == "":
+        return datetime.utcnow()
+    if isinstance(value, datetime):
+        return value
+    # Формат isoformat и вывод COPY; смещение часового пояса отбрасывается, колонки без зоны
+    return datetime.fromisoformat(str(value)).replace(tzinfo=None)
+
+
+def _optional_str(value: Any) -> Optional[str]:
+    return None if value is None or value == "" else str(value)
+
+
+def _to_row(record: Dict[str, Any]) -> Tuple:
+    """Привести запись из файла к значениям колонок IMPORT_COLUMNS."""
+    telegram_id = record.get("telegram_id")
+    if telegram_id is None or telegram_id == "":
+        raise ValueError(f"Запись без telegram_id: {record}")
+
+    taps = record.get("taps")
+    return (
+        int(telegram_id),
+        _optional_str(record.get("username")),
+        _optional_str(record.get("first_name")),
+        _optional_str(record.get("last_name")),
+        _parse_bool(record.get("is_active"), True),
+        _parse_bool(record.get("is_admin"), False),
+        int(taps) if taps not in (None, "") else 0,
+        _optional_str(record.get("info")),
+        _optional_str(record.get("photo")),
+        _parse_datetime(record.get("created_at")),
+        _parse_datetime(record.get("updated_at")),
+    )
+
+
+def _read_records(source: BinaryIO, fmt: str) -> Iterator[Dict[str, Any]]:
+    """Построчно прочитать записи из CSV с заголовком или JSONL."""
+    text = io.TextIOWrapper(source, encoding="utf-8", newline="")
+    try:
+        if fmt == "csv":
+            yield from csv.DictReader(text)
+        else:
+            for line in text:
+                if line.strip():
+                    yield json.loads(line)
+    finally:
+        # Файл закрывает вызывающий код, обертка не должна закрыть его вместе с собой
+        text.detach()
+
+
+def _read_batches(source: BinaryIO, fmt: str, batch_size: int) -> Iterator[List[Tuple]]:
+    rows = (_to_row(record) for record in _read_records(source, fmt))
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _format_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return value
+
+
+def encode_rows(rows: List[Tuple], fmt: str) -> bytes:
+    """Закодировать строки в порядке EXPORT_COLUMNS в CSV или JSONL."""
+    buffer = io.StringIO()
+    if fmt == "csv":
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerows([_format_value(value) for value in row] for row in rows)
+    else:
+        for row in rows:
+            record = {column: _format_value(value) for column, value in zip(EXPORT_COLUMNS, row)}
+            buffer.write(json.dumps(record, ensure_ascii=False))
+            buffer.write("\n")
+    return buffer.getvalue().encode("utf-8")
+
+
+async def export_users(
+    engine: AsyncEngine,
+    output: BinaryIO,
+    fmt: str = "csv",
+    batch_size: int = 10000,
+    progress: Optional[ProgressCallback] = None,
+) -> int:
+    """Выгрузить всех пользователей в output и вернуть их количество.
+
+    progress вызывается с числом записей, выгруженных с прошлого вызова.
+    """
+    if engine.dialect.name == "postgresql" and fmt == "csv":
+        return await _copy_export(engine, output, progress)
+
+    columns = [UserModel.__table__.c[name] for name in EXPORT_COLUMNS]
+    if fmt == "csv":
+        output.write(encode_rows([EXPORT_COLUMNS], fmt))
+
+    total = 0
+    last_id = 0
+    async with engine.connect() as conn:
+        while True:
+            # Keyset-пагинация по первичному ключу: каждая страница читается по индексу
+            query = select(*columns).where(UserModel.id > last_id).order_by(UserModel.id).limit(batch_size)
+            rows = (await conn.execute(query)).all()
+            if not rows:
+                break
+
+            output.write(encode_rows(rows, fmt))
+            total += len(rows)
+            last_id = rows[-1].id
+            if progress:
+                progress(len(rows))
+
+    return total
+
+
+async def _copy_export(engine: AsyncEngine, output: BinaryIO, progress: Optional[ProgressCallback]) -> int:
+    """Экспорт в CSV через COPY: сервер отдает поток, который сразу пишется в файл."""
+    query = select(*[UserModel.__table__.c[name] for name in EXPORT_COLUMNS]).order_by(UserModel.id)
+    sql = str(query.compile(dialect=postgresql.dialect()))
+
+    header_pending = True
+
+    async def write(chunk: bytes) -> None:
+        nonlocal header_pending
+        output.write(chunk)
+        if progress:
+            # Строки со встроенными переводами строк посчитаются дважды; итог берется из статуса COPY
+            lines = chunk.count(b"\n")
+            if header_pending and lines:
+                lines -= 1
+                header_pending = False
+            progress(lines)
+
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        status = await raw.driver_connection.copy_from_query(sql, output=write, format="csv", header=True)
+
+    return int(status.split()[-1])
+
+
+async def import_users(
+    engine: AsyncEngine,
+    source: BinaryIO,
+    fmt: str = "csv",
+    batch_size: int = 10000,
+    progress: Optional[ProgressCallback] = None,
+    on_inserted: Optional[InsertedCallback] = None,
+) -> ImportResult:
+    """Загрузить пользователей из source пакетами по batch_size.
+
+    Каждый пакет фиксируется отдельной транзакцией. Пользователи с уже
+    существующим telegram_id пропускаются, поэтому прерванный импорт
+    можно запустить повторно с того же файла. on_inserted получает
+    добавленных пользователей пакета после его фиксации, например чтобы
+    внести их в кэши, которые база сама не обновляет.
+    """
+    if engine.dialect.name not in IMPORT_DIALECTS:
+        raise ValueError(f"Импорт в {engine.dialect.name} не поддерживается, доступно: {', '.join(IMPORT_DIALECTS)}")
+
+    batches = _read_batches(source, fmt, batch_size)
+    if engine.dialect.name == "postgresql":
+        return await _copy_import(engine, batches, progress, on_inserted)
+
+    table = UserModel.__table__
+    stmt = (
+        sqlite.insert(table)
+        .on_conflict_do_nothing(index_elements=["telegram_id"])
+        .returning(table.c.id, table.c.telegram_id, table.c.taps)
+    )
+
+    processed = inserted = 0
+    for batch in batches:
+        async with engine.begin() as conn:
+            result = await conn.execute(stmt, [dict(zip(IMPORT_COLUMNS, row)) for row in batch])
+            rows = [tuple(row) for row in result]
+        processed += len(batch)
+        inserted += len(rows)
+        if on_inserted and rows:
+            await on_inserted(rows)
+        if progress:
+            progress(len(batch))
+
+    return ImportResult(processed, inserted)
+
+
+async def _copy_import(
+    engine: AsyncEngine,
+    batches: Iterator[List[Tuple]],
+    progress: Optional[ProgressCallback],
+    on_inserted: Optional[InsertedCallback],
+) -> ImportResult:
+    """Импорт через COPY во временную таблицу и перенос в users без дубликатов."""
+    columns = ", ".join(IMPORT_COLUMNS)
+    processed = inserted = 0
+
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        connection = raw.driver_connection
+        await connection.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} AS SELECT {columns} FROM users WITH NO DATA"
+        )
+        try:
+            for batch in batches:
+                async with connection.transaction():
+                    await connection.copy_records_to_table(STAGING_TABLE, records=batch, columns=IMPORT_COLUMNS)
+                    rows = await connection.fetch(
+                        f"INSERT INTO users ({columns}) SELECT {columns} FROM {STAGING_TABLE} "
+                        f"ON CONFLICT (telegram_id) DO NOTHING RETURNING id, telegram_id, taps"
+                    )
+                    await connection.execute(f"TRUNCATE {STAGING_TABLE}")
+                processed += len(batch)
+                inserted += len(rows)
+                if on_inserted and rows:
+                    await on_inserted([tuple(row) for row in rows])
+                if progress:
+                    progress(len(batch))
+        finally:
+            await connection.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+
+    return ImportResult(processed, inserted)
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, Integer, String
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, Index, Integer, String
 from sqlalchemy.orm import DeclarativeBase
 
 
@@ -15,7 +15,7 @@ class UserModel(Base):
     __tablename__ = "users"
 
     id = Column(Integer, primary_key=True, index=True)
-    telegram_id = Column(Integer, unique=True, index=True, nullable=False)
+    telegram_id = Column(BigInteger, unique=True, index=True, nullable=False)
     username = Column(String, nullable=True)
     first_name = Column(String, nullable=True)
     last_name = Column(String, nullable=True)
@@ -25,6 +25,11 @@ class UserModel(Base):
     is_admin = Column(Boolean, default=False, nullable=False)
     
     # Дополнительные поля для рейтинга
-    taps = Column(Integer, default=0, nullable=False)
+    taps = Column(Integer, default=0, server_default="0", nullable=False)
     info = Column(String, nullable=True)
-    photo = Column(String, nullable=True) 
\ No newline at end of file
+    photo = Column(String, nullable=True)
+    
+    __table_args__ = (
+        # Топ, место в рейтинге и keyset-страницы идут по (taps DESC, id)
+        Index("ix_users_taps_desc_id", taps.desc(), id),
+    ) 
\ No newline at end of file
@@ -1,11 +1,20 @@
-from typing import List
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
-from sqlalchemy import select, func
+from sqlalchemy import Integer, and_, case, column, func, or_, select, update, values
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ....domain.entities.user import User
 from ....domain.repositories.rating_repository import RatingRepository
 from ..models import UserModel
+from ..routing import read_only
+from ..statements import (
+    INCREMENT_TAPS,
+    SELECT_TOP_USERS,
+    SELECT_TOTAL_TAPS,
+    SELECT_USER_BY_TELEGRAM_ID,
+    USER_COLUMNS,
+    row_to_user,
+)
 
 
 class RatingRepositoryImpl(RatingRepository):
@@ -14,42 +23,155 @@ class RatingRepositoryImpl(RatingRepository):
     def __init__(self, session: AsyncSession):
         self.session = session
     
-    async def increment_taps(self, user_id: int) -> User:
-        """Увеличить количество нажатий пользователя."""
-        # Получаем пользователя
-        stmt = select(UserModel).where(UserModel.id == user_id)
-        result = await self.session.execute(stmt)
-        user = result.scalar_one_or_none()
+    async def increment_taps(self, user_id: int, amount: int = 1) -> Optional[User]:
+        """Атомарно увеличить количество нажатий пользователя."""
+        result = await self.session.execute(INCREMENT_TAPS, {"user_id": user_id, "amount": amount})
+        row = result.one_or_none()
+        await self.session.commit()
         
-        if user:
-            # Увеличиваем количество нажатий
-            user.taps += 1
-            await self.session.commit()
-            await self.session.refresh(user)
+        return row_to_user(row) if row else None
+    
+    async def increment_taps_many(self, deltas: Dict[int, int]) -> Dict[int, int]:
+        """Увеличить количество нажатий нескольких пользователей одним запросом."""
+        if not deltas:
+            return {}
         
-        return User.model_validate(user) if user else None
+        if self.session.get_bind().dialect.name == "postgresql":
+            # UPDATE users SET taps = users.taps + batch.delta FROM (VALUES ...) AS batch (id, delta)
+            batch = values(
+                column("id", Integer),
+                column("delta", Integer),
+                name="batch",
+            ).data(list(deltas.items()))
+            stmt = (
+                update(UserModel)
+                .where(UserModel.id == batch.c.id)
+                .values(taps=UserModel.taps + batch.c.delta)
+            )
+        else:
+            # SQLite не поддерживает имена колонок у VALUES, поэтому прирост выбираем через CASE
+            stmt = (
+                update(UserModel)
+                .where(UserModel.id.in_(list(deltas)))
+                .values(taps=UserModel.taps + case(deltas, value=UserModel.id, else_=0))
+            )
+        
+        stmt = stmt.returning(UserModel.id, UserModel.taps).execution_options(synchronize_session=False)
+        result = await self.session.execute(stmt)
+        rows = result.all()
+        await self.session.commit()
+        
+        return {row.id: row.taps for row in rows}
     
+    @read_only
     async def get_top_users(self, limit: int = 10) -> List[User]:
         """Получить список пользователей с наивысшим рейтингом."""
-        # Получаем пользователей, отсортированных по количеству нажатий
-        stmt = (
-            select(UserModel)
-            .order_by(UserModel.taps.desc())
-            .limit(limit)
+        result = await self.session.execute(SELECT_TOP_USERS, {"limit": limit})
+        
+        return [row_to_user(row) for row in result]
+    
+    @read_only
+    async def get_rating_page(self, limit: int, after: Optional[Tuple[int, int]] = None) -> List[User]:
+        """Получить страницу рейтинга в порядке (taps DESC, id) после курсора (taps, id) последней записи."""
+        stmt = select(*USER_COLUMNS).order_by(UserModel.taps.desc(), UserModel.id.asc()).limit(limit)
+        if after is not None:
+            # Keyset-пагинация: продолжаем сразу за последней записью, без OFFSET
+            taps, user_id = after
+            stmt = stmt.where(or_(UserModel.taps < taps, and_(UserModel.taps == taps, UserModel.id > user_id)))
+        result = await self.session.execute(stmt)
+        
+        return [row_to_user(row) for row in result]
+    
+    @read_only
+    async def get_user_by_telegram_id(self, telegram_id: int) -> Optional[User]:
+        """Получить пользователя по Telegram ID."""
+        result = await self.session.execute(SELECT_USER_BY_TELEGRAM_ID, {"telegram_id": telegram_id})
+        row = result.one_or_none()
+        
+        return row_to_user(row) if row else None
+    
+    @read_only
+    async def get_user_rank(self, user_id: int) -> Optional[int]:
+        """Получить место пользователя в рейтинге."""
+        stmt = select(UserModel.taps).where(UserModel.id == user_id)
+        result = await self.session.execute(stmt)
+        taps = result.scalar_one_or_none()
+        
+        if taps is None:
+            return None
+        
+        # Место = 1 + количество пользователей, у которых нажатий больше
+        stmt = select(func.count()).select_from(UserModel).where(UserModel.taps > taps)
+        result = await self.session.execute(stmt)
+        
+        return result.scalar_one() + 1
+    
+    @read_only
+    async def get_users_around(self, user_id: int, radius: int = 2) -> List[User]:
+        """Получить соседей пользователя по рейтингу."""
+        stmt = select(*USER_COLUMNS).where(UserModel.id == user_id)
+        result = await self.session.execute(stmt)
+        user = result.one_or_none()
+        
+        if user is None:
+            return []
+        
+        # Порядок рейтинга: taps DESC, id ASC
+        above_stmt = (
+            select(*USER_COLUMNS)
+            .where(or_(UserModel.taps > user.taps, and_(UserModel.taps == user.taps, UserModel.id < user.id)))
+            .order_by(UserModel.taps.asc(), UserModel.id.desc())
+            .limit(radius)
         )
+        below_stmt = (
+            select(*USER_COLUMNS)
+            .where(or_(UserModel.taps < user.taps, and_(UserModel.taps == user.taps, UserModel.id > user.id)))
+            .order_by(UserModel.taps.desc(), UserModel.id.asc())
+            .limit(radius)
+        )
+        above = (await self.session.execute(above_stmt)).all()
+        below = (await self.session.execute(below_stmt)).all()
+        
+        return [row_to_user(row) for row in [*reversed(above), user, *below]]
+    
+    @read_only
+    async def get_users_by_ids(self, user_ids: List[int]) -> List[User]:
+        """Получить пользователей по списку ID."""
+        if not user_ids:
+            return []
+        
+        stmt = select(*USER_COLUMNS).where(UserModel.id.in_(user_ids))
         result = await self.session.execute(stmt)
-        users = result.scalars().all()
         
-        return [User.model_validate(user) for user in users]
+        return [row_to_user(row) for row in result]
     
+    @read_only
+    async def iter_user_taps(self, batch_size: int = 1000) -> AsyncIterator[List[Tuple[int, int]]]:
+        """Постранично обойти пары (user_id, taps) всех пользователей."""
+        last_id = 0
+        while True:
+            # Keyset-пагинация по первичному ключу вместо OFFSET
+            stmt = (
+                select(UserModel.id, UserModel.taps)
+                .where(UserModel.id > last_id)
+                .order_by(UserModel.id)
+                .limit(batch_size)
+            )
+            result = await self.session.execute(stmt)
+            rows = [(row.id, row.taps) for row in result]
+            
+            if not rows:
+                return
+            
+            yield rows
+            last_id = rows[-1][0]
+    
+    @read_only
     async def get_total_taps(self) -> int:
         """Получить общее количество нажатий всех пользователей."""
-        # Получаем сумму нажатий всех пользователей
-        stmt = select(func.sum(UserModel.taps))
-        result = await self.session.execute(stmt)
-        total = result.scalar_one_or_none()
+        result = await self.session.execute(SELECT_TOTAL_TAPS)
         
-        return total or 0
+        return result.scalar_one()
     
     async def update_user_info(self, user_id: int, info: str) -> User:
         """Обновить дополнительную информацию о пользователе."""
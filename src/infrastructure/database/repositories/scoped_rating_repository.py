@@ -0,0 +1,85 @@
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ....domain.entities.user import User
+from ....domain.repositories.rating_repository import RatingRepository
+from .rating_repository_impl import RatingRepositoryImpl
+
+
+class SessionScopedRatingRepository(RatingRepository):
+    """Репозиторий рейтинга, который открывает отдельную сессию на каждый вызов.
+    
+    RatingRepositoryImpl работает с одной сессией (как в API, где сессия живет
+    один запрос). Боту нужен долгоживущий репозиторий, а AsyncSession нельзя
+    использовать из нескольких апдейтов одновременно.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        repository_factory: Optional[Callable[[AsyncSession], RatingRepository]] = None,
+    ):
+        self._session_factory = session_factory
+        self._repository_factory = repository_factory or RatingRepositoryImpl
+
+    async def increment_taps(self, user_id: int, amount: int = 1) -> Optional[User]:
+        """Атомарно увеличить количество нажатий пользователя."""
+        async with self._session_factory() as session:
+            return await self._repository_factory(session).increment_taps(user_id, amount)
+
+    async def increment_taps_many(self, deltas: Dict[int, int]) -> Dict[int, int]:
+        """Увеличить количество нажатий нескольких пользователей одним запросом."""
+        async with self._session_factory() as session:
+            return await self._repository_factory(session).increment_taps_many(deltas)
+
+    async def get_top_users(self, limit: int = 10) -> List[User]:
+        """Получить список пользователей с наивысшим рейтингом."""
+        async with self._session_factory() as session:
+            return await self._repository_factory(session).get_top_users(limit)
+
+    async def get_rating_page(self, limit: int, after: Optional[Tuple[int, int]] = None) -> List[User]:
+        """Получить страницу рейтинга после курсора (taps, id) последней записи."""
+        async with self._session_factory() as session:
+            return await self._repository_factory(session).get_rating_page(limit, after)
+
+    async def get_user_by_telegram_id(self, telegram_id: int) -> Optional[User]:
+        """Получить пользователя по Telegram ID."""
+        async with self._session_factory() as session:
+            return await self._repository_factory(session).get_user_by_telegram_id(telegram_id)
+
+    async def get_user_rank(self, user_id: int) -> Optional[int]:
+        """Получить место пользователя в рейтинге."""
+        async with self._session_factory() as session:
+            return await self._repository_factory(session).get_user_rank(user_id)
+
+    async def get_users_around(self, user_id: int, radius: int = 2) -> List[User]:
+        """Получить соседей пользователя по рейтингу."""
+        async with self._session_factory() as session:
+            return await self._repository_factory(session).get_users_around(user_id, radius)
+
+    async def get_users_by_ids(self, user_ids: List[int]) -> List[User]:
+        """Получить пользователей по списку ID."""
+        async with self._session_factory() as session:
+            return await self._repository_factory(session).get_users_by_ids(user_ids)
+
+    async def iter_user_taps(self, batch_size: int = 1000) -> AsyncIterator[List[Tuple[int, int]]]:
+        """Постранично обойти пары (user_id, taps) всех пользователей."""
+        async with self._session_factory() as session:
+            async for batch in self._repository_factory(session).iter_user_taps(batch_size):
+                yield batch
+
+    async def get_total_taps(self) -> int:
+        """Получить общее количество нажатий всех пользователей."""
+        async with self._session_factory() as session:
+            return await self._repository_factory(session).get_total_taps()
+
+    async def update_user_info(self, user_id: int, info: str) -> User:
+        """Обновить дополнительную информацию о пользователе."""
+        async with self._session_factory() as session:
+            return await self._repository_factory(session).update_user_info(user_id, info)
+
+    async def update_user_photo(self, user_id: int, photo_url: str) -> User:
+        """Обновить фотографию пользователя."""
+        async with self._session_factory() as session:
+            return await self._repository_factory(session).update_user_photo(user_id, photo_url)
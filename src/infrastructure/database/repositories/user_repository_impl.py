@@ -1,12 +1,14 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, AsyncIterator, Dict, Optional, List, Sequence, Tuple
 
-from sqlalchemy import select, update, delete
+from sqlalchemy import Select, select, update, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ....domain.entities.user import User
 from ....domain.repositories.user_repository import UserRepository
 from ..models import UserModel
+from ..routing import read_only
+from ..statements import SELECT_USER_BY_TELEGRAM_ID, USER_COLUMNS, USER_FIELDS, row_to_user
 
 
 class UserRepositoryImpl(UserRepository):
@@ -15,29 +17,30 @@ class UserRepositoryImpl(UserRepository):
     def __init__(self, session: AsyncSession):
         self._session = session
 
+    @read_only
     async def get_by_id(self, user_id: int) -> Optional[User]:
         """Получить пользователя по ID."""
-        query = select(UserModel).where(UserModel.id == user_id)
+        query = select(*USER_COLUMNS).where(UserModel.id == user_id)
         async with self._session() as session:
             result = await session.execute(query)
-        user_model = result.scalar_one_or_none()
+        row = result.one_or_none()
         
-        if user_model is None:
+        if row is None:
             return None
             
-        return self._to_domain(user_model)
+        return row_to_user(row)
 
+    @read_only
     async def get_by_telegram_id(self, telegram_id: int) -> Optional[User]:
         """Получить пользователя по Telegram ID."""
-        query = select(UserModel).where(UserModel.telegram_id == telegram_id)
         async with self._session() as session:
-            result = await session.execute(query)
-        user_model = result.scalar_one_or_none()
+            result = await session.execute(SELECT_USER_BY_TELEGRAM_ID, {"telegram_id": telegram_id})
+        row = result.one_or_none()
         
-        if user_model is None:
+        if row is None:
             return None
             
-        return self._to_domain(user_model)
+        return row_to_user(row)
 
     async def create(self, user: User) -> User:
         """Создать нового пользователя."""
@@ -54,7 +57,7 @@ class UserRepositoryImpl(UserRepository):
         
         async with self._session() as session:
             session.add(user_model)
-            await session.flush()
+            await session.commit()
         
         return self._to_domain(user_model)
 
@@ -76,6 +79,7 @@ class UserRepositoryImpl(UserRepository):
         
         async with self._session() as session:
             await session.execute(query)
+            await session.commit()
         return user
 
     async def delete(self, user_id: int) -> None:
@@ -83,35 +87,128 @@ class UserRepositoryImpl(UserRepository):
         query = delete(UserModel).where(UserModel.id == user_id)
         async with self._session() as session:
             await session.execute(query)
+            await session.commit()
 
+    @read_only
     async def list_all(self) -> List[User]:
         """Получить список всех пользователей."""
-        query = select(UserModel)
+        query = select(*USER_COLUMNS)
         async with self._session() as session:
             result = await session.execute(query)
-        user_models = result.scalars().all()
         
-        return [self._to_domain(model) for model in user_models]
+        return [row_to_user(row) for row in result]
 
+    @read_only
     async def list_active(self) -> List[User]:
         """Получить список активных пользователей."""
-        query = select(UserModel).where(UserModel.is_active == True)
+        query = select(*USER_COLUMNS).where(UserModel.is_active == True)
         async with self._session() as session:
             result = await session.execute(query)
-        user_models = result.scalars().all()
         
-        return [self._to_domain(model) for model in user_models]
+        return [row_to_user(row) for row in result]
+
+    @read_only
+    async def exists_by_telegram_id(self, telegram_id: int) -> bool:
+        """Проверить, есть ли пользователь с таким Telegram ID."""
+        query = select(UserModel.id).where(UserModel.telegram_id == telegram_id).limit(1)
+        async with self._session() as session:
+            result = await session.execute(query)
+        
+        return result.scalar_one_or_none() is not None
+
+    @read_only
+    async def iter_users(
+        self,
+        after_id: int = 0,
+        limit: Optional[int] = None,
+        active_only: bool = False,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[User]:
+        """Потоково обойти пользователей с ID больше after_id по возрастанию ID.
+        
+        Строки читаются курсором на стороне сервера порциями по batch_size,
+        поэтому в памяти не накапливается весь результат.
+        """
+        query = self._list_query(select(*USER_COLUMNS), after_id, limit, active_only)
+        async with self._session() as session:
+            result = await session.stream(query.execution_options(yield_per=batch_size))
+            async for row in result:
+                yield row_to_user(row)
+
+    @read_only
+    async def iter_user_rows(
+        self,
+        after_id: int = 0,
+        limit: Optional[int] = None,
+        active_only: bool = False,
+        batch_size: int = 1000,
+        columns: Optional[Sequence[str]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Потоково обойти пользователей как словари значений колонок.
+        
+        Строки не превращаются ни в ORM-объекты, ни в сущности User, поэтому
+        подходят для выдачи наружу без повторной валидации.
+        """
+        table = UserModel.__table__
+        selected = [table.c[name] for name in columns] if columns else list(table.c)
+        query = self._list_query(select(*selected), after_id, limit, active_only)
+        async with self._session() as session:
+            result = await session.stream(query.execution_options(yield_per=batch_size))
+            async for row in result.mappings():
+                yield dict(row)
+
+    @staticmethod
+    def _list_query(query: Select, after_id: int, limit: Optional[int], active_only: bool) -> Select:
+        """Выборка пользователей с ID больше after_id по возрастанию ID."""
+        query = query.where(UserModel.id > after_id).order_by(UserModel.id)
+        if active_only:
+            query = query.where(UserModel.is_active == True)
+        if limit is not None:
+            query = query.limit(limit)
+        return query
+
+    @read_only
+    async def iter_telegram_ids(self, batch_size: int = 10000) -> AsyncIterator[List[int]]:
+        """Постранично обойти Telegram ID всех пользователей."""
+        async for page in self._iter_telegram_id_pages(batch_size, after_id=0, active_only=False):
+            yield [telegram_id for _, telegram_id in page]
+
+    @read_only
+    async def iter_active_telegram_ids(
+        self,
+        batch_size: int = 1000,
+        after_id: int = 0,
+    ) -> AsyncIterator[List[Tuple[int, int]]]:
+        """Постранично обойти пары (ID, Telegram ID) активных пользователей с ID больше after_id.
+        
+        ID возвращается как курсор, с которого можно продолжить обход. Каждая
+        страница читается в отдельной короткой сессии, поэтому долгий обход
+        (например, рассылка) не держит соединение с базой между страницами.
+        """
+        async for page in self._iter_telegram_id_pages(batch_size, after_id, active_only=True):
+            yield page
+
+    async def _iter_telegram_id_pages(
+        self,
+        batch_size: int,
+        after_id: int,
+        active_only: bool,
+    ) -> AsyncIterator[List[Tuple[int, int]]]:
+        last_id = after_id
+        while True:
+            # Keyset-пагинация по первичному ключу вместо OFFSET
+            query = self._list_query(
+                select(UserModel.id, UserModel.telegram_id), last_id, batch_size, active_only
+            )
+            async with self._session() as session:
+                rows = (await session.execute(query)).all()
+            
+            if not rows:
+                return
+            
+            yield [(row.id, row.telegram_id) for row in rows]
+            last_id = rows[-1].id
 
     def _to_domain(self, model: UserModel) -> User:
         """Преобразовать модель в доменную сущность."""
-        return User(
-            id=model.id,
-            telegram_id=model.telegram_id,
-            username=model.username,
-            first_name=model.first_name,
-            last_name=model.last_name,
-            created_at=model.created_at,
-            updated_at=model.updated_at,
-            is_active=model.is_active,
-            is_admin=model.is_admin,
-        ) 
\ No newline at end of file
+        return User.from_trusted({name: getattr(model, name) for name in USER_FIELDS}) 
\ No newline at end of file
@@ -0,0 +1,174 @@
+import functools
+import inspect
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+# Вызов помечен как только читающий: такие запросы можно отправить на реплику
+_read_only: ContextVar[bool] = ContextVar("database_read_only", default=False)
+# Пользователь, от имени которого выполняются запросы (для окна read-your-writes)
+_actor: ContextVar[Optional[int]] = ContextVar("database_actor", default=None)
+# Все запросы идут в основную базу, даже помеченные read_only
+_primary: ContextVar[bool] = ContextVar("database_primary", default=False)
+
+
+def read_only(func):
+    """Пометить метод репозитория как только читающий, чтобы его запросы могли уйти на реплику."""
+    if inspect.isasyncgenfunction(func):
+        @functools.wraps(func)
+        async def generator_wrapper(*args, **kwargs):
+            iterator = func(*args, **kwargs)
+            try:
+                while True:
+                    # Флаг ставится только на время получения очередной порции, а не между ними
+                    token = _read_only.set(True)
+                    try:
+                        item = await iterator.__anext__()
+                    except StopAsyncIteration:
+                        return
+                    finally:
+                        _read_only.reset(token)
+                    yield item
+            finally:
+                # При досрочном закрытии закрываем и исходный генератор, чтобы он освободил сессию
+                await iterator.aclose()
+        return generator_wrapper
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        token = _read_only.set(True)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            _read_only.reset(token)
+    return wrapper
+
+
+@contextmanager
+def database_actor(actor_id: Optional[int]) -> Iterator[None]:
+    """Выполнять запросы от имени пользователя: после его записи чтения идут в основную базу."""
+    token = _actor.set(actor_id)
+    try:
+        yield
+    finally:
+        _actor.reset(token)
+
+
+def current_actor() -> Optional[int]:
+    """Получить пользователя, от имени которого сейчас выполняются запросы."""
+    return _actor.get()
+
+
+def note_actor_writes(session: AsyncSession, actor_ids: Iterable[int]) -> None:
+    """Открыть окно read-your-writes для пользователей, чьи данные записаны вне их апдейта.
+    
+    Нужно для отложенной записи: она идет из фоновой задачи, а не от имени пользователя.
+    Без маршрутизации между базами ничего не делает.
+    """
+    router: Optional[DatabaseRouter] = session.info.get("router")
+    if router is not None:
+        router.note_writes(actor_ids)
+
+
+@contextmanager
+def use_primary() -> Iterator[None]:
+    """Выполнять все запросы в основной базе: для чтений, которым нельзя отставать."""
+    token = _primary.set(True)
+    try:
+        yield
+    finally:
+        _primary.reset(token)
+
+
+class DatabaseRouter:
+    """Выбор базы для запросов: основная для записи, реплики для чтения.
+
+    После записи от имени пользователя его чтения в течение read_your_writes
+    секунд идут в основную базу, чтобы он сразу видел свои изменения несмотря
+    на отставание реплик.
+    """
+
+    # Порог, после которого из журнала записей удаляются истекшие окна
+    PRUNE_THRESHOLD = 10000
+
+    def __init__(self, primary: AsyncEngine, replicas: List[AsyncEngine], read_your_writes: float = 5.0):
+        self.primary = primary
+        self.replicas = replicas
+        self.read_your_writes = read_your_writes
+        self._replica_cycle = itertools.cycle(replicas) if replicas else None
+        self._recent_writes: Dict[int, float] = {}
+
+    def note_write(self) -> None:
+        """Открыть окно read-your-writes для текущего пользователя."""
+        actor = _actor.get()
+        if actor is not None:
+            self.note_writes([actor])
+
+    def note_writes(self, actors: Iterable[int]) -> None:
+        """Открыть окно read-your-writes для перечисленных пользователей."""
+        if self.read_your_writes <= 0:
+            return
+        now = time.monotonic()
+        if len(self._recent_writes) > self.PRUNE_THRESHOLD:
+            self._recent_writes = {key: until for key, until in self._recent_writes.items() if until > now}
+        for actor in actors:
+            self._recent_writes[actor] = now + self.read_your_writes
+
+    def in_write_window(self) -> bool:
+        """Проверить, что текущий пользователь недавно писал в базу."""
+        actor = _actor.get()
+        if actor is None:
+            return False
+        until = self._recent_writes.get(actor)
+        return until is not None and until > time.monotonic()
+
+    def next_replica(self) -> Optional[AsyncEngine]:
+        """Выбрать реплику по кругу."""
+        return next(self._replica_cycle) if self._replica_cycle is not None else None
+
+
+class RoutingSession(Session):
+    """Сессия, которая отправляет помеченные read_only чтения на реплику, а остальное — в основную базу.
+
+    После первой записи сессия до конца работает только с основной базой.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw) -> Engine:
+        router: DatabaseRouter = self.info["router"]
+
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info["wrote"] = True
+            router.note_write()
+            return router.primary.sync_engine
+
+        if (
+            _read_only.get()
+            and not _primary.get()
+            and not self.info.get("wrote")
+            and not router.in_write_window()
+        ):
+            # Одна реплика на сессию, чтобы чтения внутри сессии видели один снимок
+            replica = self.info.get("replica")
+            if replica is None:
+                replica = self.info["replica"] = router.next_replica()
+            if replica is not None:
+                return replica.sync_engine
+
+        return router.primary.sync_engine
+
+
+def create_routing_session_factory(router: DatabaseRouter) -> async_sessionmaker[AsyncSession]:
+    """Создание фабрики сессий с маршрутизацией между основной базой и репликами."""
+    return async_sessionmaker(
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        expire_on_commit=False,
+        info={"router": router},
+    )
@@ -1,31 +1,109 @@
-from typing import AsyncGenerator, Optional
+from typing import AsyncGenerator, Dict, List, Optional
 
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.pool import QueuePool
 
 from src.config import settings
+from .routing import DatabaseRouter, create_routing_session_factory
 
+# Один движок и пул соединений на процесс: создаются при старте API/бота и закрываются при остановке
+_engine: Optional[AsyncEngine] = None
+_replica_engines: List[AsyncEngine] = []
+_session_factory: Optional[async_sessionmaker[AsyncSession]] = None
 
-async def create_session_factory() -> async_sessionmaker[AsyncSession]:
-    """Создание фабрики сессий для работы с базой данных."""
-    # Создание асинхронного движка
-    engine = create_async_engine(
+
+def get_database_url() -> str:
+    """Получение URL базы данных из настроек."""
+    return (
         f"postgresql+asyncpg://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@"
-        f"{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}",
-        echo=False,
+        f"{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
     )
 
-    # Создание фабрики сессий
-    async_session = async_sessionmaker(
-        engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-    )
 
-    return async_session
+def create_engine(database_url: Optional[str] = None) -> AsyncEngine:
+    """Создание асинхронного движка с настройками пула из Settings."""
+    database_url = database_url or get_database_url()
+    options = {}
+    if database_url.startswith("postgresql"):
+        options = dict(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SEC,
+            pool_recycle=settings.DB_POOL_RECYCLE_SEC,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            # Кэш подготовленных выражений asyncpg на соединение; 0 — для pgbouncer в режиме transaction
+            connect_args={"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
+        )
+    return create_async_engine(database_url, echo=False, **options)
+
+
+def init_engine(database_url: Optional[str] = None, replica_urls: Optional[List[str]] = None) -> AsyncEngine:
+    """Создание движка и фабрики сессий процесса, если они еще не созданы.
+    
+    Если заданы реплики, фабрика создает сессии, которые отправляют чтения
+    репозиториев, помеченные read_only, на реплики, а запись — в основную базу.
+    """
+    global _engine, _replica_engines, _session_factory
+    if _engine is None:
+        _engine = create_engine(database_url)
+        if replica_urls is None:
+            replica_urls = settings.DATABASE_REPLICA_URLS
+        _replica_engines = [create_engine(url) for url in replica_urls]
+        
+        if _replica_engines:
+            router = DatabaseRouter(
+                _engine,
+                _replica_engines,
+                read_your_writes=settings.DB_READ_YOUR_WRITES_SEC,
+            )
+            _session_factory = create_routing_session_factory(router)
+        else:
+            _session_factory = async_sessionmaker(
+                _engine,
+                class_=AsyncSession,
+                expire_on_commit=False,
+            )
+    return _engine
+
+
+def get_engine() -> AsyncEngine:
+    """Получение движка процесса (создается при первом обращении)."""
+    return init_engine()
+
+
+async def dispose_engine() -> None:
+    """Закрытие всех соединений пула и сброс движка процесса."""
+    global _engine, _replica_engines, _session_factory
+    for engine in [_engine, *_replica_engines]:
+        if engine is not None:
+            await engine.dispose()
+    _engine = None
+    _replica_engines = []
+    _session_factory = None
+
+
+def get_pool_stats() -> Dict[str, int]:
+    """Получение состояния пула соединений основной базы."""
+    if _engine is None or not isinstance(_engine.pool, QueuePool):
+        return {}
+    pool = _engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+
+
+async def create_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Получение фабрики сессий поверх общего движка процесса."""
+    init_engine()
+    return _session_factory
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
@@ -39,4 +117,4 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
             await session.rollback()
             raise
         finally:
-            await session.close() 
\ No newline at end of file
+            await session.close()
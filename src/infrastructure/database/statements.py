@@ -0,0 +1,51 @@
+"""Заранее построенные выражения для горячих запросов репозиториев.
+
+Выражения создаются один раз при импорте, а значения передаются через bindparam.
+SQLAlchemy запоминает ключ кэша у самого объекта выражения, поэтому на каждый
+вызов не строится новое дерево Select/Update и не считается его ключ — сразу
+берется скомпилированный SQL из кэша компиляции. Текст SQL при этом одинаковый
+для любых значений, и asyncpg находит его в кэше подготовленных выражений
+соединения (DB_STATEMENT_CACHE_SIZE) без повторного PREPARE на сервере.
+
+Пользователи выбираются колонками USER_COLUMNS, а не ORM-объектами: строка
+сразу превращается в сущность через row_to_user без identity map и без
+валидации pydantic.
+"""
+from typing import Sequence
+
+from sqlalchemy import bindparam, func, select, update
+
+from ...domain.entities.user import User
+from .models import UserModel
+
+# Колонки users в порядке полей сущности User
+USER_FIELDS = tuple(User.model_fields)
+USER_COLUMNS = tuple(UserModel.__table__.c[name] for name in USER_FIELDS)
+
+
+def row_to_user(row: Sequence) -> User:
+    """Сущность из строки, выбранной колонками USER_COLUMNS, без валидации."""
+    return User.from_trusted(dict(zip(USER_FIELDS, row)))
+
+
+# SELECT ... FROM users WHERE telegram_id = :telegram_id
+SELECT_USER_BY_TELEGRAM_ID = select(*USER_COLUMNS).where(UserModel.telegram_id == bindparam("telegram_id"))
+
+# UPDATE users SET taps = taps + :amount WHERE id = :user_id RETURNING ...
+INCREMENT_TAPS = (
+    update(UserModel)
+    .where(UserModel.id == bindparam("user_id"))
+    .values(taps=UserModel.taps + bindparam("amount"))
+    .returning(*USER_COLUMNS)
+    .execution_options(synchronize_session=False)
+)
+
+# SELECT ... FROM users ORDER BY taps DESC, id LIMIT :limit
+SELECT_TOP_USERS = (
+    select(*USER_COLUMNS)
+    .order_by(UserModel.taps.desc(), UserModel.id.asc())
+    .limit(bindparam("limit"))
+)
+
+# SELECT coalesce(sum(taps), 0) FROM users
+SELECT_TOTAL_TAPS = select(func.coalesce(func.sum(UserModel.taps), 0))
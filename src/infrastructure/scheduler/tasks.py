@@ -1,78 +1,209 @@
 import logging
 import asyncio
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from typing import Optional
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from loguru import logger
 
+from src.application.interfaces.leader_election import LeaderElection
 from src.application.use_cases.user_management import UserManagementUseCase
 from src.application.use_cases.rating_management import RatingManagementUseCase
 from src.config import settings
 from src.infrastructure.database.session import create_session_factory
 from src.infrastructure.services.user_service_impl import UserServiceImpl
 from src.infrastructure.database.repositories.user_repository_impl import UserRepositoryImpl
+from src.infrastructure.database.repositories.rating_repository_impl import RatingRepositoryImpl
+from src.infrastructure.cache.leaderboard import LeaderboardRatingRepository, RedisLeaderboard
+from src.infrastructure.cache.user_registry import BloomUserRegistry
+from src.infrastructure.broadcast.broadcaster import Broadcaster
 
 
 logger = logging.getLogger(__name__)
 
+# Размер страницы получателей дайджеста
+DIGEST_BATCH_SIZE = 1000
+
+# Задачи, которые при нескольких репликах выполняет только лидер
+LEADER_JOBS = ("daily_digest", "reconcile_total_taps")
+
+
+def daily_digest_id(day: Optional[date] = None) -> str:
+    """Идентификатор рассылки дайджеста за день: по нему сохраняется и возобновляется прогресс."""
+    return f"daily_digest:{(day or date.today()).isoformat()}"
+
 
 async def send_daily_digest(
-    bot,
+    broadcaster: Broadcaster,
     user_management: UserManagementUseCase,
     rating_management: RatingManagementUseCase,
+    resume_only: bool = False,
 ) -> None:
-    """Отправка ежедневного дайджеста пользователям."""
+    """Отправка ежедневного дайджеста пользователям.
+    
+    С ``resume_only`` дайджест отправляется, только если сегодняшняя рассылка
+    была начата и не завершена, — так она продолжается после перезапуска бота.
+    """
+    broadcast_id = daily_digest_id()
     try:
-        # Получаем всех активных пользователей
-        users = await user_management.get_users(active=True)
-        
-        # Получаем топ пользователей
-        top_users = await rating_management.get_top_users(limit=5)
+        if resume_only:
+            progress = await broadcaster.get_progress(broadcast_id)
+            if progress is None or progress.finished:
+                return
         
-        # Получаем общее количество нажатий
-        total_taps = await rating_management.get_total_taps()
+        # Получаем топ пользователей и общее количество нажатий
+        snapshot = await rating_management.get_rating_snapshot(limit=5)
         
         # Формируем сообщение
         text = (
             "📊 Ежедневный дайджест\n\n"
-            f"Всего нажатий: {total_taps}\n\n"
+            f"Всего нажатий: {snapshot.total_taps}\n\n"
             "Топ пользователей:\n"
         )
         
-        for i, user in enumerate(top_users, 1):
+        for i, user in enumerate(snapshot.top_users, 1):
             text += f"{i}. {user.username or 'Аноним'}: {user.taps}\n"
         
-        # Отправляем сообщение всем пользователям
-        for user in users:
-            try:
-                await bot.send_message(user.telegram_id, text)
-            except Exception as e:
-                logger.error(f"Failed to send digest to user {user.telegram_id}: {e}")
+        # Активные пользователи страницами по возрастанию ID, начиная после курсора рассылки:
+        # в памяти только текущая страница, сколько бы ни было получателей
+        async def recipients(after_id: int):
+            async for page in user_management.iter_active_telegram_ids(DIGEST_BATCH_SIZE, after_id):
+                for recipient in page:
+                    yield recipient
+        
+        await broadcaster.run(broadcast_id, recipients, text)
     
     except Exception as e:
         logger.error(f"Failed to send daily digest: {e}")
 
 
+async def reconcile_total_taps(
+    session_factory: async_sessionmaker[AsyncSession],
+    leaderboard: RedisLeaderboard,
+) -> None:
+    """Сверка счетчика общего количества нажатий с базой."""
+    try:
+        async with session_factory() as session:
+            repository = LeaderboardRatingRepository(RatingRepositoryImpl(session), leaderboard)
+            await repository.reconcile_total_taps()
+    except Exception as e:
+        logger.error(f"Failed to reconcile total taps: {e}")
+
+
+async def reload_user_registry(user_registry: BloomUserRegistry) -> None:
+    """Перестроение реестра пользователей: убирает из фильтра удаленных."""
+    try:
+        await user_registry.load()
+    except Exception as e:
+        logger.error(f"Failed to reload user registry: {e}")
+
+
+def add_user_registry_job(scheduler: AsyncIOScheduler, user_registry: BloomUserRegistry) -> None:
+    """Добавить задачу периодического перестроения реестра пользователей, если оно включено."""
+    if settings.USER_REGISTRY_RELOAD_INTERVAL_SEC <= 0:
+        return
+    scheduler.add_job(
+        reload_user_registry,
+        IntervalTrigger(seconds=settings.USER_REGISTRY_RELOAD_INTERVAL_SEC),
+        args=[user_registry],
+        id="reload_user_registry",
+        replace_existing=True,
+    )
+
+
+async def setup_user_registry_scheduler(user_registry: BloomUserRegistry) -> AsyncIOScheduler:
+    """Планировщик только с перестроением реестра пользователей.
+    
+    Для процессов без общего планировщика (обработчики обновлений, кроме первого):
+    реестр у каждого процесса свой, и перестраиваться должен в каждом.
+    """
+    scheduler = AsyncIOScheduler()
+    add_user_registry_job(scheduler, user_registry)
+    scheduler.start()
+    return scheduler
+
+
 async def setup_scheduler(
     bot,
     user_management: UserManagementUseCase,
     rating_management: RatingManagementUseCase,
+    session_factory: Optional[async_sessionmaker[AsyncSession]] = None,
+    leaderboard: Optional[RedisLeaderboard] = None,
+    user_registry: Optional[BloomUserRegistry] = None,
+    broadcaster: Optional[Broadcaster] = None,
+    leader_election: Optional[LeaderElection] = None,
 ) -> AsyncIOScheduler:
-    """Настройка и запуск планировщика задач."""
+    """Настройка и запуск планировщика задач.
+    
+    С ``leader_election`` задачи из LEADER_JOBS выполняются только на реплике-лидере:
+    на остальных они стоят на паузе и запускаются, когда реплика получает лидерство.
+    Перестроение реестра пользователей остается на каждой реплике — реестр у каждой свой.
+    """
     scheduler = AsyncIOScheduler()
+    broadcaster = broadcaster or Broadcaster(bot)
+    digest_args = [broadcaster, user_management, rating_management]
+    # Задачи лидера при выборах добавляются на паузе: next_run_time=None
+    leader_job_options = {"next_run_time": None} if leader_election is not None else {}
     
     # Добавляем задачу отправки ежедневного дайджеста
     scheduler.add_job(
         send_daily_digest,
         CronTrigger(hour=20, minute=0),  # Каждый день в 20:00
-        args=[bot, user_management, rating_management],
+        args=digest_args,
         id="daily_digest",
         replace_existing=True,
+        **leader_job_options,
     )
     
+    # Добавляем задачу сверки общего количества нажатий
+    if session_factory is not None and leaderboard is not None:
+        scheduler.add_job(
+            reconcile_total_taps,
+            IntervalTrigger(seconds=settings.RATING_TOTAL_RECONCILE_INTERVAL_SEC),
+            args=[session_factory, leaderboard],
+            id="reconcile_total_taps",
+            replace_existing=True,
+            **leader_job_options,
+        )
+    
+    # Добавляем задачу перестроения реестра пользователей
+    if user_registry is not None:
+        add_user_registry_job(scheduler, user_registry)
+    
+    def resume_digest() -> None:
+        # Продолжаем сегодняшний дайджест, если он был прерван (в том числе прежним лидером)
+        scheduler.add_job(
+            send_daily_digest,
+            args=digest_args,
+            kwargs={"resume_only": True},
+            id="resume_daily_digest",
+            replace_existing=True,
+            misfire_grace_time=None,
+        )
+    
+    def on_elected() -> None:
+        for job_id in LEADER_JOBS:
+            if scheduler.get_job(job_id) is not None:
+                scheduler.resume_job(job_id)
+        resume_digest()
+    
+    def on_revoked() -> None:
+        for job_id in LEADER_JOBS:
+            if scheduler.get_job(job_id) is not None:
+                scheduler.pause_job(job_id)
+    
     # Запускаем планировщик
     scheduler.start()
     logger.info("Scheduler started")
     
-    return scheduler 
\ No newline at end of file
+    if leader_election is None:
+        resume_digest()
+    else:
+        leader_election.add_listener(on_elected=on_elected, on_revoked=on_revoked)
+        if leader_election.is_leader:
+            on_elected()
+    
+    return scheduler
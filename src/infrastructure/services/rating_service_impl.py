@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional, Tuple
 
 from ...application.services.rating_service import RatingService
 from ...domain.entities.user import User
@@ -11,14 +11,30 @@ class RatingServiceImpl(RatingService):
     def __init__(self, rating_repository: RatingRepository):
         super().__init__(rating_repository)
     
-    async def increment_taps(self, user_id: int) -> User:
+    async def increment_taps(self, user_id: int, amount: int = 1) -> User:
         """Увеличить количество нажатий пользователя."""
-        return await self.rating_repository.increment_taps(user_id)
+        return await self.rating_repository.increment_taps(user_id, amount)
     
     async def get_top_users(self, limit: int = 10) -> List[User]:
         """Получить список пользователей с наивысшим рейтингом."""
         return await self.rating_repository.get_top_users(limit)
     
+    async def get_rating_page(self, limit: int, after: Optional[Tuple[int, int]] = None) -> List[User]:
+        """Получить страницу рейтинга после курсора (taps, id) последней записи."""
+        return await self.rating_repository.get_rating_page(limit, after)
+    
+    async def get_user_by_telegram_id(self, telegram_id: int) -> Optional[User]:
+        """Получить пользователя по Telegram ID."""
+        return await self.rating_repository.get_user_by_telegram_id(telegram_id)
+    
+    async def get_user_rank(self, user_id: int) -> Optional[int]:
+        """Получить место пользователя в рейтинге."""
+        return await self.rating_repository.get_user_rank(user_id)
+    
+    async def get_users_around(self, user_id: int, radius: int = 2) -> List[User]:
+        """Получить соседей пользователя по рейтингу."""
+        return await self.rating_repository.get_users_around(user_id, radius)
+    
     async def get_total_taps(self) -> int:
         """Получить общее количество нажатий всех пользователей."""
         return await self.rating_repository.get_total_taps()
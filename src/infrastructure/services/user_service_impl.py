@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Any, AsyncIterator, Dict, Optional, List, Sequence, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, delete
 
@@ -48,6 +48,14 @@ class UserServiceImpl(UserService):
         await self.repository.update(user)
         return True
 
+    async def get_by_telegram_id(self, telegram_id: int) -> Optional[User]:
+        """Получить пользователя по Telegram ID."""
+        return await self.repository.get_by_telegram_id(telegram_id)
+
+    async def create(self, user: User) -> User:
+        """Создать нового пользователя."""
+        return await self.repository.create(user)
+
     async def get_by_id(self, user_id: int) -> Optional[User]:
         """Получить пользователя по ID."""
         return await self.repository.get_by_id(user_id)
@@ -66,4 +74,33 @@ class UserServiceImpl(UserService):
 
     async def list_active(self) -> List[User]:
         """Получить список активных пользователей."""
-        return await self.repository.list_active() 
\ No newline at end of file
+        return await self.repository.list_active() 
+
+    def iter_users(
+        self,
+        after_id: int = 0,
+        limit: Optional[int] = None,
+        active_only: bool = False,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[User]:
+        """Потоково обойти пользователей с ID больше after_id по возрастанию ID."""
+        return self.repository.iter_users(after_id, limit, active_only, batch_size)
+
+    def iter_user_rows(
+        self,
+        after_id: int = 0,
+        limit: Optional[int] = None,
+        active_only: bool = False,
+        batch_size: int = 1000,
+        columns: Optional[Sequence[str]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Потоково обойти пользователей как словари значений колонок без создания сущностей."""
+        return self.repository.iter_user_rows(after_id, limit, active_only, batch_size, columns)
+
+    def iter_active_telegram_ids(
+        self,
+        batch_size: int = 1000,
+        after_id: int = 0,
+    ) -> AsyncIterator[List[Tuple[int, int]]]:
+        """Постранично обойти пары (ID, Telegram ID) активных пользователей с ID больше after_id."""
+        return self.repository.iter_active_telegram_ids(batch_size, after_id)
@@ -0,0 +1,127 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from loguru import logger
+
+from ..broadcast.rate_limit import HIGH_PRIORITY, LOW_PRIORITY, ChatPacer, TokenBucket
+
+# Полосы исходящих запросов: ответы пользователям обслуживаются раньше рассылок
+INTERACTIVE = "interactive"
+BROADCAST = "broadcast"
+LANE_PRIORITIES = {INTERACTIVE: HIGH_PRIORITY, BROADCAST: LOW_PRIORITY}
+
+_current_lane: ContextVar[str] = ContextVar("outbound_lane", default=INTERACTIVE)
+
+
+@contextmanager
+def outbound_lane(lane: str) -> Iterator[None]:
+    """Отправлять запросы к Bot API внутри блока по указанной полосе.
+    
+    Полоса наследуется задачами, созданными внутри блока.
+    """
+    token = _current_lane.set(lane)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+@dataclass
+class LaneStats:
+    """Счетчики полосы: текущая очередь и время ожидания отправки."""
+    
+    queued: int = 0
+    requests: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+
+
+class OutboundScheduler(BaseRequestMiddleware):
+    """Единый планировщик исходящих запросов к Bot API — middleware сессии ``Bot``.
+    
+    Все запросы с ``chat_id`` (ответы в обработчиках, рассылки, уведомления)
+    проходят через общие лимиты:
+    
+    - глобальное ведро токенов на ``rate`` запросов в секунду, в котором
+      полоса INTERACTIVE обслуживается раньше полосы BROADCAST;
+    - ведро на каждый чат: сообщение раз в ``chat_interval`` секунд,
+      до ``chat_burst`` подряд;
+    - ``TelegramRetryAfter`` на любом запросе приостанавливает все
+      исходящие запросы на ``retry_after`` секунд; сама ошибка передается
+      вызывающему коду, который решает, повторять ли запрос.
+    
+    Запросы без ``chat_id`` (getUpdates, getMe, answerCallbackQuery) идут
+    без ожидания: иначе long polling стоял бы в очереди за рассылкой.
+    
+    Исключение — ответы в режиме webhook, которые обработчик возвращает
+    в теле HTTP-ответа: они не проходят через сессию бота, поэтому не ждут
+    ни глобального лимита, ни лимита на чат и не учитываются в них.
+    """
+
+    def __init__(
+        self,
+        rate: float = 25.0,
+        chat_interval: float = 1.0,
+        chat_burst: int = 1,
+        bucket: Optional[TokenBucket] = None,
+    ):
+        self.bucket = bucket or TokenBucket(rate)
+        self._pacer = ChatPacer(chat_interval, burst=chat_burst)
+        self._lanes = {lane: LaneStats() for lane in LANE_PRIORITIES}
+        self.retry_after = 0
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None:
+            return await make_request(bot, method)
+        
+        lane = _current_lane.get()
+        stats = self._lanes[lane]
+        stats.queued += 1
+        started = time.monotonic()
+        try:
+            await self._pacer.wait(chat_id)
+            await self.bucket.acquire(LANE_PRIORITIES[lane])
+        finally:
+            stats.queued -= 1
+        
+        waited = time.monotonic() - started
+        stats.requests += 1
+        stats.wait_total += waited
+        stats.wait_max = max(stats.wait_max, waited)
+        
+        try:
+            return await make_request(bot, method)
+        except TelegramRetryAfter as e:
+            # Ограничение действует на весь бот: приостанавливаем все полосы
+            logger.warning(f"Flood control on {method.__api_method__}, pausing outbound requests for {e.retry_after}s")
+            self.retry_after += 1
+            self.bucket.pause(e.retry_after)
+            raise
+
+    def get_stats(self) -> Dict[str, float]:
+        """Получить глубину очередей и время ожидания по полосам."""
+        stats: Dict[str, float] = {
+            "retry_after": self.retry_after,
+            "paused_for": round(self.bucket.paused_for, 3),
+        }
+        for lane, lane_stats in self._lanes.items():
+            stats[f"{lane}_queued"] = lane_stats.queued
+            stats[f"{lane}_requests"] = lane_stats.requests
+            wait_avg = lane_stats.wait_total / lane_stats.requests if lane_stats.requests else 0.0
+            stats[f"{lane}_wait_avg_ms"] = round(wait_avg * 1000, 1)
+            stats[f"{lane}_wait_max_ms"] = round(lane_stats.wait_max * 1000, 1)
+        return stats
@@ -1,26 +1,67 @@
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 
 from fastapi import Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from src.application.use_cases.rating_management import RatingManagementUseCase
 from src.application.use_cases.user_management import UserManagementUseCase
-from src.infrastructure.database.session import get_session
+from src.config import settings
+from src.infrastructure.cache.leaderboard import LeaderboardRatingRepository, RedisLeaderboard
+from src.infrastructure.cache.redis import get_redis
+from src.infrastructure.cache.user_registry import RedisRegistrationFeed
+from src.infrastructure.database.session import create_session_factory, get_session
 from src.infrastructure.services.user_service_impl import UserServiceImpl
 from src.infrastructure.services.rating_service_impl import RatingServiceImpl
 from src.infrastructure.database.repositories.user_repository_impl import UserRepositoryImpl
 from src.infrastructure.database.repositories.rating_repository_impl import RatingRepositoryImpl
 
 
+async def get_leaderboard() -> Optional[RedisLeaderboard]:
+    """Получение рейтинга в Redis или None, если он выключен (LEADERBOARD_ENABLED)."""
+    if not settings.LEADERBOARD_ENABLED:
+        return None
+    return RedisLeaderboard(get_redis(), key=settings.LEADERBOARD_KEY)
+
+
+async def get_registration_feed() -> Optional[RedisRegistrationFeed]:
+    """Получение канала оповещений о регистрациях или None, если реестр пользователей выключен."""
+    if not settings.USER_REGISTRY_ENABLED:
+        return None
+    return RedisRegistrationFeed(get_redis(), channel=settings.USER_REGISTRY_CHANNEL)
+
+
 async def get_user_management(
-    session: AsyncSession = Depends(get_session),
-) -> AsyncGenerator[UserManagementUseCase, None]:
-    """Получение экземпляра UserManagementUseCase."""
-    user_repository = UserRepositoryImpl(session)
+    session_factory: async_sessionmaker[AsyncSession] = Depends(create_session_factory),
+    registration_feed: Optional[RedisRegistrationFeed] = Depends(get_registration_feed),
+) -> UserManagementUseCase:
+    """Получение экземпляра UserManagementUseCase.
+    
+    Репозиторий открывает сессию на каждый запрос к базе, поэтому потоковые
+    ответы читают данные уже после выхода из зависимостей. Созданные
+    пользователи сразу попадают в реестры процессов бота через канал оповещений.
+    """
+    user_repository = UserRepositoryImpl(session_factory)
     user_service = UserServiceImpl(user_repository)
-    user_management = UserManagementUseCase(user_service)
+    return UserManagementUseCase(user_service, registration_feed=registration_feed)
+
+
+async def get_rating_management(
+    session: AsyncSession = Depends(get_session),
+    leaderboard: Optional[RedisLeaderboard] = Depends(get_leaderboard),
+) -> AsyncGenerator[RatingManagementUseCase, None]:
+    """Получение экземпляра RatingManagementUseCase.
+    
+    Если рейтинг в Redis включен, общее количество нажатий и места
+    пользователей читаются из него, а не считаются в базе.
+    """
+    rating_repository = RatingRepositoryImpl(session)
+    if leaderboard is not None:
+        rating_repository = LeaderboardRatingRepository(rating_repository, leaderboard)
+    rating_service = RatingServiceImpl(rating_repository)
+    rating_management = RatingManagementUseCase(rating_service)
     
     try:
-        yield user_management
+        yield rating_management
     finally:
         await session.close()
 
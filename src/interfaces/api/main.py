@@ -1,9 +1,25 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
 from src.config import settings
+from src.infrastructure.cache.redis import close_redis
+from src.infrastructure.database.session import dispose_engine, init_engine
 from .dependencies import get_user_management
-from .routers import users
+from .routers import rating, users
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Создание движка базы данных при старте, закрытие пула и клиента Redis при остановке."""
+    init_engine()
+    yield
+    await dispose_engine()
+    await close_redis()
 
 
 def create_app() -> FastAPI:
@@ -15,6 +31,9 @@ def create_app() -> FastAPI:
         docs_url=f"{settings.API_PREFIX}/docs",
         redoc_url=f"{settings.API_PREFIX}/redoc",
         openapi_url=f"{settings.API_PREFIX}/openapi.json",
+        lifespan=lifespan,
+        # orjson вместо стандартного json для всех ответов
+        default_response_class=ORJSONResponse,
     )
 
     # Настройка CORS
@@ -25,6 +44,8 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    # Сжатие больших ответов, в том числе потоковой выгрузки пользователей
+    app.add_middleware(GZipMiddleware, minimum_size=settings.API_GZIP_MIN_SIZE)
 
     # Подключение роутеров
     app.include_router(
@@ -32,6 +53,11 @@ def create_app() -> FastAPI:
         prefix=f"{settings.API_PREFIX}/users",
         tags=["users"],
     )
+    app.include_router(
+        rating.router,
+        prefix=f"{settings.API_PREFIX}/rating",
+        tags=["rating"],
+    )
 
     return app
 
@@ -0,0 +1,26 @@
+import base64
+import binascii
+from typing import Tuple
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(*position: int) -> str:
+    """Закодировать позицию последней записи страницы (ключи keyset-пагинации) в курсор."""
+    raw = ":".join(str(value) for value in position)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int = 1) -> Tuple[int, ...]:
+    """Раскодировать курсор в позицию из ``size`` чисел; некорректный курсор — ошибка 400."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        position = tuple(int(value) for value in raw.split(":"))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        position = ()
+    if len(position) != size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+    return position
@@ -0,0 +1,52 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from src.application.use_cases.rating_management import RatingManagementUseCase
+from ..dependencies import get_rating_management
+from ..pagination import decode_cursor, encode_cursor
+from ..schemas import RatingEntry, RatingPage, RatingRank, RatingTotal
+
+router = APIRouter()
+
+MAX_PAGE_SIZE = 500
+
+
+@router.get("/", response_model=RatingPage)
+async def get_rating_page(
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE, description="Размер страницы"),
+    cursor: Optional[str] = Query(None, description="Курсор из next_cursor предыдущей страницы"),
+    rating_management: RatingManagementUseCase = Depends(get_rating_management),
+) -> RatingPage:
+    """Получить страницу рейтинга в порядке убывания нажатий."""
+    # Позиция (taps, id) последней записи предыдущей страницы
+    after = decode_cursor(cursor, size=2) if cursor is not None else None
+    users, next_position = await rating_management.get_rating_page(limit, after)
+    return RatingPage(
+        items=[RatingEntry.model_validate(user) for user in users],
+        next_cursor=encode_cursor(*next_position) if next_position is not None else None,
+    )
+
+
+@router.get("/total", response_model=RatingTotal)
+async def get_total_taps(
+    rating_management: RatingManagementUseCase = Depends(get_rating_management),
+) -> RatingTotal:
+    """Получить общее количество нажатий всех пользователей."""
+    return RatingTotal(total_taps=await rating_management.get_total_taps())
+
+
+@router.get("/rank/{telegram_id}", response_model=RatingRank)
+async def get_user_rank(
+    telegram_id: int,
+    rating_management: RatingManagementUseCase = Depends(get_rating_management),
+) -> RatingRank:
+    """Получить место пользователя в рейтинге по Telegram ID."""
+    position = await rating_management.get_user_position(telegram_id)
+    if position is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"User with telegram_id {telegram_id} not found",
+        )
+    user, rank = position
+    return RatingRank(**RatingEntry.model_validate(user).model_dump(), rank=rank)
@@ -1,36 +1,115 @@
-from typing import List
+from typing import Any, AsyncIterator, Dict, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
 from src.application.use_cases.user_management import UserManagementUseCase
 from src.domain.entities.user import User
-from ..dependencies import get_user_management
-from ..schemas import UserCreate, UserResponse, UserUpdate
+from src.infrastructure.cache.leaderboard import RedisLeaderboard
+from ..dependencies import get_leaderboard, get_user_management
+from ..pagination import decode_cursor, encode_cursor
+from ..schemas import UserCreate, UserPage, UserResponse, UserUpdate
 
 router = APIRouter()
 
+MAX_PAGE_SIZE = 500
+# Сколько строк NDJSON отправляется одним фрагментом ответа
+STREAM_CHUNK_SIZE = 1000
+# Колонки, которые читаются из базы для списков: ровно поля UserResponse
+USER_RESPONSE_FIELDS = tuple(UserResponse.model_fields)
+
+
+def after_id(cursor: Optional[str]) -> int:
+    """ID из курсора, после которого начинается страница (0 — с начала)."""
+    return decode_cursor(cursor)[0] if cursor is not None else 0
+
+
+def user_response(user: User, status_code: int = status.HTTP_200_OK) -> ORJSONResponse:
+    """Ответ с полями UserResponse из уже провалидированной сущности, без повторной валидации."""
+    return ORJSONResponse(user.model_dump(include=set(USER_RESPONSE_FIELDS)), status_code=status_code)
+
+
+async def list_page(
+    user_management: UserManagementUseCase,
+    limit: int,
+    cursor: Optional[str],
+    active_only: bool,
+) -> ORJSONResponse:
+    """Страница в формате UserPage, собранная из строк базы без моделей pydantic.
+    
+    Ответ возвращается готовым, поэтому FastAPI не валидирует его повторно
+    через response_model, а строки сразу сериализуются orjson.
+    """
+    rows, next_id = await user_management.get_user_rows_page(
+        limit,
+        after_id(cursor),
+        active_only,
+        USER_RESPONSE_FIELDS,
+    )
+    return ORJSONResponse({
+        "items": rows,
+        "next_cursor": encode_cursor(next_id) if next_id is not None else None,
+    })
+
 
-@router.get("/", response_model=List[UserResponse])
+@router.get("/", response_model=UserPage)
 async def list_users(
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Размер страницы"),
+    cursor: Optional[str] = Query(None, description="Курсор из next_cursor предыдущей страницы"),
     user_management: UserManagementUseCase = Depends(get_user_management),
-) -> List[User]:
-    """Получить список всех пользователей."""
-    return await user_management.list_all()
+) -> ORJSONResponse:
+    """Получить страницу пользователей в порядке возрастания ID."""
+    return await list_page(user_management, limit, cursor, active_only=False)
 
 
-@router.get("/active", response_model=List[UserResponse])
+@router.get("/active", response_model=UserPage)
 async def list_active_users(
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Размер страницы"),
+    cursor: Optional[str] = Query(None, description="Курсор из next_cursor предыдущей страницы"),
+    user_management: UserManagementUseCase = Depends(get_user_management),
+) -> ORJSONResponse:
+    """Получить страницу активных пользователей в порядке возрастания ID."""
+    return await list_page(user_management, limit, cursor, active_only=True)
+
+
+async def ndjson_lines(rows: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Строки NDJSON по мере чтения курсора, фрагментами по STREAM_CHUNK_SIZE."""
+    lines = []
+    async for row in rows:
+        lines.append(orjson.dumps(row))
+        if len(lines) >= STREAM_CHUNK_SIZE:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}, "description": "Пользователи, по одному JSON в строке"}},
+)
+async def export_users(
+    active: bool = Query(False, description="Только активные пользователи"),
+    cursor: Optional[str] = Query(None, description="Продолжить после пользователя из курсора"),
+    limit: Optional[int] = Query(None, ge=1, description="Максимум пользователей"),
     user_management: UserManagementUseCase = Depends(get_user_management),
-) -> List[User]:
-    """Получить список активных пользователей."""
-    return await user_management.list_active()
+) -> StreamingResponse:
+    """Выгрузить пользователей потоком NDJSON в порядке возрастания ID.
+    
+    Строки читаются курсором на стороне сервера и отправляются по мере
+    чтения, поэтому память не зависит от числа пользователей.
+    """
+    rows = user_management.iter_user_rows(after_id(cursor), limit, active, STREAM_CHUNK_SIZE, USER_RESPONSE_FIELDS)
+    return StreamingResponse(ndjson_lines(rows), media_type="application/x-ndjson")
 
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: int,
     user_management: UserManagementUseCase = Depends(get_user_management),
-) -> User:
+) -> ORJSONResponse:
     """Получить пользователя по ID."""
     user = await user_management.get_user(user_id)
     if user is None:
@@ -38,14 +117,14 @@ async def get_user(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"User with id {user_id} not found",
         )
-    return user
+    return user_response(user)
 
 
 @router.get("/telegram/{telegram_id}", response_model=UserResponse)
 async def get_user_by_telegram_id(
     telegram_id: int,
     user_management: UserManagementUseCase = Depends(get_user_management),
-) -> User:
+) -> ORJSONResponse:
     """Получить пользователя по Telegram ID."""
     user = await user_management.get_user_by_telegram_id(telegram_id)
     if user is None:
@@ -53,21 +132,22 @@ async def get_user_by_telegram_id(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"User with telegram_id {telegram_id} not found",
         )
-    return user
+    return user_response(user)
 
 
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def create_user(
     user_data: UserCreate,
     user_management: UserManagementUseCase = Depends(get_user_management),
-) -> User:
+) -> ORJSONResponse:
     """Создать нового пользователя."""
-    return await user_management.create_user(
+    user = await user_management.create_user(
         telegram_id=user_data.telegram_id,
         username=user_data.username,
         first_name=user_data.first_name,
         last_name=user_data.last_name,
     )
+    return user_response(user, status_code=status.HTTP_201_CREATED)
 
 
 @router.put("/{user_id}", response_model=UserResponse)
@@ -75,7 +155,7 @@ async def update_user(
     user_id: int,
     user_data: UserUpdate,
     user_management: UserManagementUseCase = Depends(get_user_management),
-) -> User:
+) -> ORJSONResponse:
     """Обновить существующего пользователя."""
     user = await user_management.get_user(user_id)
     if user is None:
@@ -89,13 +169,14 @@ async def update_user(
     for field, value in update_data.items():
         setattr(user, field, value)
 
-    return await user_management.update_user(user)
+    return user_response(await user_management.update_user(user))
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(
     user_id: int,
     user_management: UserManagementUseCase = Depends(get_user_management),
+    leaderboard: Optional[RedisLeaderboard] = Depends(get_leaderboard),
 ) -> None:
     """Удалить пользователя."""
     user = await user_management.get_user(user_id)
@@ -104,4 +185,7 @@ async def delete_user(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"User with id {user_id} not found",
         )
-    await user_management.delete_user(user_id) 
\ No newline at end of file
+    await user_management.delete_user(user_id)
+    # Удаленный пользователь сразу пропадает из топа и не сдвигает места остальных
+    if leaderboard is not None:
+        await leaderboard.remove(user_id) 
\ No newline at end of file
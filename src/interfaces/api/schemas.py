@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -38,4 +38,36 @@ class UserInDB(UserBase):
 
 class UserResponse(UserInDB):
     """Схема ответа с данными пользователя."""
-    pass 
\ No newline at end of file
+    pass 
+
+
+class UserPage(BaseModel):
+    """Страница списка пользователей."""
+    items: List[UserResponse] = Field(..., description="Пользователи в порядке возрастания ID")
+    next_cursor: Optional[str] = Field(None, description="Курсор следующей страницы, если она есть")
+
+class RatingEntry(BaseModel):
+    """Схема записи рейтинга."""
+    id: int = Field(..., description="ID пользователя")
+    telegram_id: int = Field(..., description="Telegram ID пользователя")
+    username: Optional[str] = Field(None, description="Имя пользователя в Telegram")
+    taps: int = Field(..., description="Количество нажатий")
+
+    class Config:
+        from_attributes = True
+
+
+class RatingPage(BaseModel):
+    """Схема страницы рейтинга."""
+    items: List[RatingEntry] = Field(..., description="Пользователи в порядке рейтинга")
+    next_cursor: Optional[str] = Field(None, description="Курсор следующей страницы, если она есть")
+
+
+class RatingTotal(BaseModel):
+    """Схема общего количества нажатий."""
+    total_taps: int = Field(..., description="Общее количество нажатий всех пользователей")
+
+
+class RatingRank(RatingEntry):
+    """Схема места пользователя в рейтинге."""
+    rank: int = Field(..., description="Место пользователя в рейтинге")
@@ -0,0 +1,154 @@
+from functools import partial
+from typing import Optional
+
+from aiogram import Bot, Dispatcher
+from aiogram.fsm.storage.redis import RedisStorage
+from redis.asyncio import Redis
+
+from src.config import settings
+from src.infrastructure.broadcast.broadcaster import Broadcaster
+from src.infrastructure.broadcast.rate_limit import TokenBucket
+from src.infrastructure.buffers.tap_buffer import WriteBehindTapBuffer
+from src.infrastructure.cache.broadcast_progress import RedisBroadcastProgressStore
+from src.infrastructure.cache.leader_election import RedisLeaderElection
+from src.infrastructure.cache.leaderboard import LeaderboardRatingRepository, RedisLeaderboard
+from src.infrastructure.cache.user_registry import BloomUserRegistry, RedisRegistrationFeed
+from src.infrastructure.telegram.outbound import OutboundScheduler
+from src.infrastructure.database.repositories.rating_repository_impl import RatingRepositoryImpl
+from src.infrastructure.database.repositories.user_repository_impl import UserRepositoryImpl
+from src.infrastructure.database.session import create_session_factory, dispose_engine
+from src.interfaces.bot.handlers import register_handlers
+from src.interfaces.bot.errors import Errors
+from src.infrastructure.scheduler.tasks import setup_scheduler, setup_user_registry_scheduler
+from src.interfaces.bot.dependencies import (
+    create_rating_repository,
+    get_rating_management,
+    get_user_management,
+    setup_dependencies,
+)
+
+
+def create_bot(outbound_bucket: Optional[TokenBucket] = None) -> Bot:
+    """Создание бота, все исходящие запросы которого проходят через общие лимиты.
+    
+    ``outbound_bucket`` — глобальный лимит, общий с другими процессами; по умолчанию свой.
+    """
+    bot = Bot(token=settings.BOT_TOKEN)
+    
+    # Ответы пользователям уходят раньше рассылок
+    outbound = OutboundScheduler(
+        rate=settings.OUTBOUND_RATE_PER_SEC,
+        chat_interval=settings.OUTBOUND_CHAT_INTERVAL_SEC,
+        chat_burst=settings.OUTBOUND_CHAT_BURST,
+        bucket=outbound_bucket,
+    )
+    bot.session.middleware(outbound)
+    return bot
+
+
+async def setup_bot(
+    bot: Bot,
+    redis: Redis,
+    leader_election: Optional[RedisLeaderElection] = None,
+    with_scheduler: bool = True,
+) -> Dispatcher:
+    """Создание диспетчера со всеми зависимостями, обработчиками и хуками остановки.
+    
+    Пул соединений с базой создается в текущем процессе. С ``with_scheduler``
+    запускается планировщик задач, а с ``leader_election`` — еще и участие
+    в выборах лидера, от которых зависят задачи планировщика. Реестр
+    пользователей подписывается на оповещения о регистрациях в других
+    процессах, а перестраивается по расписанию, только если оно задано.
+    """
+    # Общий клиент Redis для FSM и рейтинга
+    storage = RedisStorage(redis=redis)
+    dp = Dispatcher(storage=storage)
+    
+    # Настройка зависимостей
+    session_factory = await create_session_factory()
+    
+    # Рейтинг в Redis: при холодном старте строится из базы
+    leaderboard = None
+    if settings.LEADERBOARD_ENABLED:
+        leaderboard = RedisLeaderboard(redis, key=settings.LEADERBOARD_KEY)
+        async with session_factory() as session:
+            await LeaderboardRatingRepository(RatingRepositoryImpl(session), leaderboard).ensure_built()
+    
+    # Буфер нажатий: копит приросты в памяти и сбрасывает их пачками
+    tap_buffer = None
+    if settings.TAP_BUFFER_ENABLED:
+        tap_buffer = WriteBehindTapBuffer(
+            session_factory,
+            flush_interval=settings.TAP_BUFFER_FLUSH_INTERVAL_MS / 1000,
+            max_pending=settings.TAP_BUFFER_MAX_PENDING,
+            repository_factory=partial(create_rating_repository, leaderboard=leaderboard),
+        )
+        await tap_buffer.start()
+        # При остановке бота сбрасываем все накопленные нажатия
+        dp.shutdown.register(tap_buffer.stop)
+    
+    # Реестр зарегистрированных пользователей: незарегистрированные отсеиваются без запроса в базу
+    user_registry = None
+    registration_feed = None
+    if settings.USER_REGISTRY_ENABLED:
+        user_registry = BloomUserRegistry(
+            UserRepositoryImpl(session_factory),
+            capacity=settings.USER_REGISTRY_CAPACITY,
+            error_rate=settings.USER_REGISTRY_ERROR_RATE,
+            absent_ttl=settings.USER_REGISTRY_ABSENT_TTL_SEC,
+        )
+        # Фильтр строится после подписки, чтобы не пропустить регистрации в других процессах
+        registration_feed = RedisRegistrationFeed(redis, channel=settings.USER_REGISTRY_CHANNEL)
+        await registration_feed.subscribe(user_registry)
+        dp.shutdown.register(registration_feed.stop)
+    
+    setup_dependencies(
+        dp,
+        session_factory,
+        tap_buffer=tap_buffer,
+        leaderboard=leaderboard,
+        user_registry=user_registry,
+        registration_feed=registration_feed,
+    )
+    
+    if with_scheduler:
+        # Рассылка дайджеста: лимиты Telegram и прогресс в Redis для возобновления после падения
+        broadcaster = Broadcaster(
+            bot,
+            rate=settings.BROADCAST_RATE_PER_SEC,
+            concurrency=settings.BROADCAST_CONCURRENCY,
+            chat_interval=settings.BROADCAST_CHAT_INTERVAL_SEC,
+            max_attempts=settings.BROADCAST_MAX_ATTEMPTS,
+            progress_store=RedisBroadcastProgressStore(redis, ttl=settings.BROADCAST_PROGRESS_TTL_SEC),
+        )
+        
+        # Планировщик задач: дайджест, сверка общего количества нажатий и перестроение реестра пользователей
+        scheduler = await setup_scheduler(
+            bot,
+            get_user_management(),
+            get_rating_management(),
+            session_factory=session_factory,
+            leaderboard=leaderboard,
+            user_registry=user_registry,
+            broadcaster=broadcaster,
+            leader_election=leader_election,
+        )
+        dp.shutdown.register(scheduler.shutdown)
+    elif user_registry is not None and settings.USER_REGISTRY_RELOAD_INTERVAL_SEC > 0:
+        # Реестр у каждого процесса свой: без общего планировщика он перестраивается отдельно
+        scheduler = await setup_user_registry_scheduler(user_registry)
+        dp.shutdown.register(scheduler.shutdown)
+    
+    if leader_election is not None:
+        await leader_election.start()
+        # Лидерство освобождается при остановке, чтобы резервная реплика заняла его сразу
+        dp.shutdown.register(leader_election.stop)
+    
+    # Пул соединений закрывается последним, после сброса буфера нажатий
+    dp.shutdown.register(dispose_engine)
+    
+    # Регистрация обработчиков
+    register_handlers(dp)
+    await Errors.register_error_handlers(dp)
+    
+    return dp
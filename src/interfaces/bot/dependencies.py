@@ -1,31 +1,74 @@
-from typing import Annotated
+from functools import partial
+from typing import Annotated, Optional
 from aiogram import Dispatcher
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.storage.base import BaseStorage
 from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
 
+from src.config import settings
+from src.application.interfaces.tap_buffer import TapBuffer
+from src.application.interfaces.user_registry import RegistrationFeed, UserRegistry
+from src.application.use_cases.rating_management import RatingManagementUseCase
+from src.application.use_cases.user_management import UserManagementUseCase
 from src.infrastructure.services.user_service_impl import UserServiceImpl
 from src.infrastructure.services.rating_service_impl import RatingServiceImpl
 from src.infrastructure.database.repositories.user_repository_impl import UserRepositoryImpl
 from src.infrastructure.database.repositories.rating_repository_impl import RatingRepositoryImpl
+from src.infrastructure.database.repositories.scoped_rating_repository import SessionScopedRatingRepository
+from src.infrastructure.cache.leaderboard import LeaderboardRatingRepository, RedisLeaderboard
+from src.domain.repositories.rating_repository import RatingRepository
+from src.interfaces.bot.middlewares import CurrentUserMiddleware
 
 # Глобальные экземпляры сервисов
 _user_service = None
 _rating_service = None
+_user_management = None
+_rating_management = None
 
-def setup_dependencies(dp: Dispatcher, session_factory: async_sessionmaker[AsyncSession]) -> None:
+def create_rating_repository(session, leaderboard: Optional[RedisLeaderboard] = None) -> RatingRepository:
+    """Создание репозитория рейтинга с учетом рейтинга в Redis"""
+    rating_repository = RatingRepositoryImpl(session)
+    if leaderboard is not None:
+        return LeaderboardRatingRepository(rating_repository, leaderboard)
+    return rating_repository
+
+def setup_dependencies(
+    dp: Dispatcher,
+    session_factory: async_sessionmaker[AsyncSession],
+    tap_buffer: Optional[TapBuffer] = None,
+    leaderboard: Optional[RedisLeaderboard] = None,
+    user_registry: Optional[UserRegistry] = None,
+    registration_feed: Optional[RegistrationFeed] = None,
+) -> None:
     """Настройка зависимостей для бота"""
-    global _user_service, _rating_service
+    global _user_service, _rating_service, _user_management, _rating_management
     
     # Инициализация репозиториев
     user_repository = UserRepositoryImpl(session_factory)
-    rating_repository = RatingRepositoryImpl(session_factory)
+    # Сессия открывается на каждый вызов: одна AsyncSession не может обслуживать параллельные апдейты
+    rating_repository = SessionScopedRatingRepository(
+        session_factory,
+        repository_factory=partial(create_rating_repository, leaderboard=leaderboard),
+    )
     
     # Инициализация сервисов
     _user_service = UserServiceImpl(user_repository)
     _rating_service = RatingServiceImpl(rating_repository)
     
-    # Регистрация middleware
+    # Инициализация use case
+    _user_management = UserManagementUseCase(
+        _user_service,
+        user_registry=user_registry,
+        registration_feed=registration_feed,
+    )
+    _rating_management = RatingManagementUseCase(
+        _rating_service,
+        tap_buffer=tap_buffer,
+        snapshot_ttl=settings.RATING_SNAPSHOT_TTL_SEC,
+    )
+    
+    # Регистрация middleware: текущий пользователь загружается один раз до фильтров
+    dp.update.outer_middleware.register(CurrentUserMiddleware(_user_management))
     dp.update.middleware.register(DependencyMiddleware())
 
 def get_user_service() -> UserServiceImpl:
@@ -40,6 +83,18 @@ def get_rating_service() -> RatingServiceImpl:
         raise RuntimeError("Rating service not initialized")
     return _rating_service
 
+def get_user_management() -> UserManagementUseCase:
+    """Получение use case пользователей"""
+    if _user_management is None:
+        raise RuntimeError("User management not initialized")
+    return _user_management
+
+def get_rating_management() -> RatingManagementUseCase:
+    """Получение use case рейтинга"""
+    if _rating_management is None:
+        raise RuntimeError("Rating management not initialized")
+    return _rating_management
+
 class DependencyMiddleware:
     """Middleware для внедрения зависимостей"""
     
@@ -52,5 +107,7 @@ class DependencyMiddleware:
         # Добавление сервисов в данные
         data["user_service"] = get_user_service()
         data["rating_service"] = get_rating_service()
+        data["user_management"] = get_user_management()
+        data["rating_management"] = get_rating_management()
         
         return await handler(event, data) 
\ No newline at end of file
@@ -1,8 +1,11 @@
+from typing import Optional, Union
+
 from aiogram import Dispatcher, Router, F
 from aiogram.types import Message, ReplyKeyboardMarkup, KeyboardButton
 from aiogram.filters import Command, StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
+from aiogram.methods import SendMessage, SendPhoto
 
 from src.application.use_cases.user_management import UserManagementUseCase
 from src.application.use_cases.rating_management import RatingManagementUseCase
@@ -65,7 +68,12 @@ def register_handlers(dp: Dispatcher) -> None:
     dp.include_router(router)
 
 
-async def start_handler(message: Message) -> None:
+# Простые обработчики возвращают ответ, а не отправляют его сами: в режиме webhook
+# aiogram передает его прямо в HTTP-ответе Telegram, без отдельного запроса к Bot API,
+# а при long polling отправляет как обычно.
+
+
+async def start_handler(message: Message) -> SendMessage:
     """Обработчик команды /start."""
     keyboard = ReplyKeyboardMarkup(
         keyboard=[
@@ -74,16 +82,16 @@ async def start_handler(message: Message) -> None:
         ],
         resize_keyboard=True
     )
-    await message.answer(
+    return message.answer(
         "Добро пожаловать! Я бот для подсчета нажатий.\n"
         "Используйте /help для получения списка команд.",
         reply_markup=keyboard
     )
 
 
-async def help_handler(message: Message) -> None:
+async def help_handler(message: Message) -> SendMessage:
     """Обработчик команды /help."""
-    await message.answer(
+    return message.answer(
         "Доступные команды:\n"
         "/start - Запустить бота\n"
         "/help - Показать справку\n"
@@ -93,24 +101,21 @@ async def help_handler(message: Message) -> None:
     )
 
 
-async def profile_handler(message: Message, user_service: UserService) -> None:
+async def profile_handler(message: Message, user: Optional[User]) -> Union[SendMessage, SendPhoto]:
     """Обработчик команды /profile."""
-    user = await user_service.get_user(message.from_user.id)
     if not user:
-        await message.answer("Вы не зарегистрированы. Используйте /register для регистрации.")
-        return
+        return message.answer("Вы не зарегистрированы. Используйте /register для регистрации.")
         
     text = (
         f"👤 Ваш профиль:\n\n"
-        f"Имя: {user.name}\n"
+        f"Имя: {user.first_name}\n"
         f"Информация: {user.info}\n"
         f"Нажатий: {user.taps}\n"
     )
     
     if user.photo:
-        await message.answer_photo(user.photo, caption=text)
-    else:
-        await message.answer(text)
+        return message.answer_photo(user.photo, caption=text)
+    return message.answer(text)
 
 
 async def settings_handler(message: Message, state: FSMContext) -> None:
@@ -140,55 +145,50 @@ async def registration_handler(message: Message, state: FSMContext) -> None:
     await state.set_state(UserStates.waiting_for_name)
 
 
-async def cancel_handler(message: Message, state: FSMContext) -> None:
+async def cancel_handler(message: Message, state: FSMContext) -> SendMessage:
     """Обработчик команды отмены."""
-    await message.answer("Операция отменена.")
     if await state.get_state() is not None:
         await state.clear()
+    return message.answer("Операция отменена.")
 
 
 async def rating_handler(
     message: Message,
-    user_management: UserManagementUseCase,
+    user: User,
     rating_management: RatingManagementUseCase,
-) -> None:
+) -> SendMessage:
     """Обработчик команды рейтинга."""
-    # Получаем пользователя
-    user = await user_management.get_user_by_telegram_id(message.from_user.id)
-    
-    # Получаем топ пользователей
-    top_users = await rating_management.get_top_users(limit=10)
+    # Получаем топ пользователей и общее количество нажатий (общий для всех снимок из кэша)
+    snapshot = await rating_management.get_rating_snapshot(limit=10)
     
-    # Получаем общее количество нажатий
-    total_taps = await rating_management.get_total_taps()
+    # Получаем место пользователя в рейтинге
+    rank = await rating_management.get_user_rank(user.id, snapshot=snapshot)
     
     # Формируем сообщение
     text = (
         f"📊 Рейтинг пользователей\n\n"
-        f"Ваши нажатия: {user.taps}\n"
-        f"Всего нажатий: {total_taps}\n\n"
+        f"Ваши нажатия: {rating_management.get_user_taps(user)}\n"
+        f"Ваше место: {rank}\n"
+        f"Всего нажатий: {snapshot.total_taps}\n\n"
         "Топ пользователей:\n"
     )
     
-    for i, top_user in enumerate(top_users, 1):
+    for i, top_user in enumerate(snapshot.top_users, 1):
         text += f"{i}. {top_user.username or 'Аноним'}: {top_user.taps}\n"
     
-    await message.answer(text)
+    return message.answer(text)
 
 
 async def press_handler(
     message: Message,
-    user_management: UserManagementUseCase,
+    user: User,
     rating_management: RatingManagementUseCase,
-) -> None:
+) -> SendMessage:
     """Обработчик команды нажатия."""
-    # Получаем пользователя
-    user = await user_management.get_user_by_telegram_id(message.from_user.id)
-    
     # Увеличиваем счетчик нажатий
-    updated_user = await rating_management.increment_taps(user.id)
+    taps = await rating_management.add_tap(user)
     
-    await message.answer(f"Нажатий: {updated_user.taps}")
+    return message.answer(f"Нажатий: {taps}")
 
 
 async def set_user_info_handler(message: Message, state: FSMContext) -> None:
@@ -221,6 +221,7 @@ async def set_info_handler(message: Message, state: FSMContext) -> None:
 async def set_photo_handler(
     message: Message,
     state: FSMContext,
+    user: User,
     user_management: UserManagementUseCase,
     rating_management: RatingManagementUseCase,
 ) -> None:
@@ -232,14 +233,9 @@ async def set_photo_handler(
     # Получаем данные формы
     form_data = await state.get_data()
     
-    # Получаем пользователя
-    user = await user_management.get_user_by_telegram_id(message.from_user.id)
-    
     # Обновляем информацию о пользователе
-    await user_management.update_user(
-        user.id,
-        first_name=form_data["name"],
-    )
+    user.first_name = form_data["name"]
+    await user_management.update_user(user)
     await rating_management.update_user_info(user.id, form_data["info"])
     
     # Сохраняем фотографию
@@ -1,38 +1,59 @@
 import asyncio
-from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.redis import RedisStorage
+
 from loguru import logger
 
 from src.config import settings
-from src.infrastructure.database.session import create_session_factory
-from src.interfaces.bot.handlers import register_handlers
-from src.interfaces.bot.errors import Errors
-from src.interfaces.bot.dependencies import setup_dependencies
+from src.infrastructure.cache.leader_election import RedisLeaderElection
+from src.infrastructure.cache.redis import create_redis
+from src.interfaces.bot.bootstrap import create_bot, setup_bot
+from src.interfaces.bot.webhook import run_webhook
+from src.interfaces.bot.workers import run_workers
+
 
 async def main() -> None:
     """Основная функция запуска бота"""
     # Инициализация бота и диспетчера
-    bot = Bot(token=settings.BOT_TOKEN)
+    bot = create_bot()
+    redis = create_redis()
     
-    # Формирование URL для Redis
-    redis_url = f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_DB}"
-    if settings.REDIS_PASSWORD:
-        redis_url = f"redis://:{settings.REDIS_PASSWORD}@{settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_DB}"
+    # Выборы лидера: при нескольких репликах задачи планировщика и long polling достаются одной из них
+    leader_election = None
+    if settings.LEADER_ELECTION_ENABLED:
+        leader_election = RedisLeaderElection(
+            redis,
+            key=settings.LEADER_ELECTION_KEY,
+            lease=settings.LEADER_LEASE_SEC,
+        )
     
-    storage = RedisStorage.from_url(redis_url)
-    dp = Dispatcher(storage=storage)
+    dp = await setup_bot(bot, redis, leader_election=leader_election)
     
-    # Настройка зависимостей
-    session_factory = await create_session_factory()
-    setup_dependencies(dp, session_factory)
+    if leader_election is not None and not settings.WEBHOOK_ENABLED:
+        # Потеряв лидерство, реплика прекращает опрос и завершается: перезапущенная, она станет резервной
+        leader_election.add_listener(on_revoked=dp.stop_polling)
     
-    # Регистрация обработчиков
-    register_handlers(dp)
-    await Errors.register_error_handlers(dp)
+    # Webhook принимают все реплики, выборы лидера касаются только задач планировщика
+    if settings.WEBHOOK_ENABLED:
+        logger.info("Starting bot in webhook mode...")
+        await run_webhook(dp, bot)
+        return
     
-    # Запуск бота
+    # Запуск бота: при выборах лидера опрашивает Telegram только лидер
+    if leader_election is not None:
+        logger.info("Waiting for leadership...")
+        await leader_election.wait_until_leader()
     logger.info("Starting bot...")
+    # Webhook, оставшийся от запуска в режиме webhook, не дает получать обновления опросом
+    await bot.delete_webhook()
     await dp.start_polling(bot)
 
+
+def run_bot() -> None:
+    """Точка входа: один процесс или прием обновлений с BOT_WORKERS процессами-обработчиками."""
+    if settings.BOT_WORKERS > 0:
+        run_workers(settings.BOT_WORKERS)
+    else:
+        asyncio.run(main())
+
+
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    run_bot() 
\ No newline at end of file
@@ -0,0 +1,36 @@
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from src.application.use_cases.user_management import UserManagementUseCase
+from src.infrastructure.database.routing import database_actor
+
+
+class CurrentUserMiddleware(BaseMiddleware):
+    """Outer-middleware, которое один раз за апдейт загружает текущего пользователя.
+    
+    Пользователь кладется в data["user"] (None для незарегистрированных), откуда его
+    получают фильтры и обработчики вместо повторных запросов в базу.
+    
+    Весь апдейт обрабатывается от имени пользователя: после его записи чтения
+    идут в основную базу, а не на отстающую реплику.
+    """
+
+    def __init__(self, user_management: UserManagementUseCase):
+        self.user_management = user_management
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        from_user = data.get("event_from_user")
+        if from_user is None:
+            data["user"] = None
+            return await handler(event, data)
+        
+        with database_actor(from_user.id):
+            data["user"] = await self.user_management.get_registered_user(from_user.id)
+            return await handler(event, data)
@@ -0,0 +1,63 @@
+import asyncio
+from typing import List
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+from loguru import logger
+
+from src.config import settings
+
+
+def create_webhook_app(dp: Dispatcher, bot: Bot, path: str, secret_token: str) -> web.Application:
+    """Создание aiohttp-приложения, принимающего обновления Telegram на ``path``.
+    
+    Запросы без заголовка X-Telegram-Bot-Api-Secret-Token с ``secret_token``
+    отклоняются с 401. Обновление обрабатывается до ответа Telegram, поэтому
+    метод, который вернул обработчик (например, ``message.answer(...)``),
+    уходит прямо в теле HTTP-ответа, без отдельного запроса к Bot API.
+    Запуск и остановка приложения вызывают startup- и shutdown-хуки диспетчера.
+    """
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        secret_token=secret_token,
+        handle_in_background=False,
+    ).register(app, path=path)
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+async def serve_webhook(app: web.Application, bot: Bot, allowed_updates: List[str]) -> None:
+    """Запуск HTTP-сервера webhook и регистрация webhook в Telegram; работает до отмены задачи."""
+    if not settings.WEBHOOK_URL or not settings.WEBHOOK_SECRET:
+        raise ValueError("WEBHOOK_URL and WEBHOOK_SECRET are required in webhook mode")
+    
+    runner = web.AppRunner(app)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, settings.WEBHOOK_HOST, settings.WEBHOOK_PORT).start()
+        
+        await bot.set_webhook(
+            url=f"{settings.WEBHOOK_URL.rstrip('/')}{settings.WEBHOOK_PATH}",
+            secret_token=settings.WEBHOOK_SECRET,
+            allowed_updates=allowed_updates,
+            max_connections=settings.WEBHOOK_MAX_CONNECTIONS,
+        )
+        logger.info(
+            f"Webhook is listening on {settings.WEBHOOK_HOST}:{settings.WEBHOOK_PORT}{settings.WEBHOOK_PATH}, "
+            f"allowed updates: {allowed_updates}"
+        )
+        
+        # Сервер работает до отмены задачи (остановки процесса)
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot) -> None:
+    """Запуск бота в режиме webhook: HTTP-сервер и регистрация webhook в Telegram."""
+    app = create_webhook_app(dp, bot, settings.WEBHOOK_PATH, settings.WEBHOOK_SECRET or "")
+    # Telegram присылает только те типы обновлений, для которых есть обработчики
+    await serve_webhook(app, bot, dp.resolve_used_update_types())
@@ -0,0 +1,362 @@
+import asyncio
+import hmac
+import multiprocessing
+import queue as queue_module
+import signal
+from collections import deque
+from multiprocessing.process import BaseProcess
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+import aiohttp
+import orjson
+from aiogram import Bot, Dispatcher
+from aiogram.client.telegram import PRODUCTION, TelegramAPIServer
+from aiogram.methods import TelegramMethod
+from aiohttp import web
+from loguru import logger
+
+from src.config import settings
+from src.infrastructure.broadcast.rate_limit import SharedTokenBucket
+from src.infrastructure.cache.leader_election import RedisLeaderElection
+from src.infrastructure.cache.redis import create_redis
+from src.interfaces.bot.bootstrap import create_bot, setup_bot
+from src.interfaces.bot.handlers import register_handlers
+from src.interfaces.bot.webhook import serve_webhook
+
+# Обновление Telegram в исходном виде (JSON-объект)
+RawUpdate = Dict[str, Any]
+WorkerTarget = Callable[..., None]
+
+# Сколько обновлений процесс-обработчик забирает из очереди за раз
+WORKER_BATCH_SIZE = 100
+# Таймаут long polling в режиме приема обновлений (в секундах)
+POLLING_TIMEOUT = 30
+# Наибольшая пауза между повторами getUpdates после сбоев подряд (в секундах)
+POLLING_MAX_BACKOFF = 30
+
+
+def update_key(update: RawUpdate) -> int:
+    """Ключ упорядочивания обновления: ID отправителя, иначе ID чата, иначе ID самого обновления.
+    
+    Обновление не разбирается в модели aiogram: ключ берется из исходного JSON.
+    """
+    for event in update.values():
+        if isinstance(event, dict):
+            sender = event.get("from") or event.get("user") or event.get("chat")
+            if isinstance(sender, dict) and "id" in sender:
+                return sender["id"]
+    return update["update_id"]
+
+
+class OrderedUpdateProcessor:
+    """Обработка обновлений: параллельно для разных ключей, строго по очереди для одного ключа.
+    
+    Обновления одного ключа копятся в его очереди и обрабатываются одной задачей
+    подряд. Эта задача занимает одно место из ``max_in_flight``, поэтому очередь
+    одного пользователя не отнимает места у других: ``submit`` ждет, когда
+    в работе ``max_in_flight`` разных ключей или в очереди ключа уже
+    ``max_pending_per_key`` обновлений. Обновления не отбрасываются: пока
+    ``submit`` ждет, очередь процесса не читается, а за ней останавливается
+    и прием новых обновлений от Telegram.
+    """
+
+    def __init__(
+        self,
+        handle: Callable[[RawUpdate], Awaitable[None]],
+        max_in_flight: int = 100,
+        max_pending_per_key: int = 20,
+    ):
+        self._handle = handle
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._max_pending_per_key = max_pending_per_key
+        # Ожидающие обновления по ключам, у которых есть задача обработки
+        self._queues: Dict[Hashable, Deque[RawUpdate]] = {}
+        self._tasks = set()
+        # Срабатывает, когда из какой-либо очереди ключа забрано обновление
+        self._dequeued = asyncio.Event()
+        # Сколько раз submit ждал места в очереди ключа
+        self.throttled = 0
+
+    async def submit(self, key: Hashable, update: RawUpdate) -> None:
+        """Поставить обновление в обработку после предыдущих с тем же ключом."""
+        pending = self._queues.get(key)
+        if pending is not None and len(pending) >= self._max_pending_per_key:
+            self.throttled += 1
+            while pending is not None and len(pending) >= self._max_pending_per_key:
+                self._dequeued.clear()
+                await self._dequeued.wait()
+                pending = self._queues.get(key)
+        
+        if pending is not None:
+            pending.append(update)
+            return
+        
+        # Очередь заводится до ожидания места: следующие обновления ключа встанут в нее
+        pending = self._queues[key] = deque([update])
+        await self._slots.acquire()
+        task = asyncio.create_task(self._drain(key, pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def join(self) -> None:
+        """Дождаться обработки всех поставленных обновлений."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _drain(self, key: Hashable, pending: Deque[RawUpdate]) -> None:
+        try:
+            while pending:
+                update = pending.popleft()
+                self._dequeued.set()
+                try:
+                    await self._handle(update)
+                except Exception as e:
+                    logger.exception(f"Failed to process update {update.get('update_id')}: {e}")
+        finally:
+            del self._queues[key]
+            self._slots.release()
+
+
+async def serve_queue(
+    updates: multiprocessing.Queue,
+    handle: Callable[[RawUpdate], Awaitable[None]],
+    max_in_flight: int = 100,
+    max_pending_per_key: int = 20,
+) -> int:
+    """Обрабатывать пары (ключ, обновление) из очереди процесса до сигнала остановки (None).
+    
+    Возвращает количество обработанных обновлений.
+    """
+    processor = OrderedUpdateProcessor(handle, max_in_flight, max_pending_per_key)
+    loop = asyncio.get_running_loop()
+    processed = 0
+    while True:
+        # Блокирующее ожидание — в потоке, остальное уже пришедшее забирается без ожидания
+        batch = [await loop.run_in_executor(None, updates.get)]
+        try:
+            while len(batch) < WORKER_BATCH_SIZE:
+                batch.append(updates.get_nowait())
+        except queue_module.Empty:
+            pass
+        
+        for item in batch:
+            if item is None:
+                await processor.join()
+                return processed
+            key, update = item
+            await processor.submit(key, update)
+            processed += 1
+
+
+class WorkerPool:
+    """Процессы-обработчики обновлений, каждый со своей очередью.
+    
+    Обновления распределяются по ключу ``update_key``, поэтому все обновления
+    одного пользователя попадают в один процесс и обрабатываются по порядку.
+    ``target(index, workers, queue, *args)`` выполняется в отдельном процессе
+    (spawn) и должен обрабатывать очередь через ``serve_queue``.
+    """
+
+    def __init__(self, workers: int, target: WorkerTarget, args: Tuple = (), queue_size: int = 10000):
+        self._context = multiprocessing.get_context("spawn")
+        self.queues: List[multiprocessing.Queue] = [self._context.Queue(queue_size) for _ in range(workers)]
+        self._target = target
+        self._args = args
+        self._processes: List[BaseProcess] = []
+
+    def start(self) -> None:
+        """Запустить процессы-обработчики."""
+        workers = len(self.queues)
+        for index, updates in enumerate(self.queues):
+            process = self._context.Process(
+                target=self._target,
+                args=(index, workers, updates, *self._args),
+                name=f"bot-worker-{index}",
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+
+    async def dispatch(self, update: RawUpdate) -> None:
+        """Передать обновление процессу, отвечающему за его ключ."""
+        key = update_key(update)
+        updates = self.queues[key % len(self.queues)]
+        try:
+            updates.put_nowait((key, update))
+        except queue_module.Full:
+            # Обработчик не успевает: ждем места в очереди, не блокируя цикл событий
+            await asyncio.to_thread(updates.put, (key, update))
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Дать обработчикам доделать очередь и дождаться завершения процессов."""
+        for updates in self.queues:
+            try:
+                updates.put(None, timeout=timeout)
+            except queue_module.Full:
+                pass
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                logger.warning(f"Worker {process.name} did not stop in {timeout}s, terminating")
+                process.terminate()
+        self._processes = []
+
+
+async def process_update(dp: Dispatcher, bot: Bot, update: RawUpdate) -> None:
+    """Обработать обновление, как при polling: метод, который вернул обработчик, отправляется ботом."""
+    response = await dp.feed_raw_update(bot, update)
+    if isinstance(response, TelegramMethod):
+        await dp.silent_call_request(bot, response)
+
+
+async def _serve_worker(index: int, workers: int, updates: multiprocessing.Queue, outbound_state: Any) -> None:
+    # Лимит исходящих запросов и пауза retry_after общие для всех процессов: рассылка
+    # первого обработчика получает всю свободную часть лимита. Лимиты на чат у каждого
+    # процесса свои: ответ и сообщение рассылки в один чат друг друга не ждут.
+    bot = create_bot(outbound_bucket=SharedTokenBucket(settings.OUTBOUND_RATE_PER_SEC, outbound_state))
+    redis = create_redis()
+    
+    # Общие задачи планировщика работают только в первом обработчике, реестр пользователей перестраивается в каждом
+    leader_election = None
+    if index == 0 and settings.LEADER_ELECTION_ENABLED:
+        leader_election = RedisLeaderElection(redis, key=settings.LEADER_ELECTION_KEY, lease=settings.LEADER_LEASE_SEC)
+    dp = await setup_bot(bot, redis, leader_election=leader_election, with_scheduler=index == 0)
+    
+    await dp.emit_startup(bot=bot)
+    try:
+        processed = await serve_queue(
+            updates,
+            lambda update: process_update(dp, bot, update),
+            settings.BOT_WORKER_MAX_IN_FLIGHT,
+            settings.BOT_WORKER_MAX_PENDING_PER_USER,
+        )
+        logger.info(f"Worker {index} processed {processed} updates")
+    finally:
+        await dp.emit_shutdown(bot=bot)
+        await bot.session.close()
+
+
+def run_worker(index: int, workers: int, updates: multiprocessing.Queue, outbound_state: Any) -> None:
+    """Процесс-обработчик: свой диспетчер, свой пул соединений с базой и свой цикл событий."""
+    # Остановкой управляет процесс приема: он дает обработчикам доделать очередь
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    asyncio.run(_serve_worker(index, workers, updates, outbound_state))
+
+
+def create_ingest_app(pool: WorkerPool, path: str, secret_token: str) -> web.Application:
+    """Webhook, который только проверяет секретный токен и передает обновление обработчикам.
+    
+    Ответ Telegram отправляется сразу, поэтому ответы обработчиков в теле
+    ответа webhook в этом режиме не передаются.
+    """
+    async def handle(request: web.Request) -> web.Response:
+        token = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+        if not hmac.compare_digest(token, secret_token):
+            return web.Response(status=401, text="Unauthorized")
+        await pool.dispatch(orjson.loads(await request.read()))
+        return web.Response()
+    
+    app = web.Application()
+    app.router.add_post(path, handle)
+    return app
+
+
+async def poll_updates(
+    pool: WorkerPool,
+    token: str,
+    allowed_updates: List[str],
+    leader_election: Optional[RedisLeaderElection] = None,
+    api: TelegramAPIServer = PRODUCTION,
+) -> None:
+    """Long polling без разбора обновлений в модели aiogram: JSON сразу уходит обработчикам.
+    
+    Сбои связи и ответы не в JSON повторяются с экспоненциальной паузой до POLLING_MAX_BACKOFF.
+    """
+    get_updates_url = api.api_url(token=token, method="getUpdates")
+    offset = 0
+    async with aiohttp.ClientSession() as http:
+        # Webhook, оставшийся от запуска в режиме webhook, не дает получать обновления опросом
+        await http.post(api.api_url(token=token, method="deleteWebhook"))
+        
+        failures = 0
+        while leader_election is None or leader_election.is_leader:
+            try:
+                async with http.post(
+                    get_updates_url,
+                    json={"offset": offset, "timeout": POLLING_TIMEOUT, "allowed_updates": allowed_updates},
+                    timeout=aiohttp.ClientTimeout(total=POLLING_TIMEOUT + 10),
+                ) as response:
+                    body = await response.read()
+                # Не JSON (например, страница 502 от прокси перед Bot API) — такой же сбой, как обрыв связи
+                result = orjson.loads(body)
+                if not isinstance(result, dict):
+                    raise ValueError(f"Unexpected response: {body[:100]!r}")
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                failures += 1
+                delay = min(2 ** (failures - 1), POLLING_MAX_BACKOFF)
+                logger.warning(f"Failed to get updates: {e!r}, retrying in {delay}s")
+                await asyncio.sleep(delay)
+                continue
+            failures = 0
+            
+            if not result.get("ok"):
+                retry_after = result.get("parameters", {}).get("retry_after", 1)
+                logger.warning(f"Failed to get updates: {result.get('description')}")
+                await asyncio.sleep(retry_after)
+                continue
+            
+            for update in result["result"]:
+                await pool.dispatch(update)
+                offset = update["update_id"] + 1
+    
+    logger.warning("Lost polling leadership, stopping")
+
+
+async def _run_ingest(pool: WorkerPool) -> None:
+    # SIGTERM (например, docker stop) останавливает прием так же, как Ctrl+C
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    
+    # Типы обновлений, для которых есть обработчики
+    dp = Dispatcher()
+    register_handlers(dp)
+    allowed_updates = dp.resolve_used_update_types()
+    
+    if settings.WEBHOOK_ENABLED:
+        bot = Bot(token=settings.BOT_TOKEN)
+        try:
+            app = create_ingest_app(pool, settings.WEBHOOK_PATH, settings.WEBHOOK_SECRET or "")
+            await serve_webhook(app, bot, allowed_updates)
+        finally:
+            await bot.session.close()
+        return
+    
+    # Опрашивает Telegram только одна реплика; ключ отличается от ключа планировщика первого обработчика
+    leader_election = None
+    if settings.LEADER_ELECTION_ENABLED:
+        leader_election = RedisLeaderElection(
+            create_redis(),
+            key=f"{settings.LEADER_ELECTION_KEY}:polling",
+            lease=settings.LEADER_LEASE_SEC,
+        )
+        await leader_election.start()
+        logger.info("Waiting for polling leadership...")
+        await leader_election.wait_until_leader()
+    try:
+        await poll_updates(pool, settings.BOT_TOKEN, allowed_updates, leader_election)
+    finally:
+        if leader_election is not None:
+            await leader_election.stop()
+
+
+def run_workers(workers: int) -> None:
+    """Прием обновлений (polling или webhook) в этом процессе и их обработка в ``workers`` процессах."""
+    outbound_state = SharedTokenBucket.create_state(multiprocessing.get_context("spawn"))
+    pool = WorkerPool(workers, run_worker, args=(outbound_state,), queue_size=settings.BOT_WORKER_QUEUE_SIZE)
+    pool.start()
+    logger.info(f"Started {workers} bot workers")
+    try:
+        asyncio.run(_run_ingest(pool))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    finally:
+        pool.stop()
@@ -1,16 +1,27 @@
 import asyncio
+import sys
+from contextlib import aclosing
+from pathlib import Path
 from typing import Optional
 
 import typer
 from rich.console import Console
+from rich.progress import BarColumn, Progress, TextColumn, TimeElapsedColumn
 from rich.table import Table
 
 from ....application.use_cases.user_management import UserManagementUseCase
+from ....config import settings
 from ....domain.entities.user import User
-from ..main import get_user_management
+from ....infrastructure.cache.leaderboard import RedisLeaderboard
+from ....infrastructure.cache.redis import create_redis
+from ....infrastructure.database import bulk
+from ....infrastructure.database.session import dispose_engine, get_engine
+from ..dependencies import get_registration_feed, get_user_management
 
 app = typer.Typer(help="Управление пользователями")
 console = Console()
+# Прогресс пишется в stderr, чтобы не смешиваться с данными при выводе в stdout
+err_console = Console(stderr=True)
 
 
 def format_user(user: User) -> dict:
@@ -28,25 +39,80 @@ def format_user(user: User) -> dict:
     }
 
 
+# Таблица rich строится только после получения всех строк, поэтому годится лишь для небольших выборок
+TABLE_MAX_ROWS = 1000
+LIST_FORMATS = ("table", "plain", "csv", "jsonl")
+
+
+def format_plain(user: User) -> str:
+    """Строка пользователя для вывода без таблицы: поля через табуляцию."""
+    return "\t".join(str(value) for value in format_user(user).values())
+
+
 @app.command("list")
-def list_users(active_only: bool = typer.Option(False, "--active", "-a", help="Показать только активных пользователей")):
-    """Показать список пользователей."""
+def list_users(
+    active_only: bool = typer.Option(False, "--active", "-a", help="Показать только активных пользователей"),
+    limit: Optional[int] = typer.Option(None, "--limit", "-n", min=1, help="Сколько пользователей показать"),
+    after_id: int = typer.Option(0, "--after-id", min=0, help="Показать пользователей с ID больше указанного"),
+    fmt: Optional[str] = typer.Option(
+        None,
+        "--format",
+        help="table, plain, csv или jsonl (по умолчанию table для --limit до 1000, иначе plain)",
+    ),
+    batch_size: int = typer.Option(1000, "--batch-size", "-b", min=1, help="Строк в одной порции курсора"),
+):
+    """Показать список пользователей.
+    
+    Строки читаются курсором на стороне сервера и выводятся по мере получения.
+    Следующая страница — --after-id с ID последнего выведенного пользователя.
+    """
+    if fmt is None:
+        fmt = "table" if limit is not None and limit <= TABLE_MAX_ROWS else "plain"
+    if fmt not in LIST_FORMATS:
+        console.print(f"[red]Неизвестный формат {fmt}, доступны: {', '.join(LIST_FORMATS)}[/red]")
+        raise typer.Exit(code=1)
+    if fmt == "table" and (limit is None or limit > TABLE_MAX_ROWS):
+        limit = TABLE_MAX_ROWS
+    
     async def _list_users():
         user_management = await get_user_management()
-        users = await user_management.list_active() if active_only else await user_management.list_all()
+        users = user_management.iter_users(after_id, limit, active_only, batch_size)
+        table_rows = []
+        count = 0
+        last_id = after_id
         
-        if not users:
-            console.print("[yellow]Пользователи не найдены[/yellow]")
-            return
+        try:
+            async with aclosing(users):
+                if fmt == "csv":
+                    sys.stdout.buffer.write(bulk.encode_rows([bulk.EXPORT_COLUMNS], fmt))
+                async for user in users:
+                    count += 1
+                    last_id = user.id
+                    if fmt == "table":
+                        table_rows.append(format_user(user))
+                    elif fmt == "plain":
+                        sys.stdout.write(format_plain(user) + "\n")
+                    else:
+                        row = tuple(getattr(user, column) for column in bulk.EXPORT_COLUMNS)
+                        sys.stdout.buffer.write(bulk.encode_rows([row], fmt))
+        finally:
+            sys.stdout.flush()
+            await dispose_engine()
         
-        table = Table(title="Users List")
-        for key in format_user(users[0]).keys():
-            table.add_column(key)
+        if not count:
+            err_console.print("[yellow]Пользователи не найдены[/yellow]")
+            return
         
-        for user in users:
-            table.add_row(*[str(value) for value in format_user(user).values()])
+        if fmt == "table":
+            table = Table(title="Users List")
+            for key in table_rows[0].keys():
+                table.add_column(key)
+            for row in table_rows:
+                table.add_row(*[str(value) for value in row.values()])
+            console.print(table)
         
-        console.print(table)
+        if limit is not None and count == limit:
+            err_console.print(f"[dim]Следующая страница: --after-id {last_id}[/dim]")
     
     asyncio.run(_list_users())
 
@@ -92,13 +158,14 @@ def create_user(
 ):
     """Создать нового пользователя."""
     async def _create_user():
-        user_management = await get_user_management()
-        user = await user_management.create_user(
-            telegram_id=telegram_id,
-            username=username,
-            first_name=first_name,
-            last_name=last_name,
-        )
+        async with get_registration_feed() as registration_feed:
+            user_management = await get_user_management(registration_feed)
+            user = await user_management.create_user(
+                telegram_id=telegram_id,
+                username=username,
+                first_name=first_name,
+                last_name=last_name,
+            )
         
         console.print("[green]Пользователь успешно создан:[/green]")
         table = Table()
@@ -171,4 +238,109 @@ def delete_user(
         await user_management.delete_user(user_id)
         console.print(f"[green]Пользователь с ID {user_id} успешно удален[/green]")
     
-    asyncio.run(_delete_user()) 
\ No newline at end of file
+    asyncio.run(_delete_user()) 
+
+
+def resolve_format(path: Path, fmt: Optional[str]) -> str:
+    """Формат из --format или по расширению файла."""
+    fmt = fmt or bulk.detect_format(path.name)
+    if fmt not in bulk.FORMATS:
+        console.print("[red]Укажите --format csv или jsonl[/red]")
+        raise typer.Exit(code=1)
+    return fmt
+
+
+def bulk_progress() -> Progress:
+    """Индикатор прогресса для импорта и экспорта: счетчик записей без общего объема."""
+    return Progress(
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(bar_width=None),
+        TextColumn("{task.completed:,.0f} записей"),
+        TimeElapsedColumn(),
+        console=err_console,
+    )
+
+
+@app.command("import")
+def import_users(
+    path: Path = typer.Argument(..., help="CSV с заголовком или JSONL; - для stdin"),
+    fmt: Optional[str] = typer.Option(None, "--format", help="csv или jsonl (по умолчанию по расширению)"),
+    batch_size: int = typer.Option(10000, "--batch-size", "-b", min=1, help="Записей в одном пакете"),
+):
+    """Загрузить пользователей из файла (COPY в PostgreSQL, пакетные INSERT в SQLite).
+    
+    Добавленные пользователи сразу вносятся в рейтинг в Redis, если он включен,
+    и в реестры пользователей процессов бота.
+    """
+    fmt = resolve_format(path, fmt)
+    
+    async def _import_users():
+        redis = create_redis() if settings.LEADERBOARD_ENABLED else None
+        leaderboard = RedisLeaderboard(redis, key=settings.LEADERBOARD_KEY) if redis is not None else None
+        
+        with bulk_progress() as progress:
+            task = progress.add_task("Импорт", total=None)
+            source = sys.stdin.buffer if str(path) == "-" else path.open("rb")
+            try:
+                async with get_registration_feed() as registration_feed:
+                    async def on_inserted(rows):
+                        if leaderboard is not None:
+                            await leaderboard.add_users({user_id: taps for user_id, _, taps in rows})
+                        if registration_feed is not None:
+                            await registration_feed.publish([telegram_id for _, telegram_id, _ in rows])
+                    
+                    result = await bulk.import_users(
+                        get_engine(),
+                        source,
+                        fmt=fmt,
+                        batch_size=batch_size,
+                        progress=lambda count: progress.advance(task, count),
+                        on_inserted=on_inserted,
+                    )
+            finally:
+                if source is not sys.stdin.buffer:
+                    source.close()
+                if redis is not None:
+                    await redis.close()
+                await dispose_engine()
+        
+        console.print(
+            f"[green]Обработано {result.processed}, добавлено {result.inserted}, "
+            f"пропущено существующих {result.skipped}[/green]"
+        )
+    
+    asyncio.run(_import_users())
+
+
+@app.command("export")
+def export_users(
+    path: Path = typer.Argument(..., help="Файл для выгрузки; - для stdout"),
+    fmt: Optional[str] = typer.Option(None, "--format", help="csv или jsonl (по умолчанию по расширению)"),
+    batch_size: int = typer.Option(10000, "--batch-size", "-b", min=1, help="Записей в одной странице выборки"),
+):
+    """Выгрузить всех пользователей в файл (COPY в PostgreSQL, постранично в SQLite)."""
+    fmt = resolve_format(path, fmt)
+    to_stdout = str(path) == "-"
+    
+    async def _export_users():
+        with bulk_progress() as progress:
+            task = progress.add_task("Экспорт", total=None)
+            output = sys.stdout.buffer if to_stdout else path.open("wb")
+            try:
+                total = await bulk.export_users(
+                    get_engine(),
+                    output,
+                    fmt=fmt,
+                    batch_size=batch_size,
+                    progress=lambda count: progress.advance(task, count),
+                )
+            finally:
+                if to_stdout:
+                    output.flush()
+                else:
+                    output.close()
+                await dispose_engine()
+        
+        err_console.print(f"[green]Выгружено пользователей: {total}[/green]")
+    
+    asyncio.run(_export_users())
@@ -0,0 +1,31 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from ...application.use_cases.user_management import UserManagementUseCase
+from ...config import settings
+from ...infrastructure.cache.redis import create_redis
+from ...infrastructure.cache.user_registry import RedisRegistrationFeed
+from ...infrastructure.database.repositories.user_repository_impl import UserRepositoryImpl
+from ...infrastructure.database.session import create_session_factory
+from ...infrastructure.services.user_service_impl import UserServiceImpl
+
+
+async def get_user_management(registration_feed: Optional[RedisRegistrationFeed] = None) -> UserManagementUseCase:
+    """Получение экземпляра UserManagementUseCase."""
+    session_factory = await create_session_factory()
+    user_repository = UserRepositoryImpl(session_factory)
+    user_service = UserServiceImpl(user_repository)
+    return UserManagementUseCase(user_service, registration_feed=registration_feed)
+
+
+@asynccontextmanager
+async def get_registration_feed() -> AsyncIterator[Optional[RedisRegistrationFeed]]:
+    """Канал оповещений о регистрациях на время команды или None, если реестр пользователей выключен."""
+    if not settings.USER_REGISTRY_ENABLED:
+        yield None
+        return
+    redis = create_redis()
+    try:
+        yield RedisRegistrationFeed(redis, channel=settings.USER_REGISTRY_CHANNEL)
+    finally:
+        await redis.close()
@@ -1,12 +1,5 @@
-import asyncio
 import typer
-from typing import Optional
 
-from ...config import settings
-from ...infrastructure.database.session import create_session_factory
-from ...infrastructure.services.user_service_impl import UserServiceImpl
-from ...infrastructure.database.repositories.user_repository_impl import UserRepositoryImpl
-from ...application.use_cases.user_management import UserManagementUseCase
 from .commands import users
 
 app = typer.Typer(
@@ -25,14 +18,6 @@ def version() -> None:
     typer.echo("Telegram Bot CLI v1.0.0")
 
 
-async def get_user_management() -> UserManagementUseCase:
-    """Получение экземпляра UserManagementUseCase."""
-    session_factory = await create_session_factory()
-    user_repository = UserRepositoryImpl(session_factory())
-    user_service = UserServiceImpl(user_repository)
-    return UserManagementUseCase(user_service)
-
-
 def run_cli() -> None:
     """Запуск CLI приложения."""
     app()
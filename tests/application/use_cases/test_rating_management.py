@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from src.application.use_cases.rating_management import RatingManagementUseCase
+from src.domain.entities.user import User
+
+
+class CountingRatingService:
+    """Сервис рейтинга, который считает обращения к базе."""
+    
+    def __init__(self, delay: float = 0.01):
+        self.delay = delay
+        self.top_calls = 0
+        self.total_calls = 0
+        self.rank_calls = 0
+        self.fail = False
+    
+    async def get_top_users(self, limit: int = 10):
+        self.top_calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("database is down")
+        return [User(id=i, telegram_id=i, taps=100 - i) for i in range(1, limit + 1)]
+    
+    async def get_total_taps(self):
+        self.total_calls += 1
+        await asyncio.sleep(self.delay)
+        return 1000
+    
+    async def get_user_rank(self, user_id: int):
+        self.rank_calls += 1
+        return 42
+
+
+@pytest.mark.asyncio
+async def test_snapshot_concurrent_misses_coalesced():
+    """Тест: одновременные промахи кэша выполняют один запрос."""
+    service = CountingRatingService()
+    rating_management = RatingManagementUseCase(service, snapshot_ttl=60)
+    
+    snapshots = await asyncio.gather(*(rating_management.get_rating_snapshot(limit=10) for _ in range(100)))
+    
+    assert service.top_calls == 1
+    assert service.total_calls == 1
+    assert all(snapshot is snapshots[0] for snapshot in snapshots)
+    assert rating_management.get_snapshot_stats() == {"hits": 0, "misses": 1, "coalesced": 99}
+
+
+@pytest.mark.asyncio
+async def test_snapshot_cached_until_ttl():
+    """Тест: снимок берется из кэша до истечения TTL."""
+    service = CountingRatingService(delay=0)
+    rating_management = RatingManagementUseCase(service, snapshot_ttl=0.05)
+    
+    await rating_management.get_rating_snapshot()
+    await rating_management.get_rating_snapshot()
+    assert service.top_calls == 1
+    assert rating_management.snapshot_hits == 1
+    
+    await asyncio.sleep(0.06)
+    await rating_management.get_rating_snapshot()
+    assert service.top_calls == 2
+    assert rating_management.snapshot_misses == 2
+
+
+@pytest.mark.asyncio
+async def test_snapshot_cached_per_limit():
+    """Тест: снимки с разным размером топа кэшируются отдельно."""
+    service = CountingRatingService(delay=0)
+    rating_management = RatingManagementUseCase(service, snapshot_ttl=60)
+    
+    top_5 = await rating_management.get_rating_snapshot(limit=5)
+    top_10 = await rating_management.get_rating_snapshot(limit=10)
+    
+    assert len(top_5.top_users) == 5
+    assert len(top_10.top_users) == 10
+    assert service.top_calls == 2
+
+
+@pytest.mark.asyncio
+async def test_snapshot_error_not_cached():
+    """Тест: ошибка загрузки не кэшируется и доходит до всех ожидающих."""
+    service = CountingRatingService()
+    service.fail = True
+    rating_management = RatingManagementUseCase(service, snapshot_ttl=60)
+    
+    results = await asyncio.gather(
+        *(rating_management.get_rating_snapshot() for _ in range(5)), return_exceptions=True
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert service.top_calls == 1
+    
+    service.fail = False
+    snapshot = await rating_management.get_rating_snapshot()
+    assert snapshot.total_taps == 1000
+
+
+@pytest.mark.asyncio
+async def test_rank_from_snapshot():
+    """Тест: место пользователя из топа считается по снимку без запроса."""
+    service = CountingRatingService(delay=0)
+    rating_management = RatingManagementUseCase(service, snapshot_ttl=60)
+    snapshot = await rating_management.get_rating_snapshot(limit=10)
+    
+    assert await rating_management.get_user_rank(3, snapshot=snapshot) == 3
+    assert service.rank_calls == 0
+    
+    assert await rating_management.get_user_rank(500, snapshot=snapshot) == 42
+    assert service.rank_calls == 1
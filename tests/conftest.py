@@ -1,14 +1,16 @@
 import asyncio
+import os
 from typing import AsyncGenerator, Generator
 
 import pytest
 import pytest_asyncio
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import StaticPool
 
 from src.domain.entities.user import User
-from src.infrastructure.database.models import Base
+from src.infrastructure.database.models import Base, UserModel
+from src.infrastructure.database.repositories.rating_repository_impl import RatingRepositoryImpl
 from src.infrastructure.database.repositories.user_repository_impl import UserRepositoryImpl
 from src.infrastructure.services.user_service_impl import UserServiceImpl
 from src.application.use_cases.user_management import UserManagementUseCase
@@ -36,14 +38,15 @@ def event_loop() -> Generator:
     loop.close()
 
 
-@pytest_asyncio.fixture(scope="session")
+@pytest_asyncio.fixture
 async def test_engine():
     """Создание тестового движка базы данных."""
-    # Используем in-memory SQLite для тестов
+    # Используем in-memory SQLite для тестов. StaticPool нужен, чтобы все
+    # сессии работали с одним соединением и видели одну и ту же базу.
     engine = create_async_engine(
         "sqlite+aiosqlite:///:memory:",
         echo=False,
-        poolclass=NullPool,
+        poolclass=StaticPool,
     )
     
     async with engine.begin() as conn:
@@ -71,6 +74,16 @@ async def test_session(test_engine) -> AsyncGenerator[AsyncSession, None]:
         await session.rollback()
 
 
+@pytest_asyncio.fixture
+async def session_factory(test_engine) -> async_sessionmaker[AsyncSession]:
+    """Создание фабрики тестовых сессий."""
+    return async_sessionmaker(
+        test_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+    )
+
+
 @pytest_asyncio.fixture
 async def user_repository(test_session) -> UserRepositoryImpl:
     """Создание репозитория пользователей."""
@@ -97,4 +110,39 @@ async def test_user(user_management) -> User:
         username=TEST_USER.username,
         first_name=TEST_USER.first_name,
         last_name=TEST_USER.last_name,
-    ) 
\ No newline at end of file
+    )
+
+
+@pytest_asyncio.fixture
+async def rating_repository(test_session) -> RatingRepositoryImpl:
+    """Создание репозитория рейтинга."""
+    return RatingRepositoryImpl(test_session)
+
+
+@pytest_asyncio.fixture
+async def rated_users(session_factory) -> list[User]:
+    """Создание пользователей с разным количеством нажатий."""
+    models = [
+        UserModel(telegram_id=1000 + i, username=f"player_{i}", taps=taps)
+        for i, taps in enumerate([5, 30, 10, 0, 20])
+    ]
+    async with session_factory() as session:
+        session.add_all(models)
+        await session.commit()
+    return [User.model_validate(model) for model in models]
+
+
+@pytest_asyncio.fixture
+async def redis_client():
+    """Клиент Redis: локальный сервер из TEST_REDIS_URL или fakeredis."""
+    if os.getenv("TEST_REDIS_URL"):
+        from redis.asyncio import Redis
+        client = Redis.from_url(os.environ["TEST_REDIS_URL"])
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        client = fakeredis.FakeAsyncRedis()
+    
+    yield client
+    
+    await client.flushdb()
+    await client.close()
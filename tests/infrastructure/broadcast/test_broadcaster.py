@@ -0,0 +1,180 @@
+import asyncio
+import time
+
+import pytest
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+from aiogram.methods import SendMessage
+
+from src.application.interfaces.broadcast_progress import BroadcastProgress
+from src.infrastructure.broadcast.broadcaster import Broadcaster
+from src.infrastructure.broadcast.rate_limit import SharedTokenBucket, TokenBucket
+from src.infrastructure.cache.broadcast_progress import RedisBroadcastProgressStore
+
+
+class FakeBot:
+    """Бот, запоминающий отправленные сообщения и отвечающий заданными ошибками."""
+
+    def __init__(self, errors=None, delay: float = 0.0):
+        self.sent = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._errors = errors or {}
+        self._delay = delay
+
+    async def send_message(self, chat_id: int, text: str) -> None:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self._delay)
+            errors = self._errors.get(chat_id)
+            if errors:
+                raise errors.pop(0)
+            self.sent.append((chat_id, text, time.monotonic()))
+        finally:
+            self.in_flight -= 1
+
+
+def recipients_of(user_ids):
+    async def recipients(after_id: int):
+        for user_id in user_ids:
+            if user_id > after_id:
+                yield user_id, 1000 + user_id
+    return recipients
+
+
+def method(chat_id: int) -> SendMessage:
+    return SendMessage(chat_id=chat_id, text="digest")
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate():
+    """Тест темпа выдачи токенов и паузы всего ведра."""
+    bucket = TokenBucket(rate=100)
+    
+    started = time.monotonic()
+    for _ in range(21):
+        await bucket.acquire()
+    assert time.monotonic() - started >= 0.19
+    
+    bucket.pause(0.2)
+    started = time.monotonic()
+    await bucket.acquire()
+    assert time.monotonic() - started >= 0.19
+
+
+@pytest.mark.asyncio
+async def test_shared_token_bucket_splits_one_rate():
+    """Тест: ведра с общим состоянием (как в разных процессах) делят один лимит и одну паузу."""
+    state = SharedTokenBucket.create_state()
+    first, second = SharedTokenBucket(100, state), SharedTokenBucket(100, state)
+    
+    async def take(bucket, count):
+        for _ in range(count):
+            await bucket.acquire()
+    
+    started = time.monotonic()
+    await asyncio.gather(take(first, 11), take(second, 10))
+    assert time.monotonic() - started >= 0.19
+    
+    first.pause(0.2)
+    assert second.paused_for > 0.1
+    started = time.monotonic()
+    await second.acquire()
+    assert time.monotonic() - started >= 0.19
+
+
+@pytest.mark.asyncio
+async def test_broadcast_counts_outcomes_with_bounded_concurrency():
+    """Тест рассылки: ограничение параллельности и учет отправленных, заблокировавших и ошибок."""
+    bot = FakeBot(
+        errors={
+            1003: [TelegramForbiddenError(method(1003), "Forbidden: bot was blocked by the user")],
+            1005: [ValueError("unexpected")],
+        },
+        delay=0.01,
+    )
+    broadcaster = Broadcaster(bot, rate=1000, concurrency=4)
+    
+    progress = await broadcaster.run("test", recipients_of(range(1, 41)), "digest")
+    
+    assert (progress.sent, progress.blocked, progress.failed) == (38, 1, 1)
+    assert progress.finished
+    assert bot.max_in_flight <= 4
+    assert {chat_id for chat_id, _, _ in bot.sent} == {1000 + i for i in range(1, 41)} - {1003, 1005}
+
+
+@pytest.mark.asyncio
+async def test_broadcast_honours_retry_after():
+    """Тест паузы всей рассылки на retry_after и повторной отправки сообщения."""
+    bot = FakeBot(errors={1002: [TelegramRetryAfter(method(1002), "Flood control exceeded", retry_after=1)]})
+    broadcaster = Broadcaster(bot, rate=1000, concurrency=1, chat_interval=0)
+    
+    started = time.monotonic()
+    progress = await broadcaster.run("test", recipients_of([1, 2, 3]), "digest")
+    
+    assert progress.sent == 3
+    assert broadcaster.retries == 1
+    sent_at = {chat_id: at for chat_id, _, at in bot.sent}
+    assert sent_at[1002] - started >= 1
+    assert sent_at[1003] >= sent_at[1002]
+
+
+@pytest.mark.asyncio
+async def test_broadcast_resumes_from_saved_progress(redis_client):
+    """Тест возобновления прерванной рассылки с сохраненного курсора и текста."""
+    store = RedisBroadcastProgressStore(redis_client, prefix="test:broadcast")
+    await store.save("digest", BroadcastProgress(text="old digest", cursor=5, sent=5))
+    bot = FakeBot()
+    broadcaster = Broadcaster(bot, rate=1000, concurrency=3, progress_store=store, save_every=2)
+    
+    progress = await broadcaster.run("digest", recipients_of(range(1, 11)), "new digest")
+    
+    assert sorted(chat_id for chat_id, _, _ in bot.sent) == [1006, 1007, 1008, 1009, 1010]
+    assert {text for _, text, _ in bot.sent} == {"old digest"}
+    assert await store.load("digest") == BroadcastProgress(text="old digest", cursor=10, sent=10, finished=True)
+    assert progress.sent == 10
+    
+    # Завершенная рассылка повторно не отправляется
+    await broadcaster.run("digest", recipients_of(range(1, 11)), "new digest")
+    assert len(bot.sent) == 5
+
+
+@pytest.mark.asyncio
+async def test_interrupted_broadcast_saves_contiguous_cursor(redis_client):
+    """Тест сохранения курсора до первого необработанного получателя при прерывании."""
+    store = RedisBroadcastProgressStore(redis_client, prefix="test:broadcast")
+    
+    async def failing_recipients(after_id: int):
+        for user_id in range(after_id + 1, 7):
+            yield user_id, 1000 + user_id
+        raise RuntimeError("database is gone")
+    
+    broadcaster = Broadcaster(FakeBot(), rate=1000, concurrency=2, progress_store=store)
+    
+    with pytest.raises(RuntimeError):
+        await broadcaster.run("digest", failing_recipients, "digest")
+    
+    progress = await store.load("digest")
+    assert not progress.finished
+    assert progress.cursor <= 6
+    assert progress.cursor + len(progress.completed) == progress.sent
+
+
+@pytest.mark.asyncio
+async def test_resumed_broadcast_counts_each_recipient_once(redis_client):
+    """Тест пропуска получателей, обработанных после курсора до прерывания."""
+    store = RedisBroadcastProgressStore(redis_client, prefix="test:broadcast")
+    # До падения сообщения 7 и 9 ушли раньше, чем 6 и 8
+    await store.save(
+        "digest", BroadcastProgress(text="digest", cursor=5, sent=6, blocked=1, completed=[7, 9])
+    )
+    bot = FakeBot()
+    broadcaster = Broadcaster(bot, rate=1000, concurrency=3, progress_store=store, save_every=2)
+    
+    progress = await broadcaster.run("digest", recipients_of(range(1, 11)), "digest")
+    
+    assert sorted(chat_id for chat_id, _, _ in bot.sent) == [1006, 1008, 1010]
+    assert (progress.sent, progress.failed, progress.blocked) == (9, 0, 1)
+    assert await store.load("digest") == BroadcastProgress(
+        text="digest", cursor=10, sent=9, blocked=1, finished=True
+    )
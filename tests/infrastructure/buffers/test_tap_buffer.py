@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from src.application.use_cases.rating_management import RatingManagementUseCase
+from src.infrastructure.buffers.tap_buffer import WriteBehindTapBuffer
+from src.infrastructure.database.models import UserModel
+
+
+async def _get_taps(session_factory, user_id: int) -> int:
+    async with session_factory() as session:
+        return (await session.execute(select(UserModel.taps).where(UserModel.id == user_id))).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_pending_taps(session_factory, rated_users):
+    """Тест сброса накопленных нажатий в базу."""
+    buffer = WriteBehindTapBuffer(session_factory, flush_interval=60)
+    user = rated_users[0]
+    
+    for _ in range(5):
+        buffer.add(user.id)
+    
+    # До сброса нажатия есть только в буфере
+    assert buffer.pending(user.id) == 5
+    assert await _get_taps(session_factory, user.id) == user.taps
+    
+    # После сброса нажатия сохранены в базе
+    assert await buffer.flush() == 5
+    assert buffer.pending(user.id) == 0
+    assert await _get_taps(session_factory, user.id) == user.taps + 5
+
+
+@pytest.mark.asyncio
+async def test_flush_on_max_pending(session_factory, rated_users):
+    """Тест сброса буфера при достижении лимита нажатий."""
+    buffer = WriteBehindTapBuffer(session_factory, flush_interval=60, max_pending=3)
+    user = rated_users[1]
+    await buffer.start()
+    try:
+        for _ in range(3):
+            buffer.add(user.id)
+        await asyncio.sleep(0.1)
+        
+        assert await _get_taps(session_factory, user.id) == user.taps + 3
+    finally:
+        await buffer.stop()
+
+
+@pytest.mark.asyncio
+async def test_stop_flushes_pending_taps(session_factory, rated_users):
+    """Тест сброса оставшихся нажатий при остановке."""
+    buffer = WriteBehindTapBuffer(session_factory, flush_interval=60)
+    user = rated_users[2]
+    await buffer.start()
+    
+    buffer.add(user.id, amount=4)
+    await buffer.stop()
+    
+    assert await _get_taps(session_factory, user.id) == user.taps + 4
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_pending_taps(session_factory, rated_users, test_engine):
+    """Тест сохранения нажатий в буфере при ошибке записи."""
+    buffer = WriteBehindTapBuffer(session_factory, flush_interval=60)
+    user = rated_users[0]
+    buffer.add(user.id, amount=2)
+    
+    # Ломаем таблицу, чтобы запись в базу упала
+    async with test_engine.begin() as conn:
+        await conn.exec_driver_sql("ALTER TABLE users RENAME TO users_broken")
+    with pytest.raises(Exception):
+        await buffer.flush()
+    
+    assert buffer.pending(user.id) == 2
+    
+    async with test_engine.begin() as conn:
+        await conn.exec_driver_sql("ALTER TABLE users_broken RENAME TO users")
+    assert await buffer.flush() == 2
+
+
+@pytest.mark.asyncio
+async def test_use_case_counts_pending_taps(session_factory, rated_users):
+    """Тест подсчета нажатий пользователя с учетом буфера."""
+    buffer = WriteBehindTapBuffer(session_factory, flush_interval=60)
+    rating_management = RatingManagementUseCase(rating_service=None, tap_buffer=buffer)
+    user = rated_users[1]
+    
+    assert await rating_management.add_tap(user) == user.taps + 1
+    assert await rating_management.add_tap(user) == user.taps + 2
+    assert rating_management.get_user_taps(user) == user.taps + 2
@@ -0,0 +1,142 @@
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+
+from src.infrastructure.cache.leader_election import RedisLeaderElection
+from src.infrastructure.scheduler.tasks import setup_scheduler
+
+LEASE = 0.3
+RENEW_INTERVAL = 0.05
+
+
+@pytest_asyncio.fixture
+async def replicas():
+    """Три реплики, каждая со своим клиентом к общему Redis."""
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    elections = [
+        RedisLeaderElection(
+            fakeredis.FakeAsyncRedis(server=server),
+            key="test:leader",
+            lease=LEASE,
+            renew_interval=RENEW_INTERVAL,
+            identity=f"replica-{i}",
+        )
+        for i in range(3)
+    ]
+    
+    yield elections
+    
+    for election in elections:
+        await election.stop()
+
+
+async def wait_for_leader(elections, timeout: float = 2.0):
+    """Дождаться ровно одного лидера среди реплик."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        leaders = [election for election in elections if election.is_leader]
+        if len(leaders) == 1:
+            return leaders[0]
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"expected one leader, got {[e.identity for e in elections if e.is_leader]}")
+
+
+@pytest.mark.asyncio
+async def test_single_leader_among_replicas(replicas):
+    """Тест: из нескольких реплик лидером становится и остается ровно одна."""
+    for election in replicas:
+        await election.start()
+    
+    leader = await wait_for_leader(replicas)
+    
+    # Аренда продлевается: лидер не меняется спустя несколько сроков аренды
+    for _ in range(10):
+        await asyncio.sleep(LEASE / 3)
+        assert [election for election in replicas if election.is_leader] == [leader]
+
+
+@pytest.mark.asyncio
+async def test_failover_after_graceful_stop(replicas):
+    """Тест: при штатной остановке лидерство переходит к другой реплике за один интервал продления."""
+    for election in replicas:
+        await election.start()
+    leader = await wait_for_leader(replicas)
+    
+    started = time.monotonic()
+    await leader.stop()
+    new_leader = await wait_for_leader(replicas)
+    
+    assert new_leader is not leader
+    assert time.monotonic() - started < RENEW_INTERVAL * 3
+
+
+@pytest.mark.asyncio
+async def test_failover_after_leader_crash(replicas):
+    """Тест: если лидер упал, не освободив ключ, его место занимают после истечения аренды."""
+    elected, revoked = [], []
+    for election in replicas:
+        election.add_listener(
+            on_elected=lambda election=election: elected.append(election.identity),
+            on_revoked=lambda election=election: revoked.append(election.identity),
+        )
+        await election.start()
+    leader = await wait_for_leader(replicas)
+    
+    # Падение процесса: цикл продления останавливается, ключ остается в Redis
+    started = time.monotonic()
+    leader._task.cancel()
+    survivors = [election for election in replicas if election is not leader]
+    new_leader = await wait_for_leader(survivors)
+    
+    assert time.monotonic() - started < LEASE + RENEW_INTERVAL * 3
+    assert elected == [leader.identity, new_leader.identity]
+    assert revoked == []
+
+
+@pytest.mark.asyncio
+async def test_leader_steps_down_when_lease_cannot_be_renewed(replicas):
+    """Тест: лидер без связи с Redis слагает полномочия раньше, чем его аренда истечет."""
+    for election in replicas:
+        await election.start()
+    leader = await wait_for_leader(replicas)
+    
+    async def unavailable(*args, **kwargs):
+        raise ConnectionError("Redis is unavailable")
+    leader._renew = unavailable
+    
+    lost_at = time.monotonic()
+    while leader.is_leader:
+        await asyncio.sleep(0.01)
+    assert time.monotonic() - lost_at < LEASE
+    
+    # Ключ старого лидера еще действует: новый лидер появляется только после его истечения
+    assert not any(election.is_leader for election in replicas)
+    await wait_for_leader(replicas)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_runs_leader_jobs_only_on_leader(replicas):
+    """Тест: задачи лидера стоят на паузе у резервных реплик и включаются при получении лидерства."""
+    schedulers = []
+    for election in replicas:
+        schedulers.append(await setup_scheduler(None, None, None, leader_election=election))
+        await election.start()
+    try:
+        leader = await wait_for_leader(replicas)
+        
+        for election, scheduler in zip(replicas, schedulers):
+            next_run_time = scheduler.get_job("daily_digest").next_run_time
+            assert (next_run_time is not None) == (election is leader)
+        
+        await leader.stop()
+        new_leader = await wait_for_leader(replicas)
+        leader_scheduler = schedulers[replicas.index(leader)]
+        new_scheduler = schedulers[replicas.index(new_leader)]
+        assert leader_scheduler.get_job("daily_digest").next_run_time is None
+        assert new_scheduler.get_job("daily_digest").next_run_time is not None
+    finally:
+        for scheduler in schedulers:
+            scheduler.shutdown(wait=False)
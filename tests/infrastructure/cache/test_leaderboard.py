@@ -0,0 +1,222 @@
+import io
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.infrastructure.cache.leaderboard import LeaderboardRatingRepository, RedisLeaderboard
+from src.infrastructure.database import bulk
+from src.infrastructure.database.models import Base, UserModel
+from src.infrastructure.database.repositories.rating_repository_impl import RatingRepositoryImpl
+from src.infrastructure.database.routing import DatabaseRouter, create_routing_session_factory
+
+
+@pytest.fixture
+def leaderboard(redis_client) -> RedisLeaderboard:
+    """Создание рейтинга в Redis."""
+    return RedisLeaderboard(redis_client, key="test:leaderboard")
+
+
+@pytest.fixture
+def leaderboard_repository(rating_repository, leaderboard) -> LeaderboardRatingRepository:
+    """Создание репозитория рейтинга поверх Redis."""
+    return LeaderboardRatingRepository(rating_repository, leaderboard)
+
+
+@pytest.mark.asyncio
+async def test_ensure_built_from_database(leaderboard_repository, leaderboard, rated_users):
+    """Тест построения рейтинга из базы при холодном старте."""
+    assert not await leaderboard.exists()
+    
+    await leaderboard_repository.ensure_built()
+    
+    assert await leaderboard.exists()
+    expected = sorted(((user.id, user.taps) for user in rated_users), key=lambda entry: -entry[1])
+    assert await leaderboard.top(len(rated_users)) == expected
+
+
+@pytest.mark.asyncio
+async def test_top_users_match_database(leaderboard_repository, rating_repository, rated_users):
+    """Тест совпадения топа из Redis с топом из базы."""
+    await leaderboard_repository.ensure_built()
+    
+    top_users = await leaderboard_repository.get_top_users(limit=3)
+    
+    assert [user.id for user in top_users] == [user.id for user in await rating_repository.get_top_users(limit=3)]
+    assert [user.taps for user in top_users] == [30, 20, 10]
+
+
+@pytest.mark.asyncio
+async def test_increment_updates_leaderboard(leaderboard_repository, leaderboard, rated_users):
+    """Тест обновления рейтинга при увеличении нажатий."""
+    await leaderboard_repository.ensure_built()
+    user = rated_users[3]
+    
+    await leaderboard_repository.increment_taps(user.id, amount=100)
+    
+    assert await leaderboard.top(1) == [(user.id, 100)]
+    assert await leaderboard_repository.get_user_rank(user.id) == 1
+
+
+@pytest.mark.asyncio
+async def test_increment_many_updates_leaderboard(leaderboard_repository, leaderboard, rated_users):
+    """Тест обновления рейтинга при пакетном увеличении нажатий."""
+    await leaderboard_repository.ensure_built()
+    first, last = rated_users[0], rated_users[3]
+    
+    await leaderboard_repository.increment_taps_many({first.id: 50, last.id: 1})
+    
+    assert await leaderboard.rank(first.id) == 1
+    assert await leaderboard.rank(last.id) == len(rated_users)
+
+
+@pytest.mark.asyncio
+async def test_stale_score_does_not_overwrite(leaderboard, rated_users):
+    """Тест: запоздавшее меньшее значение не перезаписывает более свежее."""
+    user = rated_users[0]
+    
+    await leaderboard.set_scores({user.id: 10})
+    await leaderboard.set_scores({user.id: 7})
+    
+    assert await leaderboard.top(1) == [(user.id, 10)]
+
+
+@pytest.mark.asyncio
+async def test_rank_matches_database(leaderboard_repository, rating_repository, rated_users):
+    """Тест совпадения места пользователя в Redis и в базе."""
+    await leaderboard_repository.ensure_built()
+    
+    for user in rated_users:
+        assert await leaderboard_repository.get_user_rank(user.id) == await rating_repository.get_user_rank(user.id)
+
+
+@pytest.mark.asyncio
+async def test_deleted_users_trimmed_from_top(leaderboard_repository, leaderboard, session_factory, rated_users):
+    """Тест: удаленный в обход рейтинга пользователь убирается из sorted set, а топ остается полным."""
+    await leaderboard_repository.ensure_built()
+    # Порядок рейтинга: 30, 20, 10, 5, 0
+    removed = rated_users[1]
+    async with session_factory() as session:
+        await session.execute(delete(UserModel).where(UserModel.id == removed.id))
+        await session.commit()
+    
+    top_users = await leaderboard_repository.get_top_users(limit=3)
+    
+    assert [user.taps for user in top_users] == [20, 10, 5]
+    assert await leaderboard.rank(removed.id) is None
+    assert await leaderboard_repository.get_user_rank(rated_users[4].id) == 1
+
+
+@pytest.mark.asyncio
+async def test_replica_lag_does_not_trim_new_users(leaderboard, tmp_path):
+    """Тест: пользователь, которого еще нет на отстающей реплике, остается в рейтинге."""
+    engines = []
+    # На реплику еще не доехал последний зарегистрированный пользователь
+    for name, count in (("primary", 3), ("replica", 2)):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}.sqlite3")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(
+                UserModel.__table__.insert(),
+                [{"telegram_id": 1000 + i, "username": f"player_{i}", "taps": 10 * i} for i in range(count)],
+            )
+        engines.append(engine)
+    primary, replica = engines
+    session_factory = create_routing_session_factory(DatabaseRouter(primary, [replica], read_your_writes=0))
+    await leaderboard.set_scores({1: 0, 2: 10, 3: 20})
+    
+    try:
+        async with session_factory() as session:
+            repository = LeaderboardRatingRepository(RatingRepositoryImpl(session), leaderboard)
+            top_users = await repository.get_top_users(limit=3)
+    finally:
+        for engine in engines:
+            await engine.dispose()
+    
+    assert [user.id for user in top_users] == [3, 2, 1]
+    assert await leaderboard.rank(3) == 1
+
+
+@pytest.mark.asyncio
+async def test_imported_users_enter_top(leaderboard_repository, leaderboard, test_engine, rated_users):
+    """Тест: пользователи из импорта сразу попадают в построенный рейтинг и общий счетчик."""
+    await leaderboard_repository.ensure_built()
+    source = io.BytesIO(b"telegram_id,username,taps\n2000,champion,500\n1000,player_0,999\n2001,runner_up,25\n")
+    
+    async def on_inserted(rows):
+        await leaderboard.add_users({user_id: taps for user_id, _, taps in rows})
+    
+    result = await bulk.import_users(test_engine, source, fmt="csv", on_inserted=on_inserted)
+    
+    assert result.inserted == 2
+    top_users = await leaderboard_repository.get_top_users(limit=3)
+    assert [user.username for user in top_users] == ["champion", "player_1", "runner_up"]
+    assert await leaderboard_repository.get_user_rank(top_users[0].id) == 1
+    assert await leaderboard.get_total() == 65 + 525
+
+
+@pytest.mark.asyncio
+async def test_add_users_skips_unbuilt_leaderboard(leaderboard):
+    """Тест: в еще не построенный рейтинг импорт ничего не пишет, чтобы он построился из базы целиком."""
+    await leaderboard.add_users({1: 10})
+    
+    assert not await leaderboard.exists()
+    assert await leaderboard.get_total() is None
+
+
+@pytest.mark.asyncio
+async def test_users_around(leaderboard_repository, rating_repository, rated_users):
+    """Тест получения соседей пользователя по рейтингу."""
+    await leaderboard_repository.ensure_built()
+    # Порядок рейтинга: 30, 20, 10, 5, 0
+    user = rated_users[2]
+    
+    around = await leaderboard_repository.get_users_around(user.id, radius=1)
+    
+    assert [user.taps for user in around] == [20, 10, 5]
+    assert [user.id for user in around] == [user.id for user in await rating_repository.get_users_around(user.id, 1)]
+
+
+@pytest.mark.asyncio
+async def test_rank_unknown_user(leaderboard_repository):
+    """Тест места несуществующего пользователя."""
+    await leaderboard_repository.ensure_built()
+    
+    assert await leaderboard_repository.get_user_rank(999) is None
+    assert await leaderboard_repository.get_users_around(999) == []
+
+
+@pytest.mark.asyncio
+async def test_total_taps_maintained(leaderboard_repository, rating_repository, rated_users):
+    """Тест поддержки общего количества нажатий без SUM по таблице."""
+    await leaderboard_repository.ensure_built()
+    assert await leaderboard_repository.get_total_taps() == sum(user.taps for user in rated_users)
+    
+    await leaderboard_repository.increment_taps(rated_users[0].id, amount=5)
+    await leaderboard_repository.increment_taps_many({rated_users[1].id: 3, 999: 100})
+    
+    # Несуществующий пользователь не попадает в счетчик
+    assert await leaderboard_repository.get_total_taps() == await rating_repository.get_total_taps()
+
+
+@pytest.mark.asyncio
+async def test_total_taps_initialized_lazily(leaderboard_repository, leaderboard, rated_users):
+    """Тест заведения счетчика из базы при первом обращении."""
+    assert await leaderboard.get_total() is None
+    
+    assert await leaderboard_repository.get_total_taps() == sum(user.taps for user in rated_users)
+    assert await leaderboard.get_total() == sum(user.taps for user in rated_users)
+
+
+@pytest.mark.asyncio
+async def test_reconcile_total_taps(leaderboard_repository, leaderboard, rating_repository, rated_users):
+    """Тест исправления расхождения счетчика с базой."""
+    await leaderboard_repository.ensure_built()
+    
+    # Нажатия в обход Redis: счетчик отстает от базы
+    await rating_repository.increment_taps(rated_users[0].id, amount=7)
+    assert await leaderboard_repository.reconcile_total_taps() == 7
+    assert await leaderboard_repository.get_total_taps() == await rating_repository.get_total_taps()
+    
+    # Повторная сверка ничего не меняет
+    assert await leaderboard_repository.reconcile_total_taps() == 0
@@ -0,0 +1,187 @@
+import asyncio
+
+import pytest
+from sqlalchemy import delete
+
+from src.application.use_cases.user_management import UserManagementUseCase
+from src.config import settings
+from src.infrastructure.cache.user_registry import BloomFilter, BloomUserRegistry, RedisRegistrationFeed
+from src.infrastructure.database.models import UserModel
+from src.infrastructure.database.repositories.user_repository_impl import UserRepositoryImpl
+from src.infrastructure.scheduler.tasks import setup_user_registry_scheduler
+from src.infrastructure.services.user_service_impl import UserServiceImpl
+
+
+class CountingUserRepository(UserRepositoryImpl):
+    """Репозиторий пользователей, который считает проверки существования в базе."""
+    
+    def __init__(self, session_factory):
+        super().__init__(session_factory)
+        self.exists_calls = 0
+    
+    async def exists_by_telegram_id(self, telegram_id: int) -> bool:
+        self.exists_calls += 1
+        return await super().exists_by_telegram_id(telegram_id)
+
+
+@pytest.fixture
+def user_repository_counter(session_factory) -> CountingUserRepository:
+    """Создание репозитория пользователей со счетчиком запросов."""
+    return CountingUserRepository(session_factory)
+
+
+def test_bloom_filter_false_positive_rate():
+    """Тест: нет ложных отрицаний, доля ложных срабатываний близка к заданной."""
+    bloom = BloomFilter(capacity=10000, error_rate=0.01)
+    members = range(10**9, 10**9 + 10000)
+    for value in members:
+        bloom.add(value)
+    
+    assert all(value in bloom for value in members)
+    false_positives = sum(1 for value in range(1, 20001) if value in bloom)
+    assert false_positives / 20000 < 0.02
+
+
+def test_bloom_filter_memory_for_10m_ids():
+    """Тест: фильтр на 10M ID при 1% ложных срабатываний занимает около 12 МБ."""
+    bloom = BloomFilter(capacity=10_000_000, error_rate=0.01)
+    
+    assert bloom.hash_count == 7
+    assert 11_500_000 < bloom.nbytes < 12_500_000
+
+
+@pytest.mark.asyncio
+async def test_registry_answers_negatives_without_database(user_repository_counter, rated_users):
+    """Тест: незарегистрированные отсеиваются фильтром, в базу идут только положительные ответы."""
+    registry = BloomUserRegistry(user_repository_counter, capacity=1000)
+    assert await registry.load(batch_size=2) == len(rated_users)
+    
+    for _ in range(2):
+        for telegram_id in range(10**6, 10**6 + 10000):
+            assert not await registry.is_registered(telegram_id)
+    for user in rated_users:
+        assert await registry.is_registered(user.telegram_id)
+    
+    # Запросы в базу: по одному на каждого зарегистрированного и на каждое ложное срабатывание
+    stats = registry.get_stats()
+    assert stats["confirmed"] == len(rated_users)
+    assert stats["false_positives"] < 100
+    assert user_repository_counter.exists_calls == len(rated_users) + stats["false_positives"]
+    # Ложные срабатывания запомнены: при втором проходе они отсеиваются без базы
+    assert stats["negatives"] == 20000 - stats["false_positives"]
+    assert stats["absent"] == stats["false_positives"]
+
+
+@pytest.mark.asyncio
+async def test_registry_keeps_registrations_made_during_load(session_factory, rated_users):
+    """Тест: регистрация во время построения фильтра не теряется при его подмене."""
+    registry = None
+    
+    class RegisteringUserRepository(UserRepositoryImpl):
+        async def iter_telegram_ids(self, batch_size: int = 10000):
+            async for telegram_ids in super().iter_telegram_ids(batch_size):
+                yield telegram_ids
+                registry.add(5000 + len(telegram_ids))
+    
+    registry = BloomUserRegistry(RegisteringUserRepository(session_factory), capacity=1000)
+    await registry.load(batch_size=2)
+    
+    # Пакеты по 2, 2 и 1 пользователю: после каждого во время построения регистрируется пользователь
+    assert registry.get_stats()["ids"] == len(rated_users) + 3
+
+
+@pytest.mark.asyncio
+async def test_registry_add_and_discard(user_repository_counter, rated_users, session_factory):
+    """Тест обновления реестра при создании и удалении пользователей."""
+    registry = BloomUserRegistry(user_repository_counter, capacity=1000)
+    await registry.load()
+    
+    # Созданный пользователь сразу виден в реестре
+    assert not await registry.is_registered(5000)
+    async with session_factory() as session:
+        session.add(UserModel(telegram_id=5000, username="new"))
+        await session.commit()
+    registry.add(5000)
+    assert await registry.is_registered(5000)
+    
+    # Удаленный пользователь остается в фильтре, но база его не подтверждает
+    removed = rated_users[1]
+    async with session_factory() as session:
+        await session.execute(delete(UserModel).where(UserModel.id == removed.id))
+        await session.commit()
+    registry.discard(removed.telegram_id)
+    assert not await registry.is_registered(removed.telegram_id)
+    assert registry.get_stats()["stale"] == 1
+    
+    # Перестроение убирает удаленных из фильтра
+    await registry.load()
+    assert registry.get_stats()["stale"] == 0
+    assert registry.get_stats()["ids"] == len(rated_users)
+
+
+@pytest.mark.asyncio
+async def test_registry_reload_scheduled_without_main_scheduler(session_factory, monkeypatch):
+    """Тест: процесс без общего планировщика все равно перестраивает свой реестр, если это включено."""
+    monkeypatch.setattr(settings, "USER_REGISTRY_RELOAD_INTERVAL_SEC", 600)
+    registry = BloomUserRegistry(UserRepositoryImpl(session_factory), capacity=1000)
+    
+    scheduler = await setup_user_registry_scheduler(registry)
+    try:
+        assert [job.id for job in scheduler.get_jobs()] == ["reload_user_registry"]
+    finally:
+        scheduler.shutdown(wait=False)
+
+
+async def wait_for(condition, timeout: float = 1.0) -> None:
+    """Дождаться, пока фоновая задача выполнит условие."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_registrations_reach_other_processes(session_factory, redis_client, rated_users):
+    """Тест: пользователь, созданный в другом процессе, появляется в реестре через канал Redis."""
+    registry = BloomUserRegistry(UserRepositoryImpl(session_factory), capacity=1000)
+    feed = RedisRegistrationFeed(redis_client, channel="test:registered")
+    await feed.subscribe(registry)
+    try:
+        # Подписка строит фильтр по базе
+        assert registry.get_stats()["ids"] == len(rated_users)
+        assert not registry.might_contain(5000)
+        
+        # Пользователь создается use case'ом без реестра, как в API или CLI
+        other_process = UserManagementUseCase(
+            UserServiceImpl(UserRepositoryImpl(session_factory)),
+            registration_feed=RedisRegistrationFeed(redis_client, channel="test:registered"),
+        )
+        await other_process.create_user(telegram_id=5000, username="from_api")
+        await feed.publish([5001, 5002])
+        
+        await wait_for(lambda: registry.get_stats()["ids"] == len(rated_users) + 3)
+        assert await registry.is_registered(5000)
+        assert registry.might_contain(5002)
+    finally:
+        await feed.stop()
+
+
+@pytest.mark.asyncio
+async def test_registry_feed_reloads_after_reconnect(session_factory, redis_client, rated_users):
+    """Тест: после обрыва подписки фильтр перестраивается, подхватывая пропущенные регистрации."""
+    registry = BloomUserRegistry(UserRepositoryImpl(session_factory), capacity=1000)
+    feed = RedisRegistrationFeed(redis_client, channel="test:registered")
+    feed.RETRY_DELAY = 0.01
+    await feed.subscribe(registry)
+    try:
+        # Пользователь добавлен, пока оповещение не могло дойти
+        async with session_factory() as session:
+            session.add(UserModel(telegram_id=5000, username="missed"))
+            await session.commit()
+        await redis_client.publish("test:registered", b"not-an-id")
+        
+        await wait_for(lambda: registry.might_contain(5000))
+        assert registry.get_stats()["ids"] == len(rated_users) + 1
+    finally:
+        await feed.stop()
@@ -0,0 +1,106 @@
+import os
+from contextlib import contextmanager
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.infrastructure.database.models import Base, UserModel
+from src.infrastructure.database.repositories.rating_repository_impl import RatingRepositoryImpl
+
+
+@contextmanager
+def capture_queries(engine):
+    """Собрать SQL-запросы и их параметры, отправленные через движок."""
+    queries = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        queries.append((statement, parameters))
+    
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield queries
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+async def run_rating_queries(engine, session: AsyncSession, user_id: int):
+    """Выполнить запросы топа и места в рейтинге и вернуть их SQL."""
+    repository = RatingRepositoryImpl(session)
+    with capture_queries(engine) as queries:
+        await repository.get_top_users(limit=10)
+        await repository.get_user_rank(user_id)
+    return queries
+
+
+@pytest.mark.asyncio
+async def test_sqlite_rating_queries_use_index(test_engine, test_session, rated_users):
+    """Тест: топ и место в рейтинге читаются по индексу (taps DESC, id) без сортировки."""
+    queries = await run_rating_queries(test_engine, test_session, rated_users[0].id)
+    assert len(queries) == 3
+    
+    async with test_engine.connect() as conn:
+        for statement, parameters in queries:
+            result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plan = [row[-1] for row in result]
+            
+            assert not any(step == "SCAN users" for step in plan), plan
+            assert not any("TEMP B-TREE" in step for step in plan), plan
+            assert any("USING" in step for step in plan), plan
+    
+    # Запросы топа и места идут именно по индексу рейтинга
+    async with test_engine.connect() as conn:
+        top_plan = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {queries[0][0]}", queries[0][1])
+        rank_plan = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {queries[2][0]}", queries[2][1])
+        assert any("ix_users_taps_desc_id" in row[-1] for row in top_plan)
+        assert any("ix_users_taps_desc_id" in row[-1] for row in rank_plan)
+
+
+@pytest_asyncio.fixture
+async def postgres_engine():
+    """Движок PostgreSQL для проверки планов, если задан TEST_POSTGRES_DSN."""
+    dsn = os.environ.get("TEST_POSTGRES_DSN")
+    if not dsn:
+        pytest.skip("TEST_POSTGRES_DSN is not set")
+    
+    # Отдельная схема, чтобы не трогать данные в тестовой базе
+    engine = create_async_engine(dsn, connect_args={"server_settings": {"search_path": "rating_plans"}})
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP SCHEMA IF EXISTS rating_plans CASCADE"))
+        await conn.execute(text("CREATE SCHEMA rating_plans"))
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(text(
+            "INSERT INTO users (telegram_id, username, created_at, updated_at, is_active, is_admin, taps) "
+            "SELECT i, 'player_' || i, now(), now(), true, false, (random() * 100000)::int "
+            "FROM generate_series(1, 50000) AS i"
+        ))
+        await conn.execute(text("ANALYZE users"))
+    
+    yield engine
+    
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP SCHEMA rating_plans CASCADE"))
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_postgres_rating_queries_use_index(postgres_engine):
+    """Тест: в PostgreSQL топ и место в рейтинге выполняются через index scan."""
+    session_factory = async_sessionmaker(postgres_engine, expire_on_commit=False)
+    async with session_factory() as session:
+        # Место считается для игрока из первой сотни: для игрока в хвосте рейтинга COUNT
+        # проходит почти всю таблицу, и последовательное чтение для планировщика дешевле
+        stmt = select(UserModel.id).order_by(UserModel.taps.desc(), UserModel.id).offset(100).limit(1)
+        user_id = (await session.execute(stmt)).scalar_one()
+        queries = await run_rating_queries(postgres_engine, session, user_id=user_id)
+    assert len(queries) == 3
+    
+    async with postgres_engine.connect() as conn:
+        for statement, parameters in queries:
+            result = await conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+            plan = "\n".join(row[0] for row in result)
+            
+            assert "Seq Scan" not in plan, plan
+            assert "Sort" not in plan, plan
+            assert "Index" in plan, plan
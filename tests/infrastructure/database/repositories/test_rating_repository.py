@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.infrastructure.database.models import Base, UserModel
+from src.infrastructure.database.repositories.rating_repository_impl import RatingRepositoryImpl
+
+
+@pytest.mark.asyncio
+async def test_increment_taps_many(rating_repository, rated_users, test_session):
+    """Тест пакетного увеличения нажатий."""
+    first, second = rated_users[0], rated_users[1]
+    
+    # Увеличиваем нажатия двум пользователям одним запросом
+    result = await rating_repository.increment_taps_many({first.id: 3, second.id: 7})
+    
+    # Проверяем возвращенные и сохраненные значения
+    assert result == {first.id: first.taps + 3, second.id: second.taps + 7}
+    taps = (await test_session.execute(select(UserModel.id, UserModel.taps))).all()
+    assert dict(taps)[rated_users[2].id] == rated_users[2].taps
+
+
+@pytest.mark.asyncio
+async def test_increment_taps_many_empty(rating_repository):
+    """Тест пакетного увеличения нажатий без данных."""
+    assert await rating_repository.increment_taps_many({}) == {}
+
+
+@pytest.mark.asyncio
+async def test_increment_taps_many_unknown_user(rating_repository, rated_users):
+    """Тест пакетного увеличения нажатий несуществующему пользователю."""
+    result = await rating_repository.increment_taps_many({999: 1, rated_users[0].id: 1})
+    
+    # Несуществующий пользователь просто пропускается
+    assert result == {rated_users[0].id: rated_users[0].taps + 1}
+
+
+@pytest.mark.asyncio
+async def test_increment_taps(rating_repository, rated_users):
+    """Тест атомарного увеличения нажатий."""
+    user = rated_users[0]
+    
+    updated_user = await rating_repository.increment_taps(user.id)
+    assert updated_user.id == user.id
+    assert updated_user.taps == user.taps + 1
+    
+    updated_user = await rating_repository.increment_taps(user.id, amount=10)
+    assert updated_user.taps == user.taps + 11
+
+
+@pytest.mark.asyncio
+async def test_increment_taps_not_found(rating_repository):
+    """Тест увеличения нажатий несуществующему пользователю."""
+    assert await rating_repository.increment_taps(999) is None
+
+
+@pytest_asyncio.fixture
+async def file_session_factory(tmp_path):
+    """Фабрика сессий файловой SQLite с обычным пулом: у параллельных сессий свои соединения и транзакции."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'concurrent.sqlite3'}", pool_size=10, max_overflow=0)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_increment_taps_concurrent(file_session_factory):
+    """Стресс-тест: параллельные увеличения нажатий в разных соединениях не теряются."""
+    async with file_session_factory() as session:
+        user = UserModel(telegram_id=1000, username="player", taps=0)
+        session.add(user)
+        await session.commit()
+    increments = 500
+    
+    async def tap() -> None:
+        async with file_session_factory() as session:
+            await RatingRepositoryImpl(session).increment_taps(user.id)
+    
+    await asyncio.gather(*(tap() for _ in range(increments)))
+    
+    async with file_session_factory() as session:
+        taps = (await session.execute(select(UserModel.taps).where(UserModel.id == user.id))).scalar_one()
+    assert taps == increments
+
+
+@pytest.mark.asyncio
+async def test_get_user_rank(rating_repository, rated_users):
+    """Тест получения места пользователя в рейтинге."""
+    # Нажатия: 5, 30, 10, 0, 20
+    ranks = [await rating_repository.get_user_rank(user.id) for user in rated_users]
+    
+    assert ranks == [4, 1, 3, 5, 2]
+
+
+@pytest.mark.asyncio
+async def test_get_users_around(rating_repository, rated_users):
+    """Тест получения соседей пользователя по рейтингу."""
+    # Лидер: выше него никого нет
+    around = await rating_repository.get_users_around(rated_users[1].id, radius=2)
+    assert [user.taps for user in around] == [30, 20, 10]
+    
+    # Последний: ниже него никого нет
+    around = await rating_repository.get_users_around(rated_users[3].id, radius=1)
+    assert [user.taps for user in around] == [5, 0]
+
+
+@pytest.mark.asyncio
+async def test_iter_user_taps(rating_repository, rated_users):
+    """Тест постраничного обхода нажатий пользователей."""
+    batches = [batch async for batch in rating_repository.iter_user_taps(batch_size=2)]
+    
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [entry for batch in batches for entry in batch] == [(user.id, user.taps) for user in rated_users]
+
+
+@pytest.mark.asyncio
+async def test_get_rating_page(rating_repository, rated_users, session_factory):
+    """Тест keyset-пагинации рейтинга с равными нажатиями."""
+    # Добавляем пользователя с теми же нажатиями, что и у третьего в рейтинге
+    async with session_factory() as session:
+        session.add(UserModel(telegram_id=2000, username="tied", taps=10))
+        await session.commit()
+    
+    pages = []
+    after = None
+    while page := await rating_repository.get_rating_page(limit=2, after=after):
+        pages.append(page)
+        after = (page[-1].taps, page[-1].id)
+    
+    entries = [(user.taps, user.id) for page in pages for user in page]
+    assert [len(page) for page in pages] == [2, 2, 2]
+    assert entries == sorted(entries, key=lambda entry: (-entry[0], entry[1]))
+    assert [taps for taps, _ in entries] == [30, 20, 10, 10, 5, 0]
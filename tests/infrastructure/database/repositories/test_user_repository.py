@@ -3,6 +3,7 @@ from sqlalchemy import select
 
 from src.domain.entities.user import User
 from src.infrastructure.database.models import UserModel
+from src.infrastructure.database.repositories.user_repository_impl import UserRepositoryImpl
 from tests.conftest import TEST_USER
 
 
@@ -128,4 +129,64 @@ async def test_get_user_by_telegram_id_not_found(user_repository):
     user = await user_repository.get_user_by_telegram_id(999)
     
     # Проверяем, что пользователь не найден
-    assert user is None 
\ No newline at end of file
+    assert user is None 
+
+@pytest.mark.asyncio
+async def test_iter_users_pages_by_id(session_factory):
+    """Тест: потоковый обход идет по возрастанию ID с учетом after_id, limit и active_only."""
+    async with session_factory() as session:
+        session.add_all([
+            UserModel(telegram_id=2000 + i, username=f"stream_{i}", is_active=i % 3 != 0)
+            for i in range(10)
+        ])
+        await session.commit()
+    repository = UserRepositoryImpl(session_factory)
+
+    users = [user async for user in repository.iter_users(batch_size=3)]
+    assert [user.telegram_id for user in users] == [2000 + i for i in range(10)]
+
+    page = [user async for user in repository.iter_users(after_id=users[3].id, limit=4, batch_size=2)]
+    assert [user.id for user in page] == [user.id for user in users[4:8]]
+
+    active = [user async for user in repository.iter_users(active_only=True)]
+    assert all(user.is_active for user in active)
+    assert len(active) == 6
+
+
+@pytest.mark.asyncio
+async def test_trusted_users_match_validated(session_factory, rated_users):
+    """Тест: сущности из строк без валидации равны провалидированным и ведут себя так же."""
+    repository = UserRepositoryImpl(session_factory)
+    user = await repository.get_by_telegram_id(rated_users[0].telegram_id)
+
+    assert user == rated_users[0]
+    assert user.model_dump() == rated_users[0].model_dump()
+    assert user.model_fields_set == set(User.model_fields)
+
+    # Присваивание полей и копирование работают как у обычной модели
+    user.first_name = "Renamed"
+    assert user.model_copy(update={"taps": 99}).taps == 99
+    assert user.first_name == "Renamed"
+    assert rated_users[0].first_name is None
+
+
+@pytest.mark.asyncio
+async def test_iter_active_telegram_ids_pages(session_factory):
+    """Тест: страницы пар (ID, Telegram ID) только активных пользователей, продолжение после курсора."""
+    async with session_factory() as session:
+        session.add_all([
+            UserModel(telegram_id=3000 + i, username=f"digest_{i}", is_active=i % 4 != 0)
+            for i in range(10)
+        ])
+        await session.commit()
+    repository = UserRepositoryImpl(session_factory)
+
+    pages = [page async for page in repository.iter_active_telegram_ids(batch_size=3)]
+    assert [len(page) for page in pages] == [3, 3, 1]
+    recipients = [recipient for page in pages for recipient in page]
+    assert [telegram_id for _, telegram_id in recipients] == [3000 + i for i in range(10) if i % 4 != 0]
+
+    cursor = recipients[2][0]
+    pages = repository.iter_active_telegram_ids(batch_size=3, after_id=cursor)
+    rest = [recipient async for page in pages for recipient in page]
+    assert rest == recipients[3:]
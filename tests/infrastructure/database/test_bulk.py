@@ -0,0 +1,87 @@
+import io
+import os
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.infrastructure.database import bulk
+from src.infrastructure.database.models import Base, UserModel
+
+
+@pytest.mark.asyncio
+async def test_import_reads_file_in_batches(test_engine):
+    """Тест: импорт вызывает прогресс на каждый пакет и пропускает дубликаты внутри файла."""
+    source = io.BytesIO(b"telegram_id,username,taps\n1,a,5\n2,b,\n1,a_again,7\n3,,1\n")
+    batches = []
+
+    result = await bulk.import_users(test_engine, source, fmt="csv", batch_size=2, progress=batches.append)
+
+    assert result == bulk.ImportResult(processed=4, inserted=3)
+    assert batches == [2, 2]
+    assert not source.closed
+    async with test_engine.connect() as conn:
+        query = select(UserModel.telegram_id, UserModel.username, UserModel.taps).order_by(UserModel.telegram_id)
+        rows = (await conn.execute(query)).all()
+    assert [tuple(row) for row in rows] == [(1, "a", 5), (2, "b", 0), (3, None, 1)]
+
+
+@pytest.mark.asyncio
+async def test_import_rejects_unsupported_dialect(test_engine, monkeypatch):
+    """Тест: импорт в базу без пропуска существующих telegram_id отклоняется до чтения файла."""
+    monkeypatch.setattr(test_engine.dialect, "name", "mysql")
+    source = io.BytesIO(b"telegram_id\n1\n")
+
+    with pytest.raises(ValueError, match="mysql"):
+        await bulk.import_users(test_engine, source, fmt="csv")
+    assert source.tell() == 0
+
+
+@pytest_asyncio.fixture
+async def postgres_engine():
+    """Движок PostgreSQL для проверки COPY, если задан TEST_POSTGRES_DSN."""
+    dsn = os.environ.get("TEST_POSTGRES_DSN")
+    if not dsn:
+        pytest.skip("TEST_POSTGRES_DSN is not set")
+
+    engine = create_async_engine(dsn, connect_args={"server_settings": {"search_path": "bulk_users"}})
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP SCHEMA IF EXISTS bulk_users CASCADE"))
+        await conn.execute(text("CREATE SCHEMA bulk_users"))
+        await conn.run_sync(Base.metadata.create_all)
+
+    yield engine
+
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP SCHEMA bulk_users CASCADE"))
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fmt", ["csv", "jsonl"])
+async def test_postgres_copy_round_trip(postgres_engine, fmt):
+    """Тест: выгрузка через COPY загружается обратно через COPY без потерь."""
+    async with postgres_engine.begin() as conn:
+        await conn.execute(text(
+            "INSERT INTO users (telegram_id, username, first_name, created_at, updated_at, is_active, is_admin, taps) "
+            "SELECT i, 'user_' || i, 'Имя, \"в кавычках\"', now(), now(), i % 2 = 0, false, i "
+            "FROM generate_series(1, 2500) AS i"
+        ))
+
+    output = io.BytesIO()
+    exported = await bulk.export_users(postgres_engine, output, fmt=fmt, batch_size=1000)
+    assert exported == 2500
+
+    async with postgres_engine.begin() as conn:
+        await conn.execute(text("DELETE FROM users WHERE telegram_id > 2000"))
+
+    output.seek(0)
+    result = await bulk.import_users(postgres_engine, output, fmt=fmt, batch_size=1000)
+    assert result == bulk.ImportResult(processed=2500, inserted=500)
+
+    async with postgres_engine.connect() as conn:
+        count = (await conn.execute(select(func.count()).select_from(UserModel))).scalar_one()
+        user = (await conn.execute(select(UserModel.__table__).where(UserModel.telegram_id == 2400))).one()
+    assert count == 2500
+    assert (user.first_name, user.is_active, user.taps) == ('Имя, "в кавычках"', True, 2400)
@@ -0,0 +1,146 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.infrastructure.buffers.tap_buffer import WriteBehindTapBuffer
+from src.infrastructure.database.models import Base, UserModel
+from src.infrastructure.database.repositories.rating_repository_impl import RatingRepositoryImpl
+from src.infrastructure.database.repositories.user_repository_impl import UserRepositoryImpl
+from src.infrastructure.database.routing import (
+    DatabaseRouter,
+    create_routing_session_factory,
+    database_actor,
+    use_primary,
+)
+
+
+@pytest_asyncio.fixture
+async def primary_and_replica(tmp_path):
+    """Два файла SQLite вместо основной базы и реплики.
+    
+    В обеих одни и те же пользователи, но на реплике нажатия отстают: так видно,
+    из какой базы пришел ответ.
+    """
+    engines = []
+    for name, taps in (("primary", 100), ("replica", 1)):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}.sqlite3")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(
+                UserModel.__table__.insert(),
+                [{"telegram_id": 1000 + i, "username": f"player_{i}", "taps": taps} for i in range(3)],
+            )
+        engines.append(engine)
+    
+    yield engines
+    
+    for engine in engines:
+        await engine.dispose()
+
+
+@pytest.fixture
+def routed_session_factory(primary_and_replica):
+    """Фабрика сессий с маршрутизацией и окном read-your-writes 0.2 с."""
+    primary, replica = primary_and_replica
+    return create_routing_session_factory(DatabaseRouter(primary, [replica], read_your_writes=0.2))
+
+
+async def read_taps(engine, user_id: int) -> int:
+    async with engine.connect() as conn:
+        return (await conn.execute(select(UserModel.taps).where(UserModel.id == user_id))).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_read_only_methods_go_to_replica(routed_session_factory):
+    """Тест: чтения рейтинга и списков пользователей идут на реплику."""
+    async with routed_session_factory() as session:
+        repository = RatingRepositoryImpl(session)
+        assert [user.taps for user in await repository.get_top_users(limit=3)] == [1, 1, 1]
+        assert await repository.get_total_taps() == 3
+        batches = [batch async for batch in repository.iter_user_taps(batch_size=2)]
+        assert [taps for batch in batches for _, taps in batch] == [1, 1, 1]
+    
+    users = await UserRepositoryImpl(routed_session_factory).list_all()
+    assert [user.taps for user in users] == [1, 1, 1]
+
+
+@pytest.mark.asyncio
+async def test_writes_go_to_primary(routed_session_factory, primary_and_replica):
+    """Тест: запись идет в основную базу, и сессия после записи читает только из нее."""
+    primary, replica = primary_and_replica
+    async with routed_session_factory() as session:
+        repository = RatingRepositoryImpl(session)
+        user = await repository.increment_taps(1, amount=5)
+        assert user.taps == 105
+        
+        # Та же сессия после записи не уходит на отстающую реплику
+        assert await repository.get_total_taps() == 305
+    
+    assert await read_taps(primary, 1) == 105
+    assert await read_taps(replica, 1) == 1
+
+
+@pytest.mark.asyncio
+async def test_read_your_writes_window(routed_session_factory):
+    """Тест: после записи пользователь читает из основной базы, пока не закроется окно."""
+    with database_actor(1000):
+        async with routed_session_factory() as session:
+            await RatingRepositoryImpl(session).increment_taps(1)
+        
+        async with routed_session_factory() as session:
+            assert await RatingRepositoryImpl(session).get_total_taps() == 301
+    
+    # Другой пользователь в это время читает с реплики
+    with database_actor(1001):
+        async with routed_session_factory() as session:
+            assert await RatingRepositoryImpl(session).get_total_taps() == 3
+    
+    # После окна чтения пользователя снова идут на реплику
+    await asyncio.sleep(0.25)
+    with database_actor(1000):
+        async with routed_session_factory() as session:
+            assert await RatingRepositoryImpl(session).get_total_taps() == 3
+
+
+@pytest.mark.asyncio
+async def test_tap_buffer_flush_opens_read_your_writes_window(routed_session_factory):
+    """Тест: после фонового сброса буфера нажатий пользователь читает из основной базы."""
+    tap_buffer = WriteBehindTapBuffer(routed_session_factory)
+    with database_actor(1000):
+        tap_buffer.add(1, amount=5)
+    
+    # Сброс идет из фоновой задачи, не от имени пользователя
+    assert await tap_buffer.flush() == 5
+    
+    with database_actor(1000):
+        async with routed_session_factory() as session:
+            assert await RatingRepositoryImpl(session).get_total_taps() == 305
+    with database_actor(1001):
+        async with routed_session_factory() as session:
+            assert await RatingRepositoryImpl(session).get_total_taps() == 3
+
+
+@pytest.mark.asyncio
+async def test_use_primary_overrides_read_only(routed_session_factory):
+    """Тест: внутри use_primary даже чтения read_only идут в основную базу."""
+    async with routed_session_factory() as session:
+        repository = RatingRepositoryImpl(session)
+        with use_primary():
+            batches = [batch async for batch in repository.iter_user_taps(batch_size=2)]
+        assert [taps for batch in batches for _, taps in batch] == [100, 100, 100]
+    
+    async with routed_session_factory() as session:
+        assert await RatingRepositoryImpl(session).get_total_taps() == 3
+
+
+@pytest.mark.asyncio
+async def test_unmarked_methods_go_to_primary(routed_session_factory):
+    """Тест: методы без пометки read_only читают из основной базы."""
+    async with routed_session_factory() as session:
+        user = await RatingRepositoryImpl(session).update_user_info(1, "about")
+    
+    assert user.taps == 100
+    assert user.info == "about"
@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+import pytest
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.exceptions import TelegramRetryAfter
+
+from src.infrastructure.broadcast.rate_limit import ChatPacer
+from src.infrastructure.telegram.outbound import BROADCAST, OutboundScheduler, outbound_lane
+
+
+class FakeSession(BaseSession):
+    """Сессия без сети: запоминает запросы и отвечает заданными ошибками."""
+
+    def __init__(self, errors=None):
+        super().__init__()
+        self.requests = []
+        self._errors = errors or {}
+
+    async def make_request(self, bot, method, timeout=None):
+        chat_id = getattr(method, "chat_id", None)
+        errors = self._errors.get(chat_id)
+        if errors:
+            raise errors.pop(0)(method)
+        self.requests.append((method.__api_method__, chat_id, time.monotonic()))
+        return True
+
+    async def stream_content(self, *args, **kwargs):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+def create_bot(outbound: OutboundScheduler, errors=None) -> Bot:
+    bot = Bot(token="42:TEST", session=FakeSession(errors))
+    bot.session.middleware(outbound)
+    return bot
+
+
+def retry_after(seconds: int):
+    return lambda method: TelegramRetryAfter(method, "Flood control exceeded", retry_after=seconds)
+
+
+@pytest.mark.asyncio
+async def test_interactive_requests_overtake_broadcast():
+    """Тест: ответ пользователю уходит раньше рассылки, уже стоящей в очереди."""
+    outbound = OutboundScheduler(rate=20, chat_interval=0)
+    bot = create_bot(outbound)
+    
+    with outbound_lane(BROADCAST):
+        broadcast = [asyncio.create_task(bot.send_message(100 + i, "digest")) for i in range(6)]
+    await asyncio.sleep(0.01)
+    assert outbound.get_stats()["broadcast_queued"] == 5
+    
+    await bot.send_message(1, "reply")
+    await asyncio.gather(*broadcast)
+    
+    order = [chat_id for _, chat_id, _ in bot.session.requests]
+    # Первое сообщение рассылки ушло сразу, следующим — ответ пользователю
+    assert order[:2] == [100, 1]
+    stats = outbound.get_stats()
+    assert (stats["interactive_requests"], stats["broadcast_requests"]) == (1, 6)
+    assert stats["interactive_wait_max_ms"] < stats["broadcast_wait_max_ms"]
+    assert stats["broadcast_queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_retry_after_pauses_every_lane():
+    """Тест: retry_after на рассылке задерживает и ответы пользователям, но не запросы без чата."""
+    outbound = OutboundScheduler(rate=100, chat_interval=0)
+    bot = create_bot(outbound, errors={100: [retry_after(1)]})
+    
+    with outbound_lane(BROADCAST), pytest.raises(TelegramRetryAfter):
+        await bot.send_message(100, "digest")
+    
+    started = time.monotonic()
+    await bot.get_me()
+    assert time.monotonic() - started < 0.1
+    
+    await bot.send_message(1, "reply")
+    assert time.monotonic() - started >= 0.9
+    assert outbound.get_stats()["retry_after"] == 1
+
+
+@pytest.mark.asyncio
+async def test_chat_pacer_allows_burst_then_paces():
+    """Тест: в один чат уходит burst сообщений подряд, затем по одному за интервал."""
+    pacer = ChatPacer(interval=0.1, burst=3)
+    
+    started = time.monotonic()
+    for _ in range(3):
+        await pacer.wait(1)
+    assert time.monotonic() - started < 0.05
+    
+    # Другой чат не ждет
+    await pacer.wait(2)
+    assert time.monotonic() - started < 0.05
+    
+    await pacer.wait(1)
+    await pacer.wait(1)
+    assert time.monotonic() - started >= 0.19
@@ -0,0 +1,98 @@
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+
+from src.infrastructure.cache.leaderboard import RedisLeaderboard
+from src.infrastructure.database.session import get_session
+from src.interfaces.api.dependencies import get_leaderboard
+from src.interfaces.api.main import create_app
+from src.interfaces.api.pagination import encode_cursor
+
+
+@pytest_asyncio.fixture
+async def rating_client(session_factory):
+    """Асинхронный клиент API, работающий с тестовой базой."""
+    async def override_get_session():
+        async with session_factory() as session:
+            yield session
+    
+    app = create_app()
+    app.dependency_overrides[get_session] = override_get_session
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_rating_pages(rating_client, rated_users):
+    """Тест постраничного обхода рейтинга по курсору."""
+    taps = []
+    params = {"limit": 2}
+    while True:
+        response = await rating_client.get("/api/v1/rating/", params=params)
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["items"]) <= 2
+        taps.extend(item["taps"] for item in data["items"])
+        if data["next_cursor"] is None:
+            break
+        params["cursor"] = data["next_cursor"]
+    
+    assert taps == [30, 20, 10, 5, 0]
+
+
+@pytest.mark.asyncio
+async def test_rating_invalid_cursor(rating_client, rated_users):
+    """Тест некорректного курсора."""
+    response = await rating_client.get("/api/v1/rating/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    
+    # Курсор страницы пользователей содержит только ID, без количества нажатий
+    response = await rating_client.get("/api/v1/rating/", params={"cursor": encode_cursor(1)})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_rating_total(rating_client, rated_users):
+    """Тест получения общего количества нажатий."""
+    response = await rating_client.get("/api/v1/rating/total")
+    assert response.status_code == 200
+    assert response.json() == {"total_taps": 65}
+
+
+@pytest.mark.asyncio
+async def test_rating_rank(rating_client, rated_users):
+    """Тест получения места пользователя по Telegram ID."""
+    user = rated_users[4]
+    response = await rating_client.get(f"/api/v1/rating/rank/{user.telegram_id}")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["id"] == user.id
+    assert data["taps"] == 20
+    assert data["rank"] == 2
+    
+    response = await rating_client.get("/api/v1/rating/rank/999999")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_rating_total_and_rank_from_leaderboard(session_factory, redis_client, rated_users):
+    """Тест: с включенным рейтингом в Redis общее количество и место читаются из него."""
+    leaderboard = RedisLeaderboard(redis_client, key="test:leaderboard")
+    await leaderboard.set_scores({user.id: user.taps for user in rated_users})
+    # Счетчик в Redis намеренно расходится с базой, чтобы было видно, откуда взят ответ
+    await leaderboard.init_total(1000)
+    await leaderboard.set_scores({rated_users[3].id: 100})
+    
+    async def override_get_session():
+        async with session_factory() as session:
+            yield session
+    
+    app = create_app()
+    app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_leaderboard] = lambda: leaderboard
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        total = (await client.get("/api/v1/rating/total")).json()
+        rank = (await client.get(f"/api/v1/rating/rank/{rated_users[3].telegram_id}")).json()
+    
+    assert total == {"total_taps": 1000}
+    assert rank["rank"] == 1
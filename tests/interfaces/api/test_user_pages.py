@@ -0,0 +1,146 @@
+import json
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+
+from src.application.use_cases.user_management import UserManagementUseCase
+from src.infrastructure.cache.leaderboard import RedisLeaderboard
+from src.infrastructure.database.models import UserModel
+from src.infrastructure.database.repositories.user_repository_impl import UserRepositoryImpl
+from src.infrastructure.database.session import create_session_factory
+from src.infrastructure.services.user_service_impl import UserServiceImpl
+from src.interfaces.api.dependencies import get_leaderboard
+from src.interfaces.api.main import create_app
+from src.interfaces.api.schemas import UserResponse
+
+
+@pytest_asyncio.fixture
+async def users_client(session_factory):
+    """Асинхронный клиент API, работающий с тестовой базой."""
+    app = create_app()
+    app.dependency_overrides[create_session_factory] = lambda: session_factory
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest_asyncio.fixture
+async def many_users(session_factory) -> int:
+    """Создание пользователей, каждый третий из которых неактивен."""
+    async with session_factory() as session:
+        session.add_all([
+            UserModel(telegram_id=5000 + i, username=f"user_{i}", is_active=i % 3 != 0)
+            for i in range(25)
+        ])
+        await session.commit()
+    return 25
+
+
+@pytest.mark.asyncio
+async def test_users_pages(users_client, many_users):
+    """Тест постраничного обхода пользователей по курсору."""
+    ids = []
+    params = {"limit": 10}
+    while True:
+        response = await users_client.get("/api/v1/users/", params=params)
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["items"]) <= 10
+        ids.extend(item["id"] for item in data["items"])
+        if data["next_cursor"] is None:
+            break
+        params["cursor"] = data["next_cursor"]
+
+    assert ids == list(range(1, many_users + 1))
+
+    response = await users_client.get("/api/v1/users/active", params={"limit": 500})
+    items = response.json()["items"]
+    assert len(items) == 16
+    assert all(item["is_active"] for item in items)
+
+
+@pytest.mark.asyncio
+async def test_users_invalid_cursor(users_client, many_users):
+    """Тест некорректного курсора и размера страницы."""
+    assert (await users_client.get("/api/v1/users/", params={"cursor": "not-a-cursor"})).status_code == 400
+    assert (await users_client.get("/api/v1/users/", params={"limit": 501})).status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_users_export_streams_ndjson(users_client, many_users):
+    """Тест потоковой выгрузки NDJSON со сжатием gzip."""
+    response = await users_client.get("/api/v1/users/export", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-encoding"] == "gzip"
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["telegram_id"] for record in records] == [5000 + i for i in range(many_users)]
+
+    async with users_client.stream(
+        "GET",
+        "/api/v1/users/export",
+        params={"active": True, "limit": 5},
+        headers={"Accept-Encoding": "identity"},
+    ) as response:
+        raw = await response.aread()
+    assert "content-encoding" not in response.headers
+    records = [json.loads(line) for line in raw.splitlines()]
+    assert len(records) == 5
+    assert all(record["is_active"] for record in records)
+
+    # Продолжение выгрузки после последнего полученного пользователя
+    cursor = (await users_client.get("/api/v1/users/", params={"limit": 20})).json()["next_cursor"]
+    response = await users_client.get("/api/v1/users/export", params={"cursor": cursor})
+    assert len(response.text.splitlines()) == many_users - 20
+
+
+@pytest.mark.asyncio
+async def test_user_responses_match_schema(users_client, many_users):
+    """Тест: ответы, собранные без response_model, совпадают по полям с UserResponse."""
+    response = await users_client.post("/api/v1/users/", json={"telegram_id": 42, "username": "fast"})
+    assert response.status_code == 201
+    created = response.json()
+    assert set(created) == set(UserResponse.model_fields)
+    UserResponse.model_validate(created)
+
+    response = await users_client.put(f"/api/v1/users/{created['id']}", json={"first_name": "Fast"})
+    assert response.json()["first_name"] == "Fast"
+
+    response = await users_client.get(f"/api/v1/users/{created['id']}")
+    assert response.json()["username"] == "fast"
+
+    page = (await users_client.get("/api/v1/users/", params={"limit": 1})).json()
+    assert set(page["items"][0]) == set(UserResponse.model_fields)
+    assert UserResponse.model_validate(page["items"][0]).telegram_id == 5000
+
+
+@pytest.mark.asyncio
+async def test_rows_page_without_id_column(session_factory, many_users):
+    """Тест курсора страницы, когда колонка id не запрошена."""
+    user_management = UserManagementUseCase(UserServiceImpl(UserRepositoryImpl(session_factory)))
+    
+    rows, next_id = await user_management.get_user_rows_page(10, columns=["telegram_id"])
+    assert rows == [{"telegram_id": 5000 + i} for i in range(10)]
+    assert next_id == 10
+    
+    rows, next_id = await user_management.get_user_rows_page(20, next_id, columns=["telegram_id"])
+    assert rows == [{"telegram_id": 5000 + i} for i in range(10, many_users)]
+    assert next_id is None
+
+
+@pytest.mark.asyncio
+async def test_delete_user_removes_from_leaderboard(session_factory, redis_client, rated_users):
+    """Тест: удаленный через API пользователь пропадает из рейтинга в Redis."""
+    leaderboard = RedisLeaderboard(redis_client, key="test:leaderboard")
+    await leaderboard.set_scores({user.id: user.taps for user in rated_users})
+    removed = rated_users[1]
+    
+    app = create_app()
+    app.dependency_overrides[create_session_factory] = lambda: session_factory
+    app.dependency_overrides[get_leaderboard] = lambda: leaderboard
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.delete(f"/api/v1/users/{removed.id}")
+    
+    assert response.status_code == 204
+    assert await leaderboard.rank(removed.id) is None
+    assert len(await leaderboard.top(10)) == len(rated_users) - 1
@@ -26,7 +26,7 @@ async def test_list_users(async_client, test_user):
     """Тест получения списка пользователей."""
     response = await async_client.get("/api/v1/users/")
     assert response.status_code == 200
-    data = response.json()
+    data = response.json()["items"]
     assert len(data) > 0
     assert any(user["id"] == test_user.id for user in data)
 
@@ -36,7 +36,7 @@ async def test_list_active_users(async_client, test_user):
     """Тест получения списка активных пользователей."""
     response = await async_client.get("/api/v1/users/active")
     assert response.status_code == 200
-    data = response.json()
+    data = response.json()["items"]
     assert len(data) > 0
     assert any(user["id"] == test_user.id for user in data)
     assert all(user["is_active"] for user in data)
@@ -0,0 +1,180 @@
+import asyncio
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.base import BaseSession
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.methods import GetFile, TelegramMethod
+from aiogram.types import File, Update
+from sqlalchemy import event
+
+from src.infrastructure.cache.user_registry import BloomUserRegistry, RedisRegistrationFeed
+from src.infrastructure.database.models import UserModel
+from src.infrastructure.database.repositories.user_repository_impl import UserRepositoryImpl
+from src.interfaces.bot.dependencies import setup_dependencies
+from src.interfaces.bot.handlers import register_handlers
+from src.interfaces.bot.states import UserStates
+
+BOT_ID = 42
+
+
+class RecordingSession(BaseSession):
+    """Сессия бота без сети: запоминает вызванные методы Bot API."""
+    
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+    
+    async def make_request(self, bot, method, timeout=None):
+        self.requests.append(method)
+        if isinstance(method, GetFile):
+            return File(file_id=method.file_id, file_unique_id="unique", file_path="photos/1.jpg")
+        return True
+    
+    async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True):
+        yield b""
+    
+    async def close(self):
+        pass
+
+
+@contextmanager
+def count_user_lookups(engine):
+    """Посчитать запросы пользователя по Telegram ID."""
+    lookups = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "users.telegram_id =" in statement:
+            lookups.append(statement)
+    
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield lookups
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def make_update(update_id: int, telegram_id: int, text: str = None, photo: bool = False) -> dict:
+    """Собрать апдейт с сообщением от пользователя."""
+    message = {
+        "message_id": update_id,
+        "date": int(datetime.now().timestamp()),
+        "chat": {"id": telegram_id, "type": "private"},
+        "from": {"id": telegram_id, "is_bot": False, "first_name": "Player"},
+    }
+    if text is not None:
+        message["text"] = text
+    if photo:
+        message["photo"] = [{"file_id": "photo", "file_unique_id": "photo", "width": 1, "height": 1}]
+    return {"update_id": update_id, "message": message}
+
+
+async def process_update(dp: Dispatcher, bot: Bot, update: Update) -> None:
+    """Обработать апдейт, как при polling: метод, который вернул обработчик, отправляется ботом."""
+    response = await dp.feed_update(bot, update)
+    if isinstance(response, TelegramMethod):
+        await bot(response)
+
+
+@pytest_asyncio.fixture
+async def bot_dispatcher(session_factory):
+    """Диспетчер бота со всеми обработчиками поверх тестовой базы."""
+    dp = Dispatcher(storage=MemoryStorage())
+    setup_dependencies(dp, session_factory)
+    register_handlers(dp)
+    bot = Bot(token=f"{BOT_ID}:TEST", session=RecordingSession())
+    return dp, bot
+
+
+# Апдейты, которые доходят до каждого зарегистрированного обработчика:
+# (текст, состояние, фото, фрагмент ответа обработчика)
+HANDLER_UPDATES = {
+    "start_handler": ("/start", None, False, "Добро пожаловать"),
+    "help_handler": ("/help", None, False, "Доступные команды"),
+    "profile_handler": ("/profile", None, False, "Ваш профиль"),
+    "settings_handler": ("/settings", None, False, "Введите ваше имя"),
+    "registration_handler": ("/register", None, False, "Давайте зарегистрируем вас"),
+    "set_user_info_handler": ("Имя", UserStates.waiting_for_name, False, "Введите ваше имя"),
+    "set_photo_handler": (None, UserStates.waiting_for_photo, True, "Профиль успешно обновлен"),
+    "cancel_handler": ("Отмена", None, False, "Операция отменена"),
+    "rating_handler": ("Рейтинг", None, False, "Ваше место: 4"),
+    "press_handler": ("Нажать", None, False, "Нажатий: 6"),
+    "settings_button_handler": ("Настройки", None, False, "Введите ваше имя"),
+}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("handler_name", list(HANDLER_UPDATES))
+async def test_one_user_lookup_per_update(bot_dispatcher, test_engine, rated_users, handler_name):
+    """Тест: на каждый апдейт пользователь загружается из базы ровно один раз."""
+    dp, bot = bot_dispatcher
+    user = rated_users[0]
+    text, state, photo, reply = HANDLER_UPDATES[handler_name]
+    
+    if state is not None:
+        key = StorageKey(bot_id=BOT_ID, chat_id=user.telegram_id, user_id=user.telegram_id)
+        await dp.storage.set_state(key, state)
+        await dp.storage.set_data(key, {"name": "Player", "info": "about"})
+    
+    update = Update.model_validate(make_update(1, user.telegram_id, text, photo), context={"bot": bot})
+    with count_user_lookups(test_engine) as lookups:
+        await process_update(dp, bot, update)
+    
+    # Обработчик отработал и ответил пользователю
+    assert reply in bot.session.requests[-1].text
+    assert len(lookups) == 1
+
+
+@pytest.mark.asyncio
+async def test_unregistered_user_skips_lookup_with_registry(session_factory, test_engine, rated_users):
+    """Тест: с реестром пользователей незарегистрированный отсеивается без запросов в базу."""
+    registry = BloomUserRegistry(UserRepositoryImpl(session_factory), capacity=1000)
+    await registry.load()
+    
+    dp = Dispatcher(storage=MemoryStorage())
+    setup_dependencies(dp, session_factory, user_registry=registry)
+    register_handlers(dp)
+    bot = Bot(token=f"{BOT_ID}:TEST", session=RecordingSession())
+    
+    with count_user_lookups(test_engine) as lookups:
+        for update_id in (1, 2):
+            update = Update.model_validate(make_update(update_id, 999999, "Рейтинг"), context={"bot": bot})
+            await process_update(dp, bot, update)
+    
+    # UserFilter не пропустил апдейты, а в базу не ходил ни один
+    assert lookups == []
+    assert bot.session.requests == []
+
+
+@pytest.mark.asyncio
+async def test_user_created_after_registry_load_is_found(session_factory, redis_client, rated_users):
+    """Тест: пользователь, созданный в другом процессе после построения реестра, узнается по оповещению."""
+    registry = BloomUserRegistry(UserRepositoryImpl(session_factory), capacity=1000)
+    feed = RedisRegistrationFeed(redis_client, channel="test:registered")
+    await feed.subscribe(registry)
+    
+    dp = Dispatcher(storage=MemoryStorage())
+    setup_dependencies(dp, session_factory, user_registry=registry)
+    register_handlers(dp)
+    bot = Bot(token=f"{BOT_ID}:TEST", session=RecordingSession())
+    
+    try:
+        async with session_factory() as session:
+            session.add(UserModel(telegram_id=999999, username="imported", taps=3))
+            await session.commit()
+        await feed.publish([999999])
+        for _ in range(100):
+            if registry.might_contain(999999):
+                break
+            await asyncio.sleep(0.01)
+        
+        update = Update.model_validate(make_update(1, 999999, "Нажать"), context={"bot": bot})
+        await process_update(dp, bot, update)
+    finally:
+        await feed.stop()
+    
+    assert "Нажатий: 4" in bot.session.requests[-1].text
@@ -0,0 +1,93 @@
+import pytest
+import pytest_asyncio
+from aiogram import Bot, Dispatcher
+from aiohttp import MultipartReader
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.interfaces.bot.handlers import register_handlers
+from src.interfaces.bot.webhook import create_webhook_app
+
+SECRET = "test-secret"
+
+# Обновление в том виде, в каком его присылает Telegram
+HELP_UPDATE = {
+    "update_id": 100000001,
+    "message": {
+        "message_id": 42,
+        "date": 1700000000,
+        "chat": {"id": 123456789, "type": "private", "first_name": "Test", "username": "test_user"},
+        "from": {
+            "id": 123456789,
+            "is_bot": False,
+            "first_name": "Test",
+            "username": "test_user",
+            "language_code": "ru",
+        },
+        "text": "/help",
+        "entities": [{"type": "bot_command", "offset": 0, "length": 5}],
+    },
+}
+
+
+@pytest_asyncio.fixture
+async def webhook_client():
+    """Локальный webhook-сервер с обработчиками бота."""
+    dp = Dispatcher()
+    register_handlers(dp)
+    bot = Bot(token="42:TEST")
+    
+    client = TestClient(TestServer(create_webhook_app(dp, bot, "/webhook", SECRET)))
+    await client.start_server()
+    
+    yield client, dp
+    
+    await client.close()
+    await bot.session.close()
+
+
+async def read_form(response) -> dict:
+    """Разобрать multipart-ответ webhook в словарь полей метода."""
+    reader = MultipartReader.from_response(response)
+    form = {}
+    while (part := await reader.next()) is not None:
+        form[part.name] = await part.text()
+    return form
+
+
+@pytest.mark.asyncio
+async def test_reply_is_returned_in_webhook_response(webhook_client):
+    """Тест: ответ простого обработчика приходит в теле ответа на webhook."""
+    client, _ = webhook_client
+    
+    response = await client.post("/webhook", json=HELP_UPDATE, headers={"X-Telegram-Bot-Api-Secret-Token": SECRET})
+    
+    assert response.status == 200
+    form = await read_form(response)
+    assert form["method"] == "sendMessage"
+    assert form["chat_id"] == "123456789"
+    assert form["text"].startswith("Доступные команды:")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("headers", [{}, {"X-Telegram-Bot-Api-Secret-Token": "wrong"}])
+async def test_webhook_rejects_requests_without_secret(webhook_client, headers):
+    """Тест: запрос без правильного секретного токена отклоняется и не обрабатывается."""
+    client, _ = webhook_client
+    
+    response = await client.post("/webhook", json=HELP_UPDATE, headers=headers)
+    
+    assert response.status == 401
+
+
+@pytest.mark.asyncio
+async def test_unhandled_update_gets_empty_response(webhook_client):
+    """Тест: обновление без подходящего обработчика подтверждается пустым ответом."""
+    client, dp = webhook_client
+    update = {**HELP_UPDATE, "message": {**HELP_UPDATE["message"], "text": "/unknown", "entities": []}}
+    
+    response = await client.post("/webhook", json=update, headers={"X-Telegram-Bot-Api-Secret-Token": SECRET})
+    
+    assert response.status == 200
+    assert await read_form(response) == {}
+    # Telegram присылает только типы обновлений, для которых зарегистрированы обработчики
+    assert dp.resolve_used_update_types() == ["message"]
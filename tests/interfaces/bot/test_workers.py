@@ -0,0 +1,182 @@
+import asyncio
+import multiprocessing
+import random
+
+import pytest
+from aiogram.client.telegram import TelegramAPIServer
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.interfaces.bot.workers import OrderedUpdateProcessor, WorkerPool, poll_updates, serve_queue, update_key
+
+
+def make_update(update_id: int, user_id: int) -> dict:
+    """Собрать апдейт с текстовым сообщением от пользователя."""
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 1700000000,
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "Player"},
+            "text": "Нажать",
+        },
+    }
+
+
+def test_update_key():
+    """Тест: ключ — отправитель, а для событий без отправителя — чат или сам апдейт."""
+    assert update_key(make_update(1, 555)) == 555
+    assert update_key({"update_id": 2, "callback_query": {"id": "q", "from": {"id": 7}, "chat_instance": "c"}}) == 7
+    channel_post = {"message_id": 1, "date": 0, "chat": {"id": -100, "type": "channel"}}
+    assert update_key({"update_id": 3, "channel_post": channel_post}) == -100
+    assert update_key({"update_id": 4, "poll": {"id": "p", "question": "?", "options": []}}) == 4
+
+
+@pytest.mark.asyncio
+async def test_processor_keeps_order_per_key():
+    """Тест: апдейты одного ключа обрабатываются по порядку, разных ключей — параллельно."""
+    handled = []
+    active = 0
+    max_active = 0
+    
+    async def handle(update):
+        nonlocal active, max_active
+        active += 1
+        max_active = max(max_active, active)
+        await asyncio.sleep(random.uniform(0, 0.005))
+        handled.append((update["message"]["from"]["id"], update["update_id"]))
+        active -= 1
+    
+    processor = OrderedUpdateProcessor(handle, max_in_flight=8)
+    for update_id in range(200):
+        user_id = update_id % 5
+        await processor.submit(user_id, make_update(update_id, user_id))
+    await processor.join()
+    
+    assert len(handled) == 200
+    for user_id in range(5):
+        user_updates = [update_id for handled_user, update_id in handled if handled_user == user_id]
+        assert user_updates == sorted(user_updates)
+    assert 1 < max_active <= 5
+
+
+@pytest.mark.asyncio
+async def test_processor_busy_key_does_not_block_others():
+    """Тест: очередь одного пользователя занимает одно место и не задерживает других."""
+    finished = {}
+    loop = asyncio.get_running_loop()
+    
+    async def handle(update):
+        await asyncio.sleep(0.1)
+        finished[update["update_id"]] = loop.time()
+    
+    processor = OrderedUpdateProcessor(handle, max_in_flight=10)
+    started = loop.time()
+    for update_id in range(20):
+        await processor.submit(1, make_update(update_id, 1))
+    await processor.submit(2, make_update(100, 2))
+    await processor.join()
+    
+    assert finished[100] - started < 0.3
+    assert finished[19] - started >= 2.0
+
+
+@pytest.mark.asyncio
+async def test_processor_waits_when_key_queue_is_full():
+    """Тест: при заполненной очереди ключа submit ждет места, и ни одно обновление не теряется."""
+    handled = []
+    gate = asyncio.Event()
+    
+    async def handle(update):
+        await gate.wait()
+        handled.append(update["update_id"])
+    
+    processor = OrderedUpdateProcessor(handle, max_in_flight=10, max_pending_per_key=5)
+    
+    async def submit_all():
+        for update_id in range(8):
+            await processor.submit(1, make_update(update_id, 1))
+    
+    submitting = asyncio.create_task(submit_all())
+    await asyncio.sleep(0.05)
+    # Шестое встало в очередь, когда первое ушло в обработку; седьмое ждет места
+    assert not submitting.done()
+    assert processor.throttled == 2
+    assert handled == []
+    
+    gate.set()
+    await submitting
+    await processor.join()
+    
+    assert handled == list(range(8))
+
+
+async def _record(results, index, update):
+    results.put((index, update["message"]["from"]["id"], update["update_id"]))
+
+
+def recording_worker(index, workers, updates, results):
+    """Процесс-обработчик для теста: записывает, какой процесс и в каком порядке обработал апдейт."""
+    asyncio.run(serve_queue(updates, lambda update: _record(results, index, update)))
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_routes_user_to_one_process():
+    """Тест: в нескольких процессах все апдейты пользователя попадают в один процесс и идут по порядку."""
+    results = multiprocessing.get_context("spawn").Queue()
+    pool = WorkerPool(2, recording_worker, args=(results,))
+    pool.start()
+    try:
+        for update_id in range(300):
+            await pool.dispatch(make_update(update_id, 1000 + update_id % 7))
+    finally:
+        await asyncio.to_thread(pool.stop)
+    
+    records = [results.get(timeout=10) for _ in range(300)]
+    workers_by_user = {}
+    for index, user_id, _ in records:
+        workers_by_user.setdefault(user_id, set()).add(index)
+    assert all(len(indexes) == 1 for indexes in workers_by_user.values())
+    assert {index for indexes in workers_by_user.values() for index in indexes} == {0, 1}
+    for user_id in workers_by_user:
+        user_updates = [update_id for _, record_user, update_id in records if record_user == user_id]
+        assert user_updates == sorted(user_updates)
+
+
+class StopAfterUpdates:
+    """Участник выборов для теста: теряет лидерство, когда обработчикам переданы все апдейты."""
+    
+    def __init__(self, count: int):
+        self.updates = []
+        self.count = count
+    
+    @property
+    def is_leader(self) -> bool:
+        return len(self.updates) < self.count
+    
+    async def dispatch(self, update):
+        self.updates.append(update)
+
+
+@pytest.mark.asyncio
+async def test_poll_updates_retries_non_json_response():
+    """Тест: страница ошибки вместо JSON не останавливает прием, getUpdates повторяется."""
+    responses = [
+        web.Response(status=502, text="<html>Bad Gateway</html>", content_type="text/html"),
+        web.json_response({"ok": True, "result": [make_update(1, 555), make_update(2, 555)]}),
+    ]
+    
+    async def handle(request):
+        if request.path.endswith("/getUpdates"):
+            return responses.pop(0)
+        return web.json_response({"ok": True, "result": True})
+    
+    app = web.Application()
+    app.router.add_post("/{path:.*}", handle)
+    async with TestServer(app) as server:
+        api = TelegramAPIServer.from_base(str(server.make_url("")).rstrip("/"))
+        stopper = StopAfterUpdates(2)
+        await asyncio.wait_for(poll_updates(stopper, "42:TEST", ["message"], stopper, api=api), timeout=10)
+    
+    assert [update["update_id"] for update in stopper.updates] == [1, 2]
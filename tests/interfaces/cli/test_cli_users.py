@@ -0,0 +1,139 @@
+import csv
+import json
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from typer.testing import CliRunner
+
+from src.config import settings
+from src.infrastructure.database import session as database_session
+from src.infrastructure.database.models import Base, UserModel
+from src.interfaces.cli.commands import users as users_commands
+from src.interfaces.cli.main import app
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """Файловая SQLite вместо PostgreSQL из настроек; возвращает синхронный движок для проверок."""
+    path = tmp_path / "cli.sqlite3"
+    monkeypatch.setattr(database_session, "get_database_url", lambda: f"sqlite+aiosqlite:///{path}")
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def seed(engine, count: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(
+            UserModel.__table__.insert(),
+            [
+                {"telegram_id": 1000 + i, "username": f"user_{i}", "first_name": "Имя, с запятой", "taps": i}
+                for i in range(count)
+            ],
+        )
+
+
+def count_users(engine) -> int:
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(UserModel)).scalar_one()
+
+
+@pytest.mark.parametrize("suffix", ["csv", "jsonl"])
+def test_export_import_round_trip(database, tmp_path, suffix):
+    """Тест: выгрузка и загрузка обратно переносят всех пользователей пакетами."""
+    seed(database, 25)
+    path = tmp_path / f"users.{suffix}"
+
+    result = runner.invoke(app, ["users", "export", str(path), "--batch-size", "10"])
+    assert result.exit_code == 0, result.output
+    assert "Выгружено пользователей: 25" in result.output
+
+    if suffix == "csv":
+        with path.open(newline="", encoding="utf-8") as file:
+            records = list(csv.DictReader(file))
+    else:
+        records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert len(records) == 25
+    assert records[3]["first_name"] == "Имя, с запятой"
+    assert int(records[3]["taps"]) == 3
+
+    with database.begin() as conn:
+        conn.execute(UserModel.__table__.delete().where(UserModel.taps >= 20))
+
+    result = runner.invoke(app, ["users", "import", str(path), "--batch-size", "7"])
+    assert result.exit_code == 0, result.output
+    # Существующие пользователи пропускаются по telegram_id
+    assert "Обработано 25, добавлено 5, пропущено существующих 20" in result.output
+    assert count_users(database) == 25
+
+    with database.connect() as conn:
+        taps = conn.execute(select(UserModel.taps).where(UserModel.telegram_id == 1024)).scalar_one()
+    assert taps == 24
+
+
+def test_import_adds_users_to_leaderboard(database, tmp_path, monkeypatch):
+    """Тест: импорт вносит добавленных пользователей в построенный рейтинг в Redis."""
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(settings, "LEADERBOARD_ENABLED", True)
+    monkeypatch.setattr(users_commands, "create_redis", lambda: fakeredis.FakeAsyncRedis(server=server))
+    redis = fakeredis.FakeRedis(server=server)
+    redis.zadd(settings.LEADERBOARD_KEY, {"999": 1})
+    redis.set(f"{settings.LEADERBOARD_KEY}:total", 1)
+    path = tmp_path / "users.csv"
+    path.write_text("telegram_id,taps\n1,50\n2,7\n", encoding="utf-8")
+
+    result = runner.invoke(app, ["users", "import", str(path)])
+
+    assert result.exit_code == 0, result.output
+    top = redis.zrevrange(settings.LEADERBOARD_KEY, 0, -1, withscores=True)
+    assert [score for _, score in top] == [50, 7, 1]
+    assert int(redis.get(f"{settings.LEADERBOARD_KEY}:total")) == 58
+
+
+def test_import_requires_known_format(database, tmp_path):
+    """Тест: формат без расширения нужно указать явно."""
+    path = tmp_path / "users.txt"
+    path.write_text("telegram_id\n1\n", encoding="utf-8")
+
+    result = runner.invoke(app, ["users", "import", str(path)])
+    assert result.exit_code == 1
+
+    result = runner.invoke(app, ["users", "import", str(path), "--format", "csv"])
+    assert result.exit_code == 0, result.output
+    assert count_users(database) == 1
+
+
+def test_list_streams_plain_rows_without_limit(database):
+    """Тест: без --limit строки выводятся построчно, без таблицы."""
+    seed(database, 5)
+
+    result = runner.invoke(app, ["users", "list"])
+    assert result.exit_code == 0, result.output
+    lines = [line for line in result.stdout.splitlines() if line]
+    assert len(lines) == 5
+    assert lines[0].split("\t")[:3] == ["1", "1000", "user_0"]
+    assert "Users List" not in result.output
+
+
+def test_list_pages_with_after_id(database):
+    """Тест: --limit и --after-id выдают страницу и подсказку для следующей."""
+    seed(database, 10)
+
+    result = runner.invoke(app, ["users", "list", "--limit", "3", "--after-id", "4", "--format", "jsonl"])
+    assert result.exit_code == 0, result.output
+    records = [json.loads(line) for line in result.stdout.splitlines() if line.startswith("{")]
+    assert [record["id"] for record in records] == [5, 6, 7]
+    assert "--after-id 7" in result.stderr
+
+    result = runner.invoke(app, ["users", "list", "--limit", "3", "--after-id", "7", "--format", "csv"])
+    rows = list(csv.DictReader(result.stdout.splitlines()))
+    assert [row["telegram_id"] for row in rows] == ["1007", "1008", "1009"]
+
+    # Небольшая выборка по умолчанию выводится таблицей
+    result = runner.invoke(app, ["users", "list", "--limit", "2"])
+    assert "Users List" in result.stdout
@@ -130,11 +130,10 @@ async def error_form_photo(msg: types.Message) -> None:
 @dp.message_handler(Text(equals=features.rating_ftr.triggers, ignore_case=True), registered=True)
 async def rating(msg: types.Message) -> None:
     user = await db.get_user(tg_user=TgUser(tg_id=msg.from_user.id, username=msg.from_user.username))
-    all_users = await db.get_all_users()
-    total_taps = sum([i.taps for i in all_users])
+    total_taps = await db.get_total_taps()
     text = features.rating_ftr.text.format(user_taps=user.taps, total_taps=total_taps)  # type: ignore[union-attr]
     await msg.answer(text, reply_markup=features.rating_ftr.kb)
-    if all_users and (best_user := all_users[0]).taps > 0:
+    if (best_user := await db.get_best_user()) is not None:
         text = features.rating_ftr.text2.format(  # type: ignore[union-attr]
             name=best_user.name, username=best_user.username, info=best_user.info
         )
@@ -221,6 +220,7 @@ async def healthcheck() -> None:
 async def bot_scheduler() -> None:
     logger.info("Scheduler is up")
     aioschedule.every().day.at(settings.schedule_healthcheck).do(healthcheck)
+    aioschedule.every(settings.username_sync_interval_sec).seconds.do(db.flush_usernames)
 
     while True:
         await aioschedule.run_pending()
@@ -241,6 +241,7 @@ async def on_startup(dispatcher: DbDispatcher) -> None:
 
 
 async def on_shutdown(dispatcher: DbDispatcher) -> None:
+    await db.flush_usernames()
     await dispatcher.storage.close()
     await dispatcher.storage.wait_closed()
 
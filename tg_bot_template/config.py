@@ -28,6 +28,7 @@ class BotSettings(BaseSettings):
 
     inline_kb_button_row_width: int = 2
     schedule_healthcheck: str = "7:00"  # !!!UTC timezone!!!
+    username_sync_interval_sec: int = 60
 
     class Config:
         env_file = ".env"
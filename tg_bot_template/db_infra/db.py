@@ -3,6 +3,7 @@ from datetime import datetime
 from aiocache import cached
 from aiocache.serializers import PickleSerializer
 from loguru import logger
+from peewee import Case, ModelUpdate, fn
 from peewee_async import Manager
 
 from tg_bot_template import dp
@@ -11,6 +12,10 @@ from tg_bot_template.bot_lib.bot_feature import TgUser
 from tg_bot_template.db_infra.models import Users
 
 
+# social_id -> last seen username, written in one bulk UPDATE by flush_usernames()
+_pending_usernames: dict[int, str] = {}
+
+
 def _get_conn() -> Manager:
     return dp.get_db_conn()
 
@@ -30,11 +35,47 @@ async def get_user(*, tg_user: TgUser) -> Users | None:
     except Exception:
         return None
     else:
-        user.username = tg_user.username
-        await _get_conn().update(user)
+        # reads stay reads: only a real username change is queued for the next bulk sync;
+        # a removed username (None) keeps the stored one, the column is NOT NULL
+        if tg_user.username is not None and user.username != tg_user.username:
+            _pending_usernames[tg_user.tg_id] = tg_user.username
+            user.username = tg_user.username
         return user  # type: ignore[no-any-return]
 
 
+def _usernames_update(batch: dict[int, str]) -> ModelUpdate:
+    return Users.update(username=Case(Users.social_id, tuple(batch.items()), Users.username)).where(
+        Users.social_id.in_(list(batch))
+    )
+
+
+async def flush_usernames() -> int:
+    global _pending_usernames
+    if not _pending_usernames:
+        return 0
+    batch, _pending_usernames = _pending_usernames, {}
+    try:
+        await _get_conn().execute(_usernames_update(batch))
+    except Exception:
+        logger.exception("Bulk usernames sync failed, retrying row by row")
+    else:
+        logger.info(f"Usernames synced: {len(batch)}")
+        return len(batch)
+
+    # one bad row must not fail every later flush: failed rows are dropped, not re-queued;
+    # the stored username still differs, so the user's next read queues it again
+    synced = 0
+    for tg_id, username in batch.items():
+        try:
+            await _get_conn().execute(_usernames_update({tg_id: username}))
+        except Exception as e:
+            logger.warning(f"Username sync for {tg_id} dropped: {e}")
+        else:
+            synced += 1
+    logger.info(f"Usernames synced: {synced} of {len(batch)}")
+    return synced
+
+
 async def create_user(*, tg_user: TgUser) -> None:
     await _get_conn().create(
         Users, social_id=tg_user.tg_id, username=tg_user.username, registration_date=datetime.now()  # noqa: DTZ005
@@ -51,12 +92,24 @@ async def update_user_info(*, tg_user: TgUser, user_form_data: UserFormData) ->
         await _get_conn().update(user)
 
 
-async def incr_user_taps(*, tg_user: TgUser) -> None:
-    user = await get_user(tg_user=tg_user)
-    if user is not None:
-        user.taps += 1
-        await _get_conn().update(user)
+async def incr_user_taps(*, tg_user: TgUser, amount: int = 1) -> None:
+    # single atomic UPDATE: concurrent callbacks must not overwrite each other's increments
+    query = Users.update(taps=Users.taps + amount).where(Users.social_id == tg_user.tg_id)
+    await _get_conn().execute(query)
 
 
 async def get_all_users() -> list[Users]:
     return list(await _get_conn().execute(Users.select().order_by(Users.taps.desc())))
+
+
+async def get_total_taps() -> int:
+    # SUM is computed by postgres, no user rows are loaded into python;
+    # it is still a full scan, so its cost grows linearly with the table
+    query = Users.select(fn.COALESCE(fn.SUM(Users.taps), 0))
+    return int(await _get_conn().scalar(query))
+
+
+async def get_best_user() -> Users | None:
+    query = Users.select().where(Users.taps > 0).order_by(Users.taps.desc()).limit(1)
+    users = await _get_conn().execute(query)
+    return next(iter(users), None)
@@ -6,7 +6,7 @@ class Users(peewee.Model):  # type: ignore[misc]
     social_id = peewee.BigIntegerField(null=False)
     username = peewee.CharField(max_length=50)
     registration_date = peewee.DateTimeField(null=True)
-    taps = peewee.BigIntegerField(default=0)
+    taps = peewee.BigIntegerField(default=0, index=True)  # index for ORDER BY taps DESC LIMIT 1
     name = peewee.TextField(null=True)
     info = peewee.TextField(null=True)
     photo = peewee.TextField(null=True)